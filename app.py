@@ -3,17 +3,18 @@ import json
 
 import streamlit as st
 
+from config import DEFAULT_TENANT_ID, SPECULATIVE_DOCUMENT_DETECTION
 from rag_workflow import (
+    SpeculativeAnswer,
+    add_internal_documents,
     analyze_document,
-    check_document_suggestion,
     clear_internal_documents,
     detect_explicit_document_request,
     get_document_fields,
-    get_internal_document_names,
-    identify_used_sources,
-    process_question,
-    recreate_graph,
-    set_internal_retriever,
+    get_internal_documents,
+    post_process_answer,
+    remove_internal_document,
+    stream_question,
     write_document,
 )
 from utils.document_formatter import format_document
@@ -72,8 +73,19 @@ if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 if "document_form" not in st.session_state:
     st.session_state.document_form = None  # Stores form data when collecting info
-if "loaded_documents" not in st.session_state:
-    st.session_state.loaded_documents = []  # List of loaded document names
+if "condominium_id" not in st.session_state:
+    # Sessions share the default condominium's index until another one is chosen;
+    # every condominium id gets a persistent collection, so none is made up per session
+    st.session_state.condominium_id = DEFAULT_TENANT_ID
+if "upload_round" not in st.session_state:
+    st.session_state.upload_round = 0  # Bumped after each upload to reset the uploader
+
+st.sidebar.text_input(
+    "Condomínio",
+    key="condominium_id",
+    help="Identificador do condomínio. Os documentos internos ficam salvos por condomínio.",
+)
+tenant_id = st.session_state.condominium_id.strip() or DEFAULT_TENANT_ID
 
 # Mode toggle
 mode = st.radio(
@@ -238,9 +250,15 @@ if mode == "Consulta":
             st.write(query)
 
         # Check if this is an explicit document request
-        doc_request = detect_explicit_document_request(query)
+        answer_stream = None
+        if SPECULATIVE_DOCUMENT_DETECTION:
+            # The answer starts generating while the request is detected
+            answer_stream = SpeculativeAnswer(query, tenant_id=tenant_id)
+            doc_request = answer_stream.document_request
+        else:
+            doc_request = detect_explicit_document_request(query)
 
-        if doc_request.get("is_explicit_request") and doc_request.get("document_type"):
+        if opens_document_form(doc_request):
             # Show form to collect information before generating
             doc_type = doc_request["document_type"]
             doc_name = doc_request.get("document_name") or doc_type
@@ -257,20 +275,29 @@ if mode == "Consulta":
             }
             st.rerun()
         else:
-            # Normal RAG flow
-            result, _ = process_question(query)
-            answer = result["solution"]
-
-            # Identify which documents were actually used in the answer
-            used_docs = identify_used_sources(answer, result["documents"], query)
+            # Normal RAG flow: show the answer while it is generated, then its sources
+            with st.chat_message("assistant"):
+                stream = answer_stream or stream_question(query, tenant_id=tenant_id)
+                st.write_stream(stream)
+                result = stream.result
+                answer = result["solution"]
+
+                # Identify the used sources and check for a document suggestion in parallel
+                post_processed = post_process_answer(query, answer, result["documents"])
+                used_docs = post_processed["sources"]
+
+                # Deduplicate sources by page_content
+                seen_sources = set()
+                sources = []
+                for doc in used_docs:
+                    if doc.page_content not in seen_sources:
+                        seen_sources.add(doc.page_content)
+                        sources.append(doc.page_content)
 
-            # Deduplicate sources by page_content
-            seen_sources = set()
-            sources = []
-            for doc in used_docs:
-                if doc.page_content not in seen_sources:
-                    seen_sources.add(doc.page_content)
-                    sources.append(doc.page_content)
+                if sources:
+                    st.write("**Fonte:**")
+                    for source in sources:
+                        st.write(f'- {source}')
 
             # Add assistant message to history
             st.session_state.chat_history.append({
@@ -279,15 +306,7 @@ if mode == "Consulta":
                 "sources": sources
             })
 
-            with st.chat_message("assistant"):
-                st.write(answer)
-                if sources:
-                    st.write("**Fonte:**")
-                    for source in sources:
-                        st.write(f'- {source}')
-
-            # Check for document suggestion
-            suggestion = check_document_suggestion(query, answer)
+            suggestion = post_processed["suggestion"]
             if suggestion.get("should_suggest"):
                 st.session_state.pending_suggestion = suggestion
                 st.session_state.last_question = query
@@ -297,48 +316,53 @@ if mode == "Consulta":
     # Document management section
     st.sidebar.markdown("### Documentos Indexados")
 
-    if st.session_state.loaded_documents:
-        st.sidebar.success(f"{len(st.session_state.loaded_documents)} documento(s) carregado(s)")
-        for doc_name in st.session_state.loaded_documents:
-            st.sidebar.markdown(f"- {doc_name}")
+    loaded_documents = get_internal_documents(tenant_id)
+    if loaded_documents:
+        st.sidebar.success(f"{len(loaded_documents)} documento(s) carregado(s)")
+        for document_hash, doc_name in loaded_documents:
+            name_col, remove_col = st.sidebar.columns([4, 1])
+            name_col.markdown(f"- {doc_name}")
+            if remove_col.button("✕", key=f"remove_{document_hash}", help=f"Remover {doc_name}"):
+                remove_internal_document(document_hash, tenant_id)
+                st.rerun()
 
         if st.sidebar.button("Limpar todos os documentos", key="clear_docs", type="secondary"):
-            clear_internal_documents()
-            recreate_graph()
-            st.session_state.loaded_documents = []
+            clear_internal_documents(tenant_id)
             st.rerun()
 
         st.sidebar.markdown("---")
-        st.sidebar.caption("Para substituir os documentos, basta fazer upload de novos arquivos.")
+        st.sidebar.caption("Novos uploads são adicionados aos documentos já indexados.")
     else:
         st.sidebar.info("Nenhum documento carregado")
 
     # Upload section in main area
-    with st.expander("Upload de Documentos Internos", expanded=not st.session_state.loaded_documents):
+    with st.expander("Upload de Documentos Internos", expanded=not loaded_documents):
         st.markdown("Faça upload dos documentos internos do condomínio (convenção, regimento interno, atas, etc.)")
-        st.caption("Os documentos anteriores serão substituídos ao fazer novo upload.")
+        st.caption("Documentos já indexados não são processados novamente.")
 
         user_files = st.file_uploader(
             "Escolha os arquivos",
             type="pdf",
             help="Upload de convenção, regimento interno ou outros documentos para consultas contextualizadas.",
             label_visibility="collapsed",
-            key="internal_docs",
+            # A new key after each upload empties the uploader, so removed documents are not re-added
+            key=f"internal_docs_{tenant_id}_{st.session_state.upload_round}",
             accept_multiple_files=True
         )
 
         if user_files:
-            # Check if these are new files
-            new_file_names = [f.name for f in user_files]
-            if set(new_file_names) != set(st.session_state.loaded_documents):
-                with st.spinner("Indexando documentos..."):
-                    # Prepare list of (filename, bytes) tuples
-                    documents = [(f.name, f.read()) for f in user_files]
-                    count = set_internal_retriever(documents)
-                    recreate_graph()
-                    st.session_state.loaded_documents = new_file_names
-
-                st.success(f"{count} documento(s) indexado(s) com sucesso!")
+            with st.spinner("Indexando documentos..."):
+                results = add_internal_documents([(f.name, f.read()) for f in user_files], tenant_id=tenant_id)
+
+            st.session_state.upload_round += 1
+            failed = [r for r in results if r["status"] == "failed"]
+            if failed:
+                # Keep the errors on screen (no rerun); the sidebar refreshes on the next interaction
+                for r in failed:
+                    st.error(f"Não foi possível indexar {r['name']}: {r['error']}")
+            else:
+                added = sum(1 for r in results if r["status"] == "added")
+                st.success(f"{added} documento(s) indexado(s) com sucesso!")
                 st.rerun()
 
 else:
@@ -1,12 +1,10 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import BaseModel, Field
 
-from config import MODEL_NAME
-
-llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0)
+from resources import lazy_chat_model
+from utils.clause_segmenter import segment_clauses
 
 
 class ExtractedClause(BaseModel):
@@ -27,7 +25,7 @@ class ClauseExtractionResult(BaseModel):
     )
 
 
-structured_output = llm.with_structured_output(ClauseExtractionResult)
+structured_output = lazy_chat_model(temperature=0, schema=ClauseExtractionResult)
 
 system_prompt = """Você é um especialista em análise de documentos condominiais brasileiros (convenção de condomínio e regimento interno).
 
@@ -71,6 +69,15 @@ extract_prompt = ChatPromptTemplate.from_messages([
 clause_extractor_chain = extract_prompt | structured_output
 
 
+def extract_clauses_locally(document_chunk: str, min_coverage: float = 0.8,
+                            metadata: Optional[Dict[str, Any]] = None) -> Optional[ClauseExtractionResult]:
+    """Rule-based extraction of a well-structured chunk; None when it needs clause_extractor_chain."""
+    clauses = segment_clauses(document_chunk, min_coverage, metadata)
+    if clauses is None:
+        return None
+    return ClauseExtractionResult(clauses=[ExtractedClause(**clause) for clause in clauses])
+
+
 def deduplicate_clauses(clauses: List[ExtractedClause]) -> List[ExtractedClause]:
     """Remove duplicate clauses based on clause_number."""
     seen = set()
@@ -1,12 +1,9 @@
 from typing import List, Optional
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import BaseModel, Field
 
-from config import MODEL_NAME
-
-llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0)
+from resources import lazy_chat_model
 
 
 class DocumentField(BaseModel):
@@ -22,7 +19,7 @@ class DocumentFieldsResult(BaseModel):
     fields: List[DocumentField] = Field(description="Lista de campos necessários")
 
 
-structured_output = llm.with_structured_output(DocumentFieldsResult)
+structured_output = lazy_chat_model(temperature=0, schema=DocumentFieldsResult)
 
 system_prompt = """Você é um especialista em documentos condominiais brasileiros.
 
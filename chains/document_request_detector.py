@@ -1,12 +1,11 @@
+import re
+import unicodedata
 from typing import Optional
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import BaseModel, Field
 
-from config import MODEL_NAME
-
-llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0)
+from resources import lazy_chat_model
 
 
 class DocumentRequest(BaseModel):
@@ -27,7 +26,7 @@ class DocumentRequest(BaseModel):
     )
 
 
-structured_output = llm.with_structured_output(DocumentRequest)
+structured_output = lazy_chat_model(temperature=0, schema=DocumentRequest)
 
 system_prompt = """Você é um detector de solicitações de documentos condominiais.
 
@@ -97,3 +96,62 @@ detect_prompt = ChatPromptTemplate.from_messages([
 ])
 
 document_request_detector_chain = detect_prompt | structured_output
+
+
+# Local pre-filter: obvious requests are decided without calling the detector model.
+# Patterns run on lowercase text without accents.
+
+# Imperative that opens an explicit request ("Redija uma notificação...")
+_REQUEST_START = re.compile(
+    r"^(por favor,?\s+)?(me ajude a (escrever|redigir)|redija|escreva|elabore|crie|gere|monte|prepare)\b"
+)
+
+_DOCUMENT_NAMES = {
+    "notificacao_barulho": "Notificação de Barulho",
+    "notificacao_inadimplencia": "Notificação de Inadimplência",
+    "advertencia": "Advertência",
+    "convocacao_assembleia": "Convocação de Assembleia",
+    "ata_assembleia": "Ata de Assembleia",
+    "comunicado_geral": "Comunicado Geral",
+}
+
+# Checked in order: specific document nouns first, then notifications by topic
+_DOCUMENT_TYPES = [
+    ("advertencia", re.compile(r"\badvertencia\b")),
+    ("convocacao_assembleia", re.compile(r"\bconvocacao\b")),
+    ("ata_assembleia", re.compile(r"\bata\b")),
+    ("comunicado_geral", re.compile(r"\b(comunicado|aviso)\b")),
+    ("notificacao_barulho", re.compile(
+        r"\bnotificacao\b.*\b(barulho|ruido|som alto|musica|festa|perturbacao|sossego)")),
+    ("notificacao_inadimplencia", re.compile(
+        r"\bnotificacao\b.*\b(inadimplen\w*|devedor|debito|atraso|cobranca|nao pagou)")),
+]
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c)).strip()
+
+
+def match_document_request(question: str) -> Optional[DocumentRequest]:
+    """
+    Recognize obvious requests locally, without calling the detector model.
+
+    Returns an explicit request when the message opens with a request verb
+    and names a known document type ("Redija uma notificação de barulho"),
+    and None otherwise: requests can be phrased in too many ways
+    ("Advertência para o 302 por barulho") for a local rule to rule them
+    out, so every other message goes to the detector model.
+    """
+    text = _fold(question)
+
+    if _REQUEST_START.match(text):
+        for document_type, pattern in _DOCUMENT_TYPES:
+            if pattern.search(text):
+                return DocumentRequest(
+                    is_explicit_request=True,
+                    document_type=document_type,
+                    document_name=_DOCUMENT_NAMES[document_type],
+                    extracted_context=question.strip(),
+                )
+    return None
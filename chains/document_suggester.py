@@ -1,12 +1,9 @@
 from typing import Optional
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import BaseModel, Field
 
-from config import MODEL_NAME
-
-llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0)
+from resources import lazy_chat_model
 
 
 class DocumentSuggestion(BaseModel):
@@ -27,7 +24,7 @@ class DocumentSuggestion(BaseModel):
     )
 
 
-structured_output = llm.with_structured_output(DocumentSuggestion)
+structured_output = lazy_chat_model(temperature=0, schema=DocumentSuggestion)
 
 system_prompt = """Você é um assistente especializado em documentos condominiais brasileiros.
 
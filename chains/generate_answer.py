@@ -1,10 +1,9 @@
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 
-from config import MODEL_NAME
+from resources import lazy_chat_model
 
-llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0)
+llm = lazy_chat_model(temperature=0)
 
 
 system_prompt = """Você é um assistente especializado em responder perguntas com base em documentos fornecidos. Seu objetivo é oferecer respostas precisas, úteis e bem estruturadas que atendam diretamente à pergunta do usuário.
@@ -1,12 +1,9 @@
 from typing import List, Optional
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import BaseModel, Field
 
-from config import MODEL_NAME
-
-llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0)
+from resources import lazy_chat_model
 
 
 class IllegalityAnalysis(BaseModel):
@@ -31,7 +28,7 @@ class IllegalityAnalysis(BaseModel):
     )
 
 
-structured_output = llm.with_structured_output(IllegalityAnalysis)
+structured_output = lazy_chat_model(temperature=0, schema=IllegalityAnalysis)
 
 system_prompt = """Você é um advogado especialista em direito condominial brasileiro, com profundo conhecimento do Código Civil.
 
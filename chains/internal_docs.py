@@ -1,10 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import BaseModel, Field
 
-from config import MODEL_NAME
-
-llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0)
+from resources import lazy_chat_model
 
 
 class EvaluateDocs(BaseModel):
@@ -13,7 +10,7 @@ class EvaluateDocs(BaseModel):
     )
 
 
-structured_output = llm.with_structured_output(EvaluateDocs)
+structured_output = lazy_chat_model(temperature=0, schema=EvaluateDocs)
 
 system_prompt = """Você é um avaliador especialista em relevância de documentos para um sistema RAG (Retrieval-Augmented Generation). Seu papel é avaliar se os documentos recuperados contêm informações suficientes para responder de forma eficaz à consulta do usuário.
 
@@ -1,12 +1,11 @@
 from typing import List
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import BaseModel, Field
 
-from config import MODEL_NAME
-
-llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0)
+from config import CITATION_LLM_FALLBACK, CITATION_MIN_OVERLAP
+from resources import lazy_chat_model
+from utils.citation_mapper import map_citations
 
 
 class UsedSources(BaseModel):
@@ -15,7 +14,7 @@ class UsedSources(BaseModel):
     )
 
 
-structured_output = llm.with_structured_output(UsedSources)
+structured_output = lazy_chat_model(temperature=0, schema=UsedSources)
 
 system_prompt = """Você é um analisador de citações de fontes.
 
@@ -55,9 +54,25 @@ identify_prompt = ChatPromptTemplate.from_messages([
 source_identifier_chain = identify_prompt | structured_output
 
 
-def identify_used_sources(answer: str, documents: list, question: str = "") -> list:
+def _format_documents(documents: list) -> str:
+    """Format documents with indices for the identifier prompt."""
+    return "\n\n".join([
+        f"[Documento {i}]: {doc.page_content}"
+        for i, doc in enumerate(documents)
+    ])
+
+
+def _select_used(result: UsedSources, documents: list) -> list:
+    """Return only the used documents, ignoring out-of-range indices."""
+    return [
+        documents[i] for i in result.used_indices
+        if 0 <= i < len(documents)
+    ]
+
+
+def identify_used_sources_llm(answer: str, documents: list, question: str = "") -> list:
     """
-    Identify which documents were actually used to answer the question.
+    Ask the model which documents were actually used to answer the question.
 
     Args:
         answer: The generated answer text
@@ -70,27 +85,62 @@ def identify_used_sources(answer: str, documents: list, question: str = "") -> l
     if not documents or not answer:
         return []
 
-    # Format documents with indices
-    docs_text = "\n\n".join([
-        f"[Documento {i}]: {doc.page_content}"
-        for i, doc in enumerate(documents)
-    ])
-
     try:
         result = source_identifier_chain.invoke({
             "question": question,
             "answer": answer,
-            "documents": docs_text
+            "documents": _format_documents(documents)
         })
+        return _select_used(result, documents)
+    except Exception as e:
+        print(f"Error identifying sources: {e}")
+        # Fallback: return all documents
+        return documents
 
-        # Return only the used documents
-        used_docs = [
-            documents[i] for i in result.used_indices
-            if 0 <= i < len(documents)
-        ]
-        return used_docs
 
+async def aidentify_used_sources_llm(answer: str, documents: list, question: str = "") -> list:
+    """Async version of identify_used_sources_llm."""
+    if not documents or not answer:
+        return []
+
+    try:
+        result = await source_identifier_chain.ainvoke({
+            "question": question,
+            "answer": answer,
+            "documents": _format_documents(documents)
+        })
+        return _select_used(result, documents)
     except Exception as e:
         print(f"Error identifying sources: {e}")
         # Fallback: return all documents
         return documents
+
+
+def identify_used_sources(answer: str, documents: list, question: str = "") -> list:
+    """
+    Identify which documents were actually used to answer the question.
+
+    Citations are mapped locally (article numbers and word overlap, see
+    utils.citation_mapper). The model is only asked when nothing matched
+    and CITATION_LLM_FALLBACK is enabled.
+
+    Args:
+        answer: The generated answer text
+        documents: List of document objects
+        question: The original user question
+
+    Returns:
+        List of documents that were directly used to answer the question
+    """
+    used, confident = map_citations(answer, documents, min_overlap=CITATION_MIN_OVERLAP)
+    if not confident and CITATION_LLM_FALLBACK:
+        return identify_used_sources_llm(answer, documents, question)
+    return [documents[i] for i in used]
+
+
+async def aidentify_used_sources(answer: str, documents: list, question: str = "") -> list:
+    """Async version of identify_used_sources."""
+    used, confident = map_citations(answer, documents, min_overlap=CITATION_MIN_OVERLAP)
+    if not confident and CITATION_LLM_FALLBACK:
+        return await aidentify_used_sources_llm(answer, documents, question)
+    return [documents[i] for i in used]
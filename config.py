@@ -1,8 +1,118 @@
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
 
-# Clause extraction settings (smaller chunks for better boundary detection)
-CLAUSE_CHUNK_SIZE = 600
+# Processes used to parse several uploaded PDFs at once
+PDF_PARSE_MAX_WORKERS = 4
+
+# Maximum internal document chunks graded for relevance in parallel
+INTERNAL_GRADING_MAX_CONCURRENCY = 8
+
+# Clause extraction settings: whole clauses/articles are packed into chunks of up
+# to CLAUSE_CHUNK_SIZE characters (the overlap only applies to unstructured text)
+CLAUSE_CHUNK_SIZE = 2000
 CLAUSE_CHUNK_OVERLAP = 150
 
+# Maximum document chunks sent to the clause extractor in parallel
+CLAUSE_EXTRACTION_MAX_CONCURRENCY = 8
+
+# Rule-based clause segmentation: chunks numbered by "Art."/"Cláusula" are split
+# and classified locally; the LLM extractor only gets the chunks where less than
+# CLAUSE_SEGMENTER_MIN_COVERAGE of the text falls inside recognized units
+CLAUSE_SEGMENTER_ENABLED = True
+CLAUSE_SEGMENTER_MIN_COVERAGE = 0.8
+
 MODEL_NAME = "gemini-2.5-flash-lite"
+
+# Shared LLM connection pools: one for sync calls and one per event loop for async
+# calls, each capping concurrent LLM requests at LLM_MAX_CONNECTIONS
+LLM_MAX_CONNECTIONS = 16
+LLM_KEEPALIVE_EXPIRY = 60  # seconds an idle connection is kept open
+LLM_REQUEST_TIMEOUT = 120  # seconds
+
+# Embeddings and vector store
+# Embedding backend: "google" (remote Gemini embeddings) or "local" (a
+# sentence-transformers model run in-process on CPU, no network calls).
+# Each backend has its own collections; `python -m ingest.reembed` fills them.
+EMBEDDING_BACKEND = "google"
+EMBEDDING_MODEL_NAME = "gemini-embedding-001"
+EMBEDDING_TASK_TYPE = "retrieval_document"
+LOCAL_EMBEDDING_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+LOCAL_EMBEDDING_DEVICE = "cpu"
+LOCAL_EMBEDDING_BATCH_SIZE = 32
+VECTORSTORE_PATH = "./db"
+INGEST_MANIFEST_PATH = "./db/ingest_manifest.json"  # content hashes of the indexed articles
+
+# Exact article lookup: articles cited in a question ("art. 1.336") are fetched
+# by number from an index written at ingest and merged with the vector results
+ARTICLE_LOOKUP_ENABLED = True
+ARTICLE_INDEX_PATH = "./db/article_index.json"
+ARTICLE_LOOKUP_MAX = 5  # cited articles added per question
+
+# Retrieval over the Civil Code: "dense" (vector store), "hybrid" (vector store
+# fused with a local BM25 index) or "lexical" (BM25 alone when its best match
+# covers LEXICAL_CONFIDENCE_THRESHOLD of the query terms, hybrid otherwise;
+# 0 makes it lexical-only and never embeds queries)
+RETRIEVAL_MODE = "hybrid"
+RETRIEVAL_K = 4  # documents returned per query
+HYBRID_FETCH_K = 20  # candidates taken from each ranking before fusion
+RRF_K = 60
+LEXICAL_CONFIDENCE_THRESHOLD = 0.9
+
+# Bulk embedding pipeline: batch size, concurrent requests and retries on 429/5xx
+EMBEDDING_BATCH_SIZE = 100
+EMBEDDING_MAX_CONCURRENCY = 4
+EMBEDDING_MAX_RETRIES = 5
+EMBEDDING_RETRY_BACKOFF = 1.0
+EMBEDDING_RETRY_MAX_BACKOFF = 30.0
+
+# Embedding cache (vectors stored on disk by content hash, shared by ingest and queries)
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_PATH = "./cache/embeddings.sqlite3"
+
+# Internal documents: one persistent collection per condominium (tenant),
+# with at most INTERNAL_INDEX_MAX_LOADED recently used indexes kept in memory
+DEFAULT_TENANT_ID = "default"
+INTERNAL_INDEX_PATH = "./db/internal"
+INTERNAL_INDEX_MAX_LOADED = 32
+INTERNAL_INDEX_IDLE_SECONDS = 30 * 60
+
+# Source attribution: answers are mapped to the documents they cite without an LLM;
+# the model is only asked when nothing matches and the fallback is enabled. Answers
+# that cite no article number go unattributed 7 times in 10 without it, and a lower
+# overlap only trades that for wrong sources (python -m eval.citations --offline)
+CITATION_MIN_OVERLAP = 0.5
+CITATION_LLM_FALLBACK = True
+
+# Detect explicit document requests while the answer is already being generated
+SPECULATIVE_DOCUMENT_DETECTION = True
+
+# HTTP API (server.py): requests beyond the workers wait in a bounded queue,
+# and are rejected with 503 once the queue is full
+SERVER_HOST = "0.0.0.0"
+SERVER_PORT = 8080
+SERVER_ASK_WORKERS = 8
+SERVER_ASK_QUEUE_SIZE = 32
+SERVER_ANALYSIS_WORKERS = 2
+SERVER_ANALYSIS_QUEUE_SIZE = 8
+SERVER_MAX_UPLOAD_MB = 50
+SERVER_JOB_HISTORY = 100  # finished analysis jobs kept for polling
+
+# Document analysis settings (maximum clauses analyzed in parallel)
+ANALYSIS_MAX_CONCURRENCY = 8
+
+# Reranking settings (cross-encoder stage between retrieval and generation)
+RERANK_ENABLED = True
+RERANK_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANK_FETCH_K = 20  # candidates retrieved before reranking
+RERANK_TOP_K = 5  # documents kept for generation
+RERANK_THRESHOLD = -3.0
+RERANK_BATCH_SIZE = 32
+RERANK_CACHE_SIZE = 4096
+
+# Answer cache (answers persisted on disk, keyed by question + retrieval context)
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_PATH = "./cache/answers.sqlite3"
+ANSWER_CACHE_TTL = 7 * 24 * 3600  # seconds, None to never expire
+ANSWER_CACHE_MAX_ENTRIES = 1000
+ANSWER_CACHE_SIMILARITY_THRESHOLD = None  # e.g. 0.95 to also match similar questions by embedding
+ANSWER_PROMPT_VERSION = 1  # bump when a prompt of the answer graph changes, so cached answers are not reused
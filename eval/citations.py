@@ -0,0 +1,117 @@
+"""
+Compare the deterministic citation mapping with the LLM source identifier on eval/qa.json.
+
+For every question, the graph answer is attributed to its retrieved
+documents both ways, and each attribution is scored against the
+reference article ids in qa.json (precision/recall) and against each
+other (agreement), along with the time each one took.
+
+    python -m eval.citations            # needs GOOGLE_API_KEY
+    python -m eval.citations --offline  # reference answers vs. every ingested article, no API calls
+
+The reference answers cite their article numbers, which the mapping
+matches directly, so offline mode also scores them with every article
+reference removed: that row measures the word-overlap matching alone.
+"""
+import argparse
+import json
+import os
+import time
+
+from langchain_core.documents import Document
+
+from config import CITATION_MIN_OVERLAP
+from utils.article_refs import strip_article_refs
+from utils.citation_mapper import map_citations
+
+QA_PATH = "eval/qa.json"
+ARTICLES_PATH = "ingest/data/artigos"
+
+
+def sources(docs: list) -> set:
+    return {doc.metadata.get("source", "") for doc in docs}
+
+
+def precision_recall(found: set, reference: set):
+    tp = len(found & reference)
+    precision = tp / len(found) if found else float(not reference)
+    recall = tp / len(reference) if reference else 1.0
+    return precision, recall
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def load_articles(path: str = ARTICLES_PATH) -> list:
+    articles = []
+    for filename in sorted(os.listdir(path)):
+        source = os.path.join(path, filename)
+        with open(source, "r", encoding="utf-8") as f:
+            articles.append(Document(page_content=f.read(), metadata={"source": source}))
+    return articles
+
+
+def attribute(answer: str, documents: list):
+    start = time.perf_counter()
+    used, _ = map_citations(answer, documents, min_overlap=CITATION_MIN_OVERLAP)
+    return [documents[i] for i in used], time.perf_counter() - start
+
+
+def summarize(name: str, rows: list):
+    n = len(rows)
+    precision = sum(r[0] for r in rows) / n
+    recall = sum(r[1] for r in rows) / n
+    latency = sum(r[2] for r in rows) / n
+    empty = sum(1 for r in rows if not r[3])
+    print(f"{name:<14} precision={precision:.3f} recall={recall:.3f} latency={latency * 1000:.1f}ms "
+          f"unattributed={empty}/{n}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--offline", action="store_true",
+                        help="Attribute the reference answers against every ingested article (no API calls)")
+    args = parser.parse_args()
+
+    with open(QA_PATH, "r", encoding="utf-8") as f:
+        qa = json.load(f)
+
+    deterministic, uncited, llm, agreement = [], [], [], []
+    articles = load_articles() if args.offline else None
+
+    for item in qa:
+        reference = set(item.get("retrieved_context_ids", []))
+
+        if args.offline:
+            answer, documents = item["response"], articles
+        else:
+            from rag_workflow import process_question
+            result, _ = process_question(item["user_input"])
+            answer, documents = result["solution"], result["documents"]
+
+        used, elapsed = attribute(answer, documents)
+        deterministic.append((*precision_recall(sources(used), reference), elapsed, len(used)))
+        if args.offline:
+            used_uncited, elapsed = attribute(strip_article_refs(answer), documents)
+            uncited.append((*precision_recall(sources(used_uncited), reference), elapsed, len(used_uncited)))
+
+        if not args.offline:
+            from chains.source_identifier import identify_used_sources_llm
+            start = time.perf_counter()
+            used_llm = identify_used_sources_llm(answer, documents, item["user_input"])
+            elapsed = time.perf_counter() - start
+            llm.append((*precision_recall(sources(used_llm), reference), elapsed, len(used_llm)))
+            agreement.append(jaccard(sources(used), sources(used_llm)))
+
+    print(f"{len(qa)} questions")
+    summarize("deterministic", deterministic)
+    if uncited:
+        summarize("uncited", uncited)
+    if llm:
+        summarize("llm", llm)
+        print(f"agreement (Jaccard) = {sum(agreement) / len(agreement):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,2 @@
-from rag_workflow import graph
-graph.get_graph().draw_png("rag_workflow_diagram.png")
+from rag_workflow import get_graph
+get_graph().get_graph().draw_png("rag_workflow_diagram.png")
@@ -0,0 +1,109 @@
+"""
+Offline ingest benchmark.
+
+Ingests a corpus into an in-memory Chroma collection through the bulk
+embedding pipeline, using a local fake embedding model that simulates
+request latency and rate limiting, and reports the throughput. By default
+it generates one synthetic article per article of the full Código Civil
+(arts. 1 to 2.046), so no network access or API key is needed.
+
+    python -m ingest.benchmark --latency 0.2 --rate-limit-every 10
+    python -m ingest.benchmark --docs-path ingest/data/artigos
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from config import EMBEDDING_BATCH_SIZE, EMBEDDING_MAX_CONCURRENCY, EMBEDDING_MAX_RETRIES
+from ingest.ingest import ingest
+from utils.embedding_pipeline import BatchedEmbeddings, print_progress
+
+CODIGO_CIVIL_ARTICLES = 2046
+
+_counter_lock = threading.Lock()
+
+
+class RateLimitError(Exception):
+    """Simulated HTTP 429 from the embedding API."""
+    code = 429
+
+
+class SimulatedEmbeddings(DeterministicFakeEmbedding):
+    """Fake embedding model with per-request latency and periodic rate limiting."""
+
+    latency: float = 0.0
+    rate_limit_every: int = 0
+    requests: int = 0
+
+    def embed_documents(self, texts):
+        with _counter_lock:
+            self.requests += 1
+            request = self.requests
+        time.sleep(self.latency)
+        if self.rate_limit_every and request % self.rate_limit_every == 0:
+            raise RateLimitError("429 RESOURCE_EXHAUSTED (simulated)")
+        return super().embed_documents(texts)
+
+
+def write_synthetic_articles(directory: str, count: int):
+    """Write count article files shaped like the ones produced by get_codigo_civil.py."""
+    for number in range(1, count + 1):
+        text = (
+            f"Art. {number:,}. ".replace(",", ".")
+            + "O condômino tem o dever de contribuir para as despesas do condomínio "
+            + f"na proporção de sua fração ideal, conforme disposição {number}. " * 4
+        )
+        with open(os.path.join(directory, f"Art_{number}.txt"), "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingest with a local fake embedding model.")
+    parser.add_argument("--docs-path", help="Article directory (default: synthetic full Código Civil)")
+    parser.add_argument("--articles", type=int, default=CODIGO_CIVIL_ARTICLES,
+                        help="Number of synthetic articles to generate")
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=EMBEDDING_MAX_CONCURRENCY)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per embedding request")
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="Fail every Nth request with a simulated 429 (0 disables)")
+    args = parser.parse_args()
+
+    from langchain_chroma import Chroma
+
+    model = SimulatedEmbeddings(size=768, latency=args.latency, rate_limit_every=args.rate_limit_every)
+    embeddings = BatchedEmbeddings(
+        model,
+        batch_size=args.batch_size,
+        max_concurrency=args.concurrency,
+        max_retries=EMBEDDING_MAX_RETRIES,
+        initial_backoff=0.1,
+        progress=print_progress,
+    )
+    vectorstore = Chroma(collection_name=f"benchmark_{uuid.uuid4().hex}", embedding_function=embeddings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs_path = args.docs_path
+        if docs_path is None:
+            docs_path = os.path.join(tmp, "artigos")
+            os.makedirs(docs_path)
+            write_synthetic_articles(docs_path, args.articles)
+
+        start = time.perf_counter()
+        stats = ingest(vectorstore, docs_path=docs_path, manifest_path=os.path.join(tmp, "manifest.json"),
+                       article_index_path=os.path.join(tmp, "article_index.json"))
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"Ingested {stats['upserted']} articles in {elapsed:.2f}s "
+        f"({stats['upserted'] / elapsed:.1f} docs/s, {model.requests} embedding requests)"
+    )
+
+
+if __name__ == "__main__":
+    main()
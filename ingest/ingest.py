@@ -1,21 +1,143 @@
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
-from langchain_chroma import Chroma
-from chromadb.config import Settings
-from langchain_google_genai.embeddings import GoogleGenerativeAIEmbeddings
+"""
+Index the Civil Code articles in ingest/data/artigos into the Chroma store.
+
+Ingest is incremental: every article gets a stable id derived from its
+number (Art_1331-A.txt -> art-1331-a) and a manifest of content hashes
+decides what changed, so only new or modified articles are embedded and
+articles whose files were removed are deleted from the store. Running it
+twice leaves the collection untouched. Use --rebuild to re-index everything.
+
+The command also writes the article-number index used to answer questions
+that cite an article directly.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ARTICLE_INDEX_PATH, INGEST_MANIFEST_PATH  # noqa: E402
+from utils.article_index import ArticleIndex  # noqa: E402
 
 DOCS_PATH = "ingest/data/artigos"
-loader = DirectoryLoader(path=DOCS_PATH, recursive=True, loader_cls=TextLoader)
-docs = loader.load()
-
-vectorstore = Chroma.from_documents(
-    documents=docs,
-    embedding=GoogleGenerativeAIEmbeddings(
-        model="gemini-embedding-001",
-        task_type="retrieval_document"
-    ),
-    persist_directory="./db",
-    client_settings=Settings(
-        anonymized_telemetry=False,
-        is_persistent=True,
-    ),
-)
+
+
+def article_id(filename: str) -> str:
+    """Stable document id for an article file (Art_1331-A.txt -> art-1331-a)."""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return stem.lower().replace("_", "-")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_articles(docs_path: str = DOCS_PATH) -> Dict[str, Document]:
+    """Load every article file, keyed by its stable id."""
+    articles = {}
+    for filename in sorted(os.listdir(docs_path)):
+        if not filename.endswith(".txt"):
+            continue
+        path = os.path.join(docs_path, filename)
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        doc_id = article_id(filename)
+        articles[doc_id] = Document(id=doc_id, page_content=text, metadata={"source": path})
+    return articles
+
+
+def load_manifest(manifest_path: str = INGEST_MANIFEST_PATH) -> Dict[str, str]:
+    """Load the {article id: content hash} manifest of the last ingest."""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f).get("articles", {})
+
+
+def save_manifest(hashes: Dict[str, str], manifest_path: str = INGEST_MANIFEST_PATH):
+    """Save the manifest along with a version that changes whenever the corpus does."""
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    version = content_hash(json.dumps(hashes, sort_keys=True))
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "articles": hashes}, f, indent=2, sort_keys=True)
+
+
+def plan_changes(current: Dict[str, str], manifest: Dict[str, str],
+                 stored_ids: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Decide which articles to upsert and which stored ids to delete.
+
+    An article is upserted when it is new, its content changed, or it is
+    missing from the store. Stored ids that no longer match an article file
+    (removed articles, or duplicates left by the old full-rebuild ingest)
+    are deleted.
+    """
+    stored = set(stored_ids)
+    to_upsert = [
+        doc_id for doc_id, digest in current.items()
+        if manifest.get(doc_id) != digest or doc_id not in stored
+    ]
+    to_delete = sorted(stored - set(current))
+    return to_upsert, to_delete
+
+
+def ingest(vectorstore, docs_path: str = DOCS_PATH,
+           manifest_path: str = INGEST_MANIFEST_PATH, rebuild: bool = False,
+           article_index_path: Optional[str] = None) -> Dict[str, int]:
+    """Bring the vector store in sync with the article files, and write the article index if given a path."""
+    if rebuild:
+        vectorstore.reset_collection()
+        manifest = {}
+    else:
+        manifest = load_manifest(manifest_path)
+
+    articles = load_articles(docs_path)
+    current = {doc_id: content_hash(doc.page_content) for doc_id, doc in articles.items()}
+    stored_ids = vectorstore.get(include=[])["ids"]
+
+    to_upsert, to_delete = plan_changes(current, manifest, stored_ids)
+
+    if to_delete:
+        vectorstore.delete(ids=to_delete)
+    if to_upsert:
+        # Chroma upserts by id, so changed articles replace their old version
+        vectorstore.add_documents([articles[doc_id] for doc_id in to_upsert], ids=to_upsert)
+
+    save_manifest(current, manifest_path)
+    if article_index_path:
+        # The lookup index is rebuilt from the files every time: no embeddings involved
+        ArticleIndex.from_documents(articles.values()).save(article_index_path)
+
+    return {
+        "upserted": len(to_upsert),
+        "deleted": len(to_delete),
+        "unchanged": len(current) - len(to_upsert),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index Civil Code articles into the vector store.")
+    parser.add_argument("--docs-path", default=DOCS_PATH, help="Directory with one .txt file per article")
+    parser.add_argument("--rebuild", action="store_true", help="Drop the collection and re-index everything")
+    args = parser.parse_args()
+
+    from resources import get_vectorstore, ingest_manifest_path
+
+    stats = ingest(get_vectorstore(), docs_path=args.docs_path, manifest_path=ingest_manifest_path(),
+                   rebuild=args.rebuild, article_index_path=ARTICLE_INDEX_PATH)
+    print(
+        f"Ingest complete: {stats['upserted']} upserted, "
+        f"{stats['deleted']} deleted, {stats['unchanged']} unchanged"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Re-embed everything indexed by one embedding backend with another.
+
+Every backend keeps its vectors in its own collections, so switching
+EMBEDDING_BACKEND in config.py starts from empty indexes. This command
+fills the target backend's collections from the source backend's: the
+Civil Code articles and the internal documents of every condominium, with
+their ids and metadata. Chunks already in a target collection are skipped,
+so an interrupted run can simply be started again.
+
+    python -m ingest.reembed --to local                 # from the configured backend
+    python -m ingest.reembed --from local --to google
+"""
+import argparse
+import re
+from typing import Dict, List
+
+from langchain_core.documents import Document
+
+from config import EMBEDDING_BACKEND, EMBEDDING_BATCH_SIZE, INTERNAL_INDEX_PATH, VECTORSTORE_PATH
+from resources import CIVIL_CODE_COLLECTION, collection_suffix, create_embeddings
+
+# Suffix added by resources.collection_suffix to non-Google collections
+_BACKEND_SUFFIX = re.compile(r"__[a-z]+_[0-9a-f]{8}$")
+
+
+def copy_collection(source, target, batch_size: int = EMBEDDING_BATCH_SIZE) -> int:
+    """Add the chunks of source missing from target, embedding them with target's model."""
+    stored = source.get(include=["documents", "metadatas"])
+    existing = set(target.get(include=[])["ids"])
+    documents = [
+        Document(id=doc_id, page_content=text, metadata=metadata or {})
+        for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])
+        if doc_id not in existing
+    ]
+
+    for start in range(0, len(documents), batch_size):
+        batch = documents[start:start + batch_size]
+        target.add_documents(batch, ids=[doc.id for doc in batch])
+    return len(documents)
+
+
+def base_names(client, suffix: str, prefix: str = "internal_") -> List[str]:
+    """Names of the collections stored with a backend suffix, without the suffix."""
+    names = []
+    for collection in client.list_collections():
+        name = collection.name
+        if not name.startswith(prefix):
+            continue
+        if suffix and name.endswith(suffix):
+            names.append(name[:-len(suffix)])
+        elif not suffix and not _BACKEND_SUFFIX.search(name):
+            names.append(name)
+    return sorted(names)
+
+
+def reembed(civil_code_client, internal_client, embeddings, source_suffix: str, target_suffix: str,
+            batch_size: int = EMBEDDING_BATCH_SIZE) -> Dict[str, int]:
+    """Copy every source collection to its target-backend counterpart. Returns chunks added per collection."""
+    from langchain_chroma import Chroma
+
+    def copy(client, name: str) -> int:
+        source = Chroma(client=client, collection_name=name + source_suffix)
+        target = Chroma(client=client, collection_name=name + target_suffix, embedding_function=embeddings)
+        return copy_collection(source, target, batch_size)
+
+    added = {}
+    existing = {collection.name for collection in civil_code_client.list_collections()}
+    if CIVIL_CODE_COLLECTION + source_suffix in existing:
+        added[CIVIL_CODE_COLLECTION] = copy(civil_code_client, CIVIL_CODE_COLLECTION)
+    for name in base_names(internal_client, source_suffix):
+        added[name] = copy(internal_client, name)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--from", dest="source", default=EMBEDDING_BACKEND, help="Backend to copy from")
+    parser.add_argument("--to", dest="target", required=True, help="Backend to re-embed with")
+    args = parser.parse_args()
+    if args.source == args.target:
+        parser.error("--from and --to must be different backends")
+
+    import chromadb
+    from chromadb.config import Settings
+
+    settings = Settings(anonymized_telemetry=False)
+    added = reembed(
+        chromadb.PersistentClient(path=VECTORSTORE_PATH, settings=settings),
+        chromadb.PersistentClient(path=INTERNAL_INDEX_PATH, settings=settings),
+        create_embeddings(args.target),
+        collection_suffix(args.source),
+        collection_suffix(args.target),
+    )
+    for name, count in added.items():
+        print(f"{name}: {count} chunks re-embedded")
+    print(f"Re-embed complete: {len(added)} collections, set EMBEDDING_BACKEND = \"{args.target}\" to use them")
+
+
+if __name__ == "__main__":
+    main()
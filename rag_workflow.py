@@ -1,197 +1,301 @@
 import asyncio
+import hashlib
+import json
 import os
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Annotated, Any, Dict, Iterator, List, Optional, TypedDict
 
 import psutil
-from chromadb.config import Settings
-from langchain_chroma import Chroma
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_google_genai.embeddings import GoogleGenerativeAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langgraph.graph import StateGraph
-from sentence_transformers import CrossEncoder
-
-from chains.clause_extractor import ExtractedClause, clause_extractor_chain, deduplicate_clauses
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, StateGraph
+from langgraph.types import Send
+
+from chains.clause_extractor import (
+    ExtractedClause,
+    clause_extractor_chain,
+    deduplicate_clauses,
+    extract_clauses_locally,
+)
 from chains.document_fields import get_document_fields
-from chains.document_request_detector import document_request_detector_chain
+from chains.document_request_detector import document_request_detector_chain, match_document_request
 from chains.document_suggester import document_suggester_chain
 from chains.document_writer import document_writer_chain
 from chains.generate_answer import generate_chain
 from chains.illegality_detector import illegality_detector_chain
 from chains.internal_docs import internal_docs
-from chains.source_identifier import identify_used_sources
-from config import CHUNK_OVERLAP, CHUNK_SIZE, CLAUSE_CHUNK_OVERLAP, CLAUSE_CHUNK_SIZE, MODEL_NAME
-loop = asyncio.new_event_loop()
-asyncio.set_event_loop(loop)
-
-embeddings = GoogleGenerativeAIEmbeddings(
-    model="gemini-embedding-001",
-    task_type="retrieval_document"
+from chains.source_identifier import aidentify_used_sources, identify_used_sources
+from config import (
+    ANALYSIS_MAX_CONCURRENCY,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_PROMPT_VERSION,
+    ARTICLE_LOOKUP_ENABLED,
+    ARTICLE_LOOKUP_MAX,
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    CLAUSE_CHUNK_OVERLAP,
+    CLAUSE_CHUNK_SIZE,
+    CLAUSE_EXTRACTION_MAX_CONCURRENCY,
+    CLAUSE_SEGMENTER_ENABLED,
+    CLAUSE_SEGMENTER_MIN_COVERAGE,
+    DEFAULT_TENANT_ID,
+    INTERNAL_GRADING_MAX_CONCURRENCY,
+    MODEL_NAME,
+    PDF_PARSE_MAX_WORKERS,
+    RERANK_ENABLED,
+    RERANK_FETCH_K,
+    RERANK_THRESHOLD,
+    RERANK_TOP_K,
+    RETRIEVAL_MODE,
 )
-
-vectorstore = Chroma(
-    embedding_function=embeddings,
-    persist_directory="./db",
-    client_settings=Settings(
-        anonymized_telemetry=False,
-        is_persistent=True,
-    )
+from resources import (
+    get_answer_cache,
+    get_article_index,
+    get_internal_index_manager,
+    get_reranker,
+    get_retriever,
+    get_vectorstore,
+    ingest_manifest_path,
 )
+from utils.pdf_loader import split_pdf, split_pdfs
 
-retriever_internal = None
-internal_vectorstore_instance = None
-internal_documents_count = 0
-internal_document_names = []
 
+def get_internal_index(tenant_id: str = DEFAULT_TENANT_ID):
+    """Get the internal document index of a condominium."""
+    return get_internal_index_manager().get(tenant_id)
 
-def clear_internal_documents():
-    """Clear all indexed internal documents."""
-    global retriever_internal, internal_vectorstore_instance, internal_documents_count, internal_document_names
 
-    # Reset all internal document state
-    retriever_internal = None
-    internal_vectorstore_instance = None
-    internal_documents_count = 0
-    internal_document_names = []
+def clear_internal_documents(tenant_id: str = DEFAULT_TENANT_ID):
+    """Clear all indexed internal documents of a condominium."""
+    get_internal_index(tenant_id).clear()
 
 
-def get_internal_document_names():
-    """Get list of currently indexed document names."""
-    return internal_document_names.copy()
+def get_internal_document_names(tenant_id: str = DEFAULT_TENANT_ID):
+    """Get list of currently indexed document names of a condominium."""
+    return get_internal_index(tenant_id).document_names
 
 
-def set_internal_retriever(documents: list):
-    """
-    Set up internal document retriever from multiple uploaded documents.
-    Clears any previously indexed documents first.
+def get_internal_documents(tenant_id: str = DEFAULT_TENANT_ID):
+    """Get the indexed documents of a condominium as (content hash, file name) tuples."""
+    return get_internal_index(tenant_id).documents
 
-    Args:
-        documents: List of tuples (filename, file_bytes)
+
+def _split_internal_document(filename: str, file_bytes: bytes) -> list:
+    """Parse an uploaded PDF in memory and split it into chunks."""
+    return split_pdf(file_bytes, filename, CHUNK_SIZE, CHUNK_OVERLAP)
+
+
+def add_internal_document(filename: str, file_bytes: bytes,
+                          tenant_id: str = DEFAULT_TENANT_ID) -> str:
     """
-    global retriever_internal, internal_vectorstore_instance, internal_documents_count, internal_document_names
+    Add one document to the internal index of a condominium.
 
-    # Clear existing documents first
-    clear_internal_documents()
+    Documents are keyed by content hash, so a document that is already
+    indexed (even under another name) is neither parsed nor embedded again.
 
-    all_splits = []
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-    )
+    Returns:
+        The content hash of the document.
+    """
+    document_hash = hashlib.sha256(file_bytes).hexdigest()
+    index = get_internal_index(tenant_id)
+    if document_hash not in index:
+        index.add_document(filename, document_hash, _split_internal_document(filename, file_bytes))
+    return document_hash
 
-    for idx, (filename, file_bytes) in enumerate(documents):
-        temp_path = f"internal_doc_{idx}.pdf"
-        try:
-            with open(temp_path, "wb") as f:
-                f.write(file_bytes)
-            loader = PyPDFLoader(temp_path)
-            docs = loader.load()
 
-            # Add source metadata
-            for doc in docs:
-                doc.metadata["source_file"] = filename
+def add_internal_documents(documents: list, tenant_id: str = DEFAULT_TENANT_ID) -> List[Dict[str, Any]]:
+    """
+    Add several documents to the internal index of a condominium.
 
-            splits = text_splitter.split_documents(docs)
-            all_splits.extend(splits)
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-
-    if all_splits:
-        # Use in-memory storage to avoid database locking issues
-        internal_vectorstore_instance = Chroma.from_documents(
-            documents=all_splits,
-            embedding=embeddings,
-            collection_name="internal_docs",
-        )
-        retriever_internal = internal_vectorstore_instance.as_retriever()
-        internal_documents_count = len(documents)
-        internal_document_names = [name for name, _ in documents]
+    Documents that are not indexed yet are parsed in parallel processes and
+    indexed in upload order. A document that fails is reported and the
+    others are still indexed.
 
-    return len(documents)
+    Args:
+        documents: List of tuples (filename, file_bytes)
+        tenant_id: Condominium identifier
 
+    Returns:
+        One dict per document with its name, document_hash, status
+        ("added", "already_indexed" or "failed") and error.
+    """
+    index = get_internal_index(tenant_id)
+    hashes = [hashlib.sha256(file_bytes).hexdigest() for _, file_bytes in documents]
+
+    # Parse each new document once, even if it was uploaded twice
+    to_parse = {}
+    for (filename, file_bytes), document_hash in zip(documents, hashes):
+        if document_hash not in index and document_hash not in to_parse:
+            to_parse[document_hash] = (filename, file_bytes)
+    parsed = dict(zip(to_parse, split_pdfs(
+        list(to_parse.values()), CHUNK_SIZE, CHUNK_OVERLAP, max_workers=PDF_PARSE_MAX_WORKERS
+    )))
+
+    results = []
+    for (filename, _), document_hash in zip(documents, hashes):
+        result = {"name": filename, "document_hash": document_hash, "status": "already_indexed", "error": None}
+        pdf = parsed.get(document_hash)
+        if pdf is not None and pdf.error is not None:
+            result.update(status="failed", error=pdf.error)
+        elif pdf is not None:
+            try:
+                if index.add_document(filename, document_hash, pdf.chunks):
+                    result["status"] = "added"
+            except Exception as e:
+                print(f"Error indexing {filename}: {e}")
+                result.update(status="failed", error=str(e))
+        results.append(result)
+
+    return results
+
+
+def remove_internal_document(document_hash: str, tenant_id: str = DEFAULT_TENANT_ID) -> bool:
+    """Remove one document, by content hash, from the internal index of a condominium."""
+    return get_internal_index(tenant_id).remove_document(document_hash)
+
+
+def set_internal_retriever(documents: list, tenant_id: str = DEFAULT_TENANT_ID):
+    """
+    Make the internal index of a condominium hold exactly the given documents.
 
-llm = ChatGoogleGenerativeAI(model=MODEL_NAME)
-retriever = vectorstore.as_retriever()
+    Only documents that are not indexed yet are parsed and embedded, and
+    indexed documents missing from the list are removed.
 
+    Args:
+        documents: List of tuples (filename, file_bytes)
+        tenant_id: Condominium identifier
+    """
+    wanted = {hashlib.sha256(file_bytes).hexdigest() for _, file_bytes in documents}
+    for document_hash, _ in get_internal_documents(tenant_id):
+        if document_hash not in wanted:
+            remove_internal_document(document_hash, tenant_id)
 
-def retrieve(state):
-    question = state["question"]
+    add_internal_documents(documents, tenant_id)
+
+    return len(documents)
 
-    docs = retriever.invoke(question)
 
-    # Deduplicate documents by page_content
+def _dedupe(docs: list) -> list:
+    """Deduplicate documents by page_content, keeping the first occurrence."""
     seen_content = set()
     unique_docs = []
     for doc in docs:
         if doc.page_content not in seen_content:
             seen_content.add(doc.page_content)
             unique_docs.append(doc)
+    return unique_docs
 
-    return {"documents": unique_docs, "question": question}
 
+def _retrieve_kwargs() -> Dict[str, Any]:
+    # Over-retrieve so the reranker has candidates to choose from
+    return {"k": RERANK_FETCH_K} if RERANK_ENABLED else {}
 
-def retrieve_internal_docs(state):
-    question = state["question"]
 
-    docs = retriever_internal.invoke(question)
-    return {"internal_documents": docs}
+def cited_articles(text: str) -> list:
+    """Civil Code articles cited by number in a text, looked up directly instead of searched."""
+    if not ARTICLE_LOOKUP_ENABLED:
+        return []
+    try:
+        return get_article_index().find(text, limit=ARTICLE_LOOKUP_MAX)
+    except Exception as e:
+        print(f"Error looking up cited articles: {e}")
+        return []
 
 
-reranker_model = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+def retrieve(state):
+    question = state["question"]
+    cited = cited_articles(question)
+    docs = get_retriever().invoke(question, **_retrieve_kwargs())
+    return {"documents": _dedupe(cited + docs), "cited_documents": cited, "question": question}
 
 
-def evaluate(state):
+async def aretrieve(state):
     question = state["question"]
-    documents = state["documents"]
+    cited = cited_articles(question)
+    docs = await get_retriever().ainvoke(question, **_retrieve_kwargs())
+    return {"documents": _dedupe(cited + docs), "cited_documents": cited, "question": question}
 
-    doc_pairs = [[question, doc.page_content] for doc in documents]
 
-    scores = reranker_model.predict(doc_pairs)
+def _internal_retriever(state):
+    return get_internal_index(state.get("tenant_id") or DEFAULT_TENANT_ID).retriever
 
-    filtered_docs = []
 
-    THRESHOLD = -3.0
-    for doc, score in zip(documents, scores):
-        if score > THRESHOLD:
-            filtered_docs.append(doc)
+def retrieve_internal_docs(state):
+    docs = _internal_retriever(state).invoke(state["question"])
+    return {"internal_documents": docs}
 
-    return {"documents": filtered_docs, "question": question}
 
+async def aretrieve_internal_docs(state):
+    docs = await _internal_retriever(state).ainvoke(state["question"])
+    return {"internal_documents": docs}
 
-def internal(state):
+
+def rerank_documents(state):
+    """Keep only the best cross-encoder scored documents for generation."""
     question = state["question"]
-    internal_documents = state["internal_documents"]
-    documents = state["documents"]
+    # Articles the question cites are always kept, ahead of the reranked ones
+    cited = state.get("cited_documents") or []
+    cited_content = {doc.page_content for doc in cited}
+    candidates = [doc for doc in state["documents"] if doc.page_content not in cited_content]
+    documents = get_reranker().rerank(
+        question,
+        candidates,
+        top_k=RERANK_TOP_K,
+        threshold=RERANK_THRESHOLD,
+    )
 
-    for doc in internal_documents:
-        internal_relevance = internal_docs.invoke({
-            "question": question,
-            "document": doc
-        })
-        if internal_relevance.score.lower() == "sim":
-            documents = documents + [doc]
+    return {"documents": cited + documents, "question": question}
+
+
+async def arerank_documents(state):
+    # The cross-encoder runs locally and is CPU-bound: keep it off the event loop
+    return await asyncio.to_thread(rerank_documents, state)
+
+
+def _grading_inputs(state) -> List[Dict[str, Any]]:
+    return [{"question": state["question"], "document": doc} for doc in state["internal_documents"]]
 
-    # Deduplicate documents by page_content
-    seen_content = set()
-    unique_documents = []
-    for doc in documents:
-        if doc.page_content not in seen_content:
-            seen_content.add(doc.page_content)
-            unique_documents.append(doc)
+
+def _merge_relevant(state, evaluations) -> Dict[str, Any]:
+    documents = list(state["documents"])
+    for doc, internal_relevance in zip(state["internal_documents"], evaluations):
+        if isinstance(internal_relevance, Exception):
+            print(f"Error grading internal document: {internal_relevance}")
+            continue
+        if internal_relevance.score.lower() == "sim":
+            documents.append(doc)
 
     return {
-        "documents": unique_documents,
-        "question": question,
+        "documents": _dedupe(documents),
+        "question": state["question"],
         "document_evaluations": state.get("document_evaluations", []),
     }
 
 
+def internal(state):
+    # Grade all retrieved chunks concurrently instead of one round-trip each
+    evaluations = internal_docs.batch(
+        _grading_inputs(state),
+        config={"max_concurrency": INTERNAL_GRADING_MAX_CONCURRENCY},
+        return_exceptions=True,
+    )
+    return _merge_relevant(state, evaluations)
+
+
+async def ainternal(state):
+    evaluations = await internal_docs.abatch(
+        _grading_inputs(state),
+        config={"max_concurrency": INTERNAL_GRADING_MAX_CONCURRENCY},
+        return_exceptions=True,
+    )
+    return _merge_relevant(state, evaluations)
+
+
 def generate_answer(state):
     question = state["question"]
     documents = state["documents"]
@@ -203,10 +307,23 @@ def generate_answer(state):
     return {"documents": documents, "question": question, "solution": solution}
 
 
+async def agenerate_answer(state):
+    question = state["question"]
+    documents = state["documents"]
+
+    solution = await generate_chain.ainvoke({
+        "context": documents,
+        "question": question,
+    })
+    return {"documents": documents, "question": question, "solution": solution}
+
+
 class GraphState(TypedDict):
     question: str
+    tenant_id: Optional[str]
     solution: str
     documents: List[str]
+    cited_documents: Optional[List[str]]
     internal_documents: Optional[List[str]]
     document_evaluations: Optional[List[Dict[str, Any]]]
     document_relevance_score: Optional[Dict[str, Any]]
@@ -214,8 +331,8 @@ class GraphState(TypedDict):
 
 
 def check_internal_docs_available(state):
-    """Check if internal documents retriever is available."""
-    if retriever_internal is None:
+    """Check if the condominium has internal documents indexed."""
+    if get_internal_index(state.get("tenant_id") or DEFAULT_TENANT_ID).is_empty:
         return "no_internal"
     return "has_internal"
 
@@ -223,16 +340,25 @@ def check_internal_docs_available(state):
 def create_graph():
     workflow = StateGraph(GraphState)
 
-    workflow.add_node("Retrieve Documents", retrieve)
-    workflow.add_node("Retrieve Internal Documents", retrieve_internal_docs)
-    workflow.add_node("Check Internal Docs", internal)
-    workflow.add_node("Generate Answer", generate_answer)
+    # Every node has a sync and an async body, so the graph runs natively
+    # under both invoke() and ainvoke()
+    workflow.add_node("Retrieve Documents", RunnableLambda(retrieve, aretrieve))
+    workflow.add_node("Retrieve Internal Documents",
+                      RunnableLambda(retrieve_internal_docs, aretrieve_internal_docs))
+    workflow.add_node("Check Internal Docs", RunnableLambda(internal, ainternal))
+    workflow.add_node("Generate Answer", RunnableLambda(generate_answer, agenerate_answer))
 
     workflow.set_entry_point("Retrieve Documents")
 
+    retrieval_step = "Retrieve Documents"
+    if RERANK_ENABLED:
+        workflow.add_node("Rerank Documents", RunnableLambda(rerank_documents, arerank_documents))
+        workflow.add_edge("Retrieve Documents", "Rerank Documents")
+        retrieval_step = "Rerank Documents"
+
     # After retrieving external docs, check if we have internal docs
     workflow.add_conditional_edges(
-        "Retrieve Documents",
+        retrieval_step,
         check_internal_docs_available,
         {
             "no_internal": "Generate Answer",
@@ -246,17 +372,25 @@ def create_graph():
     return workflow.compile()
 
 
-def recreate_graph():
-    """Recreate the graph (call after loading internal documents)."""
+graph = None
+
+
+def get_graph():
+    """Get the compiled QA graph, building it on first use."""
     global graph
-    graph = create_graph()
+    if graph is None:
+        graph = create_graph()
+    return graph
 
 
-graph = create_graph()
+def recreate_graph():
+    """Recreate the graph (internal documents are looked up per question, so this is rarely needed)."""
+    global graph
+    graph = create_graph()
 
 
 def generate_graph_diagram():
-    graph.get_graph().draw_png("rag_workflow_diagram.png")
+    get_graph().get_graph().draw_png("rag_workflow_diagram.png")
 
 
 def _get_footprint() -> Dict[str, float]:
@@ -285,30 +419,252 @@ def timer(label: str):
         print(f"{label} Elapsed time: {end - start:.4f} seconds")
 
 
-def process_question(question):
+def _ingest_version() -> str:
+    """Version of the Civil Code corpus in the configured backend's collection, as recorded by ingest/ingest.py."""
+    try:
+        with open(ingest_manifest_path(), "r", encoding="utf-8") as f:
+            return json.load(f).get("version", "")
+    except (OSError, ValueError):
+        return ""
+
+
+def _context_fingerprint(tenant_id: str = DEFAULT_TENANT_ID) -> str:
+    """Identify what an answer was built from: Civil Code collection, internal documents, model and prompts."""
+    collection = get_vectorstore()._collection
+    internal_fingerprint = get_internal_index(tenant_id).fingerprint
+    return (
+        f"{collection.id}:{collection.count()}:{_ingest_version()}:{RETRIEVAL_MODE}:{internal_fingerprint}"
+        f":{MODEL_NAME}:{ANSWER_PROMPT_VERSION}"
+    )
+
+
+def _get_cached_answer(question: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    try:
+        return get_answer_cache().get(question, fingerprint)
+    except Exception as e:
+        print(f"Error reading answer cache: {e}")
+        return None
+
+
+def _cache_answer(question: str, fingerprint: str, result: Dict[str, Any]):
+    try:
+        get_answer_cache().set(question, fingerprint, result)
+    except Exception as e:
+        print(f"Error writing answer cache: {e}")
+
+
+def process_question(question, tenant_id: str = DEFAULT_TENANT_ID):
     before = _get_footprint()
     with timer("RAG Workflow"):
-        result = graph.invoke(input={"question": question})
+        result = None
+        if ANSWER_CACHE_ENABLED:
+            fingerprint = _context_fingerprint(tenant_id)
+            result = _get_cached_answer(question, fingerprint)
+
+        if result is None:
+            result = get_graph().invoke(input={"question": question, "tenant_id": tenant_id})
+            if ANSWER_CACHE_ENABLED:
+                _cache_answer(question, fingerprint, result)
     after = _get_footprint()
     footprint = _get_diff_footprint(before, after)
     return result, footprint
 
 
+async def aprocess_question(question, tenant_id: str = DEFAULT_TENANT_ID):
+    """Async process_question: many questions can be answered concurrently on one event loop."""
+    before = _get_footprint()
+    with timer("RAG Workflow"):
+        result = None
+        if ANSWER_CACHE_ENABLED:
+            # Cache and collection lookups are blocking disk reads
+            fingerprint = await asyncio.to_thread(_context_fingerprint, tenant_id)
+            result = await asyncio.to_thread(_get_cached_answer, question, fingerprint)
+
+        if result is None:
+            result = await get_graph().ainvoke(input={"question": question, "tenant_id": tenant_id})
+            if ANSWER_CACHE_ENABLED:
+                await asyncio.to_thread(_cache_answer, question, fingerprint, result)
+    after = _get_footprint()
+    footprint = _get_diff_footprint(before, after)
+    return result, footprint
+
+
+def _message_text(message) -> str:
+    """Text of a streamed message chunk (content may be a string or a list of blocks)."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block if isinstance(block, str) else block.get("text", "")
+        for block in content
+        if isinstance(block, str) or block.get("type") == "text"
+    )
+
+
+class AnswerStream:
+    """
+    Iterator over the answer tokens of a question, as they are generated.
+
+    Once exhausted, result holds the final graph state (the same dict
+    process_question returns) and footprint the resource usage.
+    """
+
+    def __init__(self, question: str, tenant_id: str = DEFAULT_TENANT_ID):
+        self.question = question
+        self.tenant_id = tenant_id
+        self.result: Optional[Dict[str, Any]] = None
+        self.footprint: Optional[Dict[str, float]] = None
+
+    def __iter__(self) -> Iterator[str]:
+        before = _get_footprint()
+        with timer("RAG Workflow (streaming)"):
+            yield from self._stream()
+        self.footprint = _get_diff_footprint(before, _get_footprint())
+
+    def _stream(self) -> Iterator[str]:
+        if ANSWER_CACHE_ENABLED:
+            fingerprint = _context_fingerprint(self.tenant_id)
+            cached = _get_cached_answer(self.question, fingerprint)
+            if cached is not None:
+                self.result = cached
+                yield cached["solution"]
+                return
+
+        stream = get_graph().stream(
+            input={"question": self.question, "tenant_id": self.tenant_id},
+            stream_mode=["messages", "values"],
+        )
+        for mode, payload in stream:
+            if mode == "values":
+                self.result = payload
+                continue
+            message, metadata = payload
+            # Only the answer is streamed (graders also run chat models)
+            if metadata.get("langgraph_node") == "Generate Answer":
+                text = _message_text(message)
+                if text:
+                    yield text
+
+        if ANSWER_CACHE_ENABLED:
+            _cache_answer(self.question, fingerprint, self.result)
+
+
+def stream_question(question: str, tenant_id: str = DEFAULT_TENANT_ID) -> AnswerStream:
+    """Answer a question, streaming the answer tokens (see AnswerStream)."""
+    return AnswerStream(question, tenant_id)
+
+
+def _document_request_to_dict(result) -> dict:
+    return {
+        "is_explicit_request": result.is_explicit_request,
+        "document_type": result.document_type,
+        "document_name": result.document_name,
+        "extracted_context": result.extracted_context
+    }
+
+
 def detect_explicit_document_request(question: str) -> dict:
     """Detect if the user is explicitly requesting a document to be written."""
+    # Obvious requests are recognized locally, without a model call
+    local = match_document_request(question)
+    if local is not None:
+        return _document_request_to_dict(local)
+
     try:
         result = document_request_detector_chain.invoke({"question": question})
-        return {
-            "is_explicit_request": result.is_explicit_request,
-            "document_type": result.document_type,
-            "document_name": result.document_name,
-            "extracted_context": result.extracted_context
-        }
+        return _document_request_to_dict(result)
     except Exception as e:
         print(f"Error detecting document request: {e}")
         return {"is_explicit_request": False}
 
 
+def opens_document_form(document_request: dict) -> bool:
+    """Whether a detected request leads to the document form instead of an answer."""
+    return bool(document_request.get("is_explicit_request") and document_request.get("document_type"))
+
+
+_STREAM_DONE = object()
+
+
+class SpeculativeAnswer:
+    """
+    Detect an explicit document request while the answer is already being generated.
+
+    The RAG answer starts in a background thread as soon as the object is
+    created, and its tokens are buffered while the request detector runs.
+    If the question turns out to be a document request that opens the
+    document form (see opens_document_form), the answer is cancelled; otherwise iterating yields the buffered tokens and
+    then the rest of the answer, like AnswerStream. Questions the local
+    pre-filter recognizes as document requests never start the answer.
+    """
+
+    def __init__(self, question: str, tenant_id: str = DEFAULT_TENANT_ID):
+        self.stream = AnswerStream(question, tenant_id)
+        self._tokens: "queue.Queue" = queue.Queue()
+        self._cancelled = threading.Event()
+
+        local = match_document_request(question)
+        if local is not None and opens_document_form(_document_request_to_dict(local)):
+            self.document_request = _document_request_to_dict(local)
+            self._cancelled.set()
+            self._tokens.put(_STREAM_DONE)
+            return
+
+        threading.Thread(target=self._produce, daemon=True).start()
+        self.document_request = detect_explicit_document_request(question)
+        # A request without a document type is answered like any question
+        if opens_document_form(self.document_request):
+            self.cancel()
+
+    def _produce(self):
+        tokens = iter(self.stream)
+        try:
+            for token in tokens:
+                if self._cancelled.is_set():
+                    break
+                self._tokens.put(token)
+        except Exception as e:
+            self._tokens.put(e)
+        finally:
+            # Closing the generator stops the graph run
+            tokens.close()
+            self._tokens.put(_STREAM_DONE)
+
+    def cancel(self):
+        """Stop generating the answer."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def result(self) -> Optional[Dict[str, Any]]:
+        return self.stream.result
+
+    @property
+    def footprint(self) -> Optional[Dict[str, float]]:
+        return self.stream.footprint
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            item = self._tokens.get()
+            if item is _STREAM_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+def _suggestion_to_dict(suggestion) -> dict:
+    return {
+        "should_suggest": suggestion.should_suggest,
+        "document_type": suggestion.document_type,
+        "document_name": suggestion.document_name,
+        "suggestion_message": suggestion.suggestion_message
+    }
+
+
 def check_document_suggestion(question: str, answer: str) -> dict:
     """Check if a document should be suggested based on the question and answer."""
     try:
@@ -316,17 +672,54 @@ def check_document_suggestion(question: str, answer: str) -> dict:
             "question": question,
             "answer": answer
         })
-        return {
-            "should_suggest": suggestion.should_suggest,
-            "document_type": suggestion.document_type,
-            "document_name": suggestion.document_name,
-            "suggestion_message": suggestion.suggestion_message
-        }
+        return _suggestion_to_dict(suggestion)
     except Exception as e:
         print(f"Error checking document suggestion: {e}")
         return {"should_suggest": False}
 
 
+async def acheck_document_suggestion(question: str, answer: str) -> dict:
+    """Async version of check_document_suggestion."""
+    try:
+        suggestion = await document_suggester_chain.ainvoke({
+            "question": question,
+            "answer": answer
+        })
+        return _suggestion_to_dict(suggestion)
+    except Exception as e:
+        print(f"Error checking document suggestion: {e}")
+        return {"should_suggest": False}
+
+
+def post_process_answer(question: str, answer: str, documents: list) -> Dict[str, Any]:
+    """
+    Identify the used sources and check for a document suggestion at the same time.
+
+    Both are independent LLM calls, so running them in parallel saves a
+    round-trip per chat turn.
+
+    Returns:
+        Dict with "sources" (the used documents) and "suggestion".
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sources = executor.submit(identify_used_sources, answer, documents, question)
+        suggestion = executor.submit(check_document_suggestion, question, answer)
+        return {"sources": sources.result(), "suggestion": suggestion.result()}
+
+
+async def apost_process_answer(question: str, answer: str, documents: list) -> Dict[str, Any]:
+    """
+    Async version of post_process_answer.
+
+    Cancelling the awaiting task cancels both LLM calls.
+    """
+    sources, suggestion = await asyncio.gather(
+        aidentify_used_sources(answer, documents, question),
+        acheck_document_suggestion(question, answer),
+    )
+    return {"sources": sources, "suggestion": suggestion}
+
+
 def write_document(document_type: str, document_name: str,
                    original_question: str, previous_answer: str,
                    additional_info: str = "") -> str:
@@ -378,29 +771,36 @@ class DocumentAnalysisReport:
 
 
 # Analysis workflow state
+def merge_clause_results(left: List[Dict[str, Any]],
+                         right: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge per-clause analysis results, keeping them in clause order."""
+    return sorted(left + right, key=lambda r: r["clause_index"])
+
+
 class AnalysisState(TypedDict):
     document_chunks: List[str]
+    chunk_metadata: List[Dict[str, Any]]
     extracted_clauses: List[Dict[str, Any]]
-    current_clause_index: int
-    relevant_articles: str
-    analysis_results: List[Dict[str, Any]]
+    analysis_results: Annotated[List[Dict[str, Any]], merge_clause_results]
 
 
-def extract_clauses_node(state: AnalysisState) -> AnalysisState:
-    """Extract clauses from all document chunks."""
+class ClauseTask(TypedDict):
+    clause_index: int
+    clause: Dict[str, Any]
+
+
+def _collect_clauses(results) -> Dict[str, Any]:
     all_clauses = []
-    for chunk in state["document_chunks"]:
-        try:
-            result = clause_extractor_chain.invoke({"document_chunk": chunk})
-            for clause in result.clauses:
-                all_clauses.append({
-                    "clause_number": clause.clause_number,
-                    "clause_text": clause.clause_text,
-                    "topic": clause.topic
-                })
-        except Exception as e:
-            print(f"Error extracting clauses from chunk: {e}")
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"Error extracting clauses from chunk: {result}")
             continue
+        for clause in result.clauses:
+            all_clauses.append({
+                "clause_number": clause.clause_number,
+                "clause_text": clause.clause_text,
+                "topic": clause.topic
+            })
 
     # Deduplicate based on clause_number
     seen = set()
@@ -410,178 +810,247 @@ def extract_clauses_node(state: AnalysisState) -> AnalysisState:
             seen.add(clause["clause_number"])
             unique_clauses.append(clause)
 
-    return {
-        **state,
-        "extracted_clauses": unique_clauses,
-        "current_clause_index": 0,
-        "analysis_results": []
-    }
+    return {"extracted_clauses": unique_clauses}
 
 
-def retrieve_relevant_articles_node(state: AnalysisState) -> AnalysisState:
-    """Retrieve relevant Civil Code articles for the current clause."""
-    if state["current_clause_index"] >= len(state["extracted_clauses"]):
-        return state
+def _segment_chunks(state: AnalysisState) -> list:
+    """Rule-based results per chunk, None for the chunks left to the LLM extractor."""
+    chunks = state["document_chunks"]
+    if not CLAUSE_SEGMENTER_ENABLED:
+        return [None] * len(chunks)
+    metadata = state.get("chunk_metadata") or [{}] * len(chunks)
+    return [
+        extract_clauses_locally(chunk, CLAUSE_SEGMENTER_MIN_COVERAGE, chunk_metadata)
+        for chunk, chunk_metadata in zip(chunks, metadata)
+    ]
 
-    clause = state["extracted_clauses"][state["current_clause_index"]]
 
+def extract_clauses_node(state: AnalysisState) -> Dict[str, Any]:
+    """Extract clauses from all document chunks."""
+    chunks = state["document_chunks"]
+    results = _segment_chunks(state)
+    pending = [idx for idx, result in enumerate(results) if result is None]
+
+    # Chunks are extracted concurrently; batch() keeps results in chunk order
+    # so the clause_number dedup still keeps the first occurrence
+    extracted = clause_extractor_chain.batch(
+        [{"document_chunk": chunks[idx]} for idx in pending],
+        config={"max_concurrency": CLAUSE_EXTRACTION_MAX_CONCURRENCY},
+        return_exceptions=True,
+    )
+    for idx, result in zip(pending, extracted):
+        results[idx] = result
+    return _collect_clauses(results)
+
+
+async def aextract_clauses_node(state: AnalysisState) -> Dict[str, Any]:
+    chunks = state["document_chunks"]
+    results = _segment_chunks(state)
+    pending = [idx for idx, result in enumerate(results) if result is None]
+
+    extracted = await clause_extractor_chain.abatch(
+        [{"document_chunk": chunks[idx]} for idx in pending],
+        config={"max_concurrency": CLAUSE_EXTRACTION_MAX_CONCURRENCY},
+        return_exceptions=True,
+    )
+    for idx, result in zip(pending, extracted):
+        results[idx] = result
+    return _collect_clauses(results)
+
+
+def dispatch_clauses(state: AnalysisState):
+    """Fan out one analysis task per extracted clause."""
+    if not state["extracted_clauses"]:
+        return END
+
+    return [
+        Send("Analyze Clause", {"clause_index": idx, "clause": clause})
+        for idx, clause in enumerate(state["extracted_clauses"])
+    ]
+
+
+def _clause_query(clause: Dict[str, Any]) -> str:
     # Build query based on clause topic and content
-    query = f"Código Civil {clause['topic']} condomínio {clause['clause_text'][:200]}"
+    return f"Código Civil {clause['topic']} condomínio {clause['clause_text'][:200]}"
 
+
+def _format_articles(docs: list) -> str:
+    return "\n\n".join([doc.page_content for doc in docs[:5]])
+
+
+def retrieve_relevant_articles(clause: Dict[str, Any]) -> str:
+    """Retrieve relevant Civil Code articles for a clause, starting with the ones it cites."""
     try:
-        docs = retriever.invoke(query)
-        relevant_articles = "\n\n".join([doc.page_content for doc in docs[:5]])
+        docs = get_retriever().invoke(_clause_query(clause))
+        return _format_articles(_dedupe(cited_articles(clause["clause_text"]) + docs))
     except Exception as e:
         print(f"Error retrieving articles: {e}")
-        relevant_articles = ""
+        return ""
 
-    return {**state, "relevant_articles": relevant_articles}
 
+async def aretrieve_relevant_articles(clause: Dict[str, Any]) -> str:
+    try:
+        docs = await get_retriever().ainvoke(_clause_query(clause))
+        return _format_articles(_dedupe(cited_articles(clause["clause_text"]) + docs))
+    except Exception as e:
+        print(f"Error retrieving articles: {e}")
+        return ""
 
-def analyze_clause_node(state: AnalysisState) -> AnalysisState:
-    """Analyze the current clause for potential illegality."""
-    if state["current_clause_index"] >= len(state["extracted_clauses"]):
-        return state
 
-    clause = state["extracted_clauses"][state["current_clause_index"]]
+def _detector_input(clause: Dict[str, Any], relevant_articles: str) -> Dict[str, Any]:
+    return {
+        "clause_number": clause["clause_number"],
+        "clause_topic": clause["topic"],
+        "clause_text": clause["clause_text"],
+        "relevant_articles": relevant_articles
+    }
 
-    try:
-        analysis = illegality_detector_chain.invoke({
-            "clause_number": clause["clause_number"],
-            "clause_topic": clause["topic"],
-            "clause_text": clause["clause_text"],
-            "relevant_articles": state["relevant_articles"]
-        })
 
-        result = {
-            "clause_number": clause["clause_number"],
-            "clause_text": clause["clause_text"],
-            "topic": clause["topic"],
-            "is_potentially_illegal": analysis.is_potentially_illegal,
-            "confidence": analysis.confidence,
-            "conflicting_articles": analysis.conflicting_articles,
-            "explanation": analysis.explanation,
-            "legal_principle_violated": analysis.legal_principle_violated,
-            "recommendation": analysis.recommendation
-        }
-    except Exception as e:
-        print(f"Error analyzing clause: {e}")
-        result = {
-            "clause_number": clause["clause_number"],
-            "clause_text": clause["clause_text"],
-            "topic": clause["topic"],
-            "is_potentially_illegal": False,
-            "confidence": "baixa",
-            "conflicting_articles": [],
-            "explanation": f"Erro na análise: {str(e)}",
-            "legal_principle_violated": None,
-            "recommendation": "Revisar manualmente"
-        }
+def _clause_result(task: ClauseTask, analysis) -> Dict[str, Any]:
+    clause = task["clause"]
+    result = {
+        "clause_number": clause["clause_number"],
+        "clause_text": clause["clause_text"],
+        "topic": clause["topic"],
+        "is_potentially_illegal": analysis.is_potentially_illegal,
+        "confidence": analysis.confidence,
+        "conflicting_articles": analysis.conflicting_articles,
+        "explanation": analysis.explanation,
+        "legal_principle_violated": analysis.legal_principle_violated,
+        "recommendation": analysis.recommendation,
+        "clause_index": task["clause_index"],
+    }
+    return {"analysis_results": [result]}
+
+
+def _clause_error_result(task: ClauseTask, error: Exception) -> Dict[str, Any]:
+    print(f"Error analyzing clause: {error}")
+    clause = task["clause"]
+    result = {
+        "clause_number": clause["clause_number"],
+        "clause_text": clause["clause_text"],
+        "topic": clause["topic"],
+        "is_potentially_illegal": False,
+        "confidence": "baixa",
+        "conflicting_articles": [],
+        "explanation": f"Erro na análise: {str(error)}",
+        "legal_principle_violated": None,
+        "recommendation": "Revisar manualmente",
+        "clause_index": task["clause_index"],
+    }
+    return {"analysis_results": [result]}
+
 
-    new_results = state["analysis_results"] + [result]
-    new_index = state["current_clause_index"] + 1
+def analyze_clause_node(task: ClauseTask) -> Dict[str, Any]:
+    """Retrieve articles for a single clause and analyze it for potential illegality."""
+    clause = task["clause"]
+    relevant_articles = retrieve_relevant_articles(clause)
 
-    return {**state, "analysis_results": new_results, "current_clause_index": new_index}
+    try:
+        analysis = illegality_detector_chain.invoke(_detector_input(clause, relevant_articles))
+    except Exception as e:
+        return _clause_error_result(task, e)
+    return _clause_result(task, analysis)
 
 
-def should_continue(state: AnalysisState) -> str:
-    """Determine if there are more clauses to analyze."""
-    if state["current_clause_index"] < len(state["extracted_clauses"]):
-        return "continue"
-    return "complete"
+async def aanalyze_clause_node(task: ClauseTask) -> Dict[str, Any]:
+    clause = task["clause"]
+    relevant_articles = await aretrieve_relevant_articles(clause)
+
+    try:
+        analysis = await illegality_detector_chain.ainvoke(_detector_input(clause, relevant_articles))
+    except Exception as e:
+        return _clause_error_result(task, e)
+    return _clause_result(task, analysis)
 
 
 def create_analysis_graph():
-    """Create the document analysis workflow graph."""
+    """Create the document analysis workflow graph.
+
+    Clauses are analyzed in parallel: each extracted clause is sent to its
+    own "Analyze Clause" task and the results are merged back in clause order.
+    """
     workflow = StateGraph(AnalysisState)
 
-    workflow.add_node("Extract Clauses", extract_clauses_node)
-    workflow.add_node("Retrieve Articles", retrieve_relevant_articles_node)
-    workflow.add_node("Analyze Clause", analyze_clause_node)
+    workflow.add_node("Extract Clauses", RunnableLambda(extract_clauses_node, aextract_clauses_node))
+    workflow.add_node("Analyze Clause", RunnableLambda(analyze_clause_node, aanalyze_clause_node))
 
     workflow.set_entry_point("Extract Clauses")
-    workflow.add_edge("Extract Clauses", "Retrieve Articles")
-    workflow.add_edge("Retrieve Articles", "Analyze Clause")
-
-    workflow.add_conditional_edges(
-        "Analyze Clause",
-        should_continue,
-        {
-            "continue": "Retrieve Articles",
-            "complete": "__end__"
-        }
-    )
+    workflow.add_conditional_edges("Extract Clauses", dispatch_clauses, ["Analyze Clause", END])
+    workflow.add_edge("Analyze Clause", END)
 
     return workflow.compile()
 
 
-analysis_graph = create_analysis_graph()
+analysis_graph = None
 
 
-def analyze_document(document_bytes: bytes, document_name: str) -> DocumentAnalysisReport:
-    """Analyze a condominium document for potentially illegal clauses."""
-    # Save document temporarily
-    temp_path = "temp_analysis_doc.pdf"
-    with open(temp_path, "wb") as f:
-        f.write(document_bytes)
+def get_analysis_graph():
+    """Get the compiled document analysis graph, building it on first use."""
+    global analysis_graph
+    if analysis_graph is None:
+        analysis_graph = create_analysis_graph()
+    return analysis_graph
 
-    try:
-        # Load and split document
-        loader = PyPDFLoader(temp_path)
-        docs = loader.load()
 
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CLAUSE_CHUNK_SIZE,
-            chunk_overlap=CLAUSE_CHUNK_OVERLAP,
-        )
-        splits = text_splitter.split_documents(docs)
-        chunks = [doc.page_content for doc in splits]
-
-        # Run analysis workflow
-        initial_state: AnalysisState = {
-            "document_chunks": chunks,
-            "extracted_clauses": [],
-            "current_clause_index": 0,
-            "relevant_articles": "",
-            "analysis_results": []
-        }
+def _analysis_input(splits: list) -> AnalysisState:
+    return {
+        "document_chunks": [doc.page_content for doc in splits],
+        # Tells the rule-based segmenter which chunks continue a split clause
+        "chunk_metadata": [doc.metadata for doc in splits],
+        "extracted_clauses": [],
+        "analysis_results": []
+    }
 
-        # Set high recursion limit to handle documents with many clauses
-        # Each clause requires 2 iterations (retrieve + analyze)
-        result = analysis_graph.invoke(
-            initial_state,
-            config={"recursion_limit": 500}
-        )
 
-        # Build report
-        clause_results = [
-            ClauseAnalysisResult(
-                clause_number=r["clause_number"],
-                clause_text=r["clause_text"],
-                topic=r["topic"],
-                is_potentially_illegal=r["is_potentially_illegal"],
-                confidence=r["confidence"],
-                conflicting_articles=r["conflicting_articles"],
-                explanation=r["explanation"],
-                legal_principle_violated=r["legal_principle_violated"],
-                recommendation=r["recommendation"]
-            )
-            for r in result["analysis_results"]
-        ]
-
-        illegal_count = sum(1 for c in clause_results if c.is_potentially_illegal)
-
-        report = DocumentAnalysisReport(
-            document_name=document_name,
-            analysis_date=datetime.now().isoformat(),
-            total_clauses_analyzed=len(clause_results),
-            potentially_illegal_count=illegal_count,
-            clauses=clause_results
+def _build_report(document_name: str, result: Dict[str, Any]) -> DocumentAnalysisReport:
+    clause_results = [
+        ClauseAnalysisResult(
+            clause_number=r["clause_number"],
+            clause_text=r["clause_text"],
+            topic=r["topic"],
+            is_potentially_illegal=r["is_potentially_illegal"],
+            confidence=r["confidence"],
+            conflicting_articles=r["conflicting_articles"],
+            explanation=r["explanation"],
+            legal_principle_violated=r["legal_principle_violated"],
+            recommendation=r["recommendation"]
         )
+        for r in result["analysis_results"]
+    ]
 
-        return report
+    illegal_count = sum(1 for c in clause_results if c.is_potentially_illegal)
 
-    finally:
-        # Cleanup temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    return DocumentAnalysisReport(
+        document_name=document_name,
+        analysis_date=datetime.now().isoformat(),
+        total_clauses_analyzed=len(clause_results),
+        potentially_illegal_count=illegal_count,
+        clauses=clause_results
+    )
+
+
+def analyze_document(document_bytes: bytes, document_name: str) -> DocumentAnalysisReport:
+    """Analyze a condominium document for potentially illegal clauses."""
+    splits = split_pdf(document_bytes, document_name, CLAUSE_CHUNK_SIZE, CLAUSE_CHUNK_OVERLAP, pack_units=True)
+
+    # Clauses are analyzed in parallel, capped to avoid hitting API rate limits
+    result = get_analysis_graph().invoke(
+        _analysis_input(splits),
+        config={"max_concurrency": ANALYSIS_MAX_CONCURRENCY}
+    )
+    return _build_report(document_name, result)
+
+
+async def aanalyze_document(document_bytes: bytes, document_name: str) -> DocumentAnalysisReport:
+    """Async analyze_document: clause calls are awaited on the event loop instead of threads."""
+    # PDF parsing is CPU-bound: keep it off the event loop
+    splits = await asyncio.to_thread(
+        split_pdf, document_bytes, document_name, CLAUSE_CHUNK_SIZE, CLAUSE_CHUNK_OVERLAP, pack_units=True
+    )
+
+    result = await get_analysis_graph().ainvoke(
+        _analysis_input(splits),
+        config={"max_concurrency": ANALYSIS_MAX_CONCURRENCY}
+    )
+    return _build_report(document_name, result)
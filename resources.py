@@ -0,0 +1,398 @@
+"""
+Lazily initialized shared resources.
+
+Models, clients and vector stores are created on first use and shared by
+every chain and graph, so importing the app, the tests or the eval script
+does not pay for clients that a given code path never touches. Heavy
+libraries are imported inside the factories for the same reason.
+"""
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from config import (
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_PATH,
+    ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    ANSWER_CACHE_TTL,
+    ARTICLE_INDEX_PATH,
+    EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_MAX_CONCURRENCY,
+    EMBEDDING_MAX_RETRIES,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_RETRY_BACKOFF,
+    EMBEDDING_RETRY_MAX_BACKOFF,
+    EMBEDDING_TASK_TYPE,
+    HYBRID_FETCH_K,
+    INGEST_MANIFEST_PATH,
+    INTERNAL_INDEX_IDLE_SECONDS,
+    INTERNAL_INDEX_MAX_LOADED,
+    INTERNAL_INDEX_PATH,
+    LEXICAL_CONFIDENCE_THRESHOLD,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_MAX_CONNECTIONS,
+    LLM_REQUEST_TIMEOUT,
+    LOCAL_EMBEDDING_BATCH_SIZE,
+    LOCAL_EMBEDDING_DEVICE,
+    LOCAL_EMBEDDING_MODEL_NAME,
+    MODEL_NAME,
+    RERANK_BATCH_SIZE,
+    RERANK_CACHE_SIZE,
+    RERANK_MODEL_NAME,
+    RETRIEVAL_K,
+    RETRIEVAL_MODE,
+    RRF_K,
+    VECTORSTORE_PATH,
+)
+
+# langchain_chroma's default collection name, which the Civil Code has always used
+CIVIL_CODE_COLLECTION = "langchain"
+
+_lock = threading.RLock()
+_registry: Dict[str, Any] = {}
+
+
+def lazy_resource(name: str, factory: Callable[[], Any]) -> Any:
+    """Return the resource registered under name, creating it on first use."""
+    try:
+        return _registry[name]
+    except KeyError:
+        pass
+
+    with _lock:
+        if name not in _registry:
+            _registry[name] = factory()
+        return _registry[name]
+
+
+def is_loaded(name: str) -> bool:
+    """Check if a resource has already been created."""
+    return name in _registry
+
+
+def reset_resources():
+    """Drop all created resources (they are recreated on next use)."""
+    with _lock:
+        _registry.clear()
+
+
+def lazy_runnable(name: str, factory: Callable[[], Runnable]) -> Runnable:
+    """
+    Runnable placeholder that builds the real runnable on first use.
+
+    A RunnableLambda that returns a Runnable invokes it with the same input
+    and config, so invoke, batch, stream and their async variants all work.
+    """
+    return RunnableLambda(lambda _: lazy_resource(name, factory), name=name)
+
+
+def _llm_limits():
+    import httpx
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_llm_http_client():
+    """
+    Keep-alive HTTP connection pool shared by every chat model's sync calls.
+
+    The pool size also caps how many sync LLM requests are in flight per
+    process: once every connection is busy, new requests wait for a free one.
+    """
+    def create():
+        import httpx
+        return httpx.Client(limits=_llm_limits(), timeout=httpx.Timeout(LLM_REQUEST_TIMEOUT, pool=None))
+
+    return lazy_resource("llm_http_client", create)
+
+
+def get_llm_async_http_client():
+    """
+    Async counterpart of get_llm_http_client, used by ainvoke/abatch/astream.
+
+    Async connections belong to the event loop that opened them, so the
+    client keeps one pool of LLM_MAX_CONNECTIONS per running loop. The
+    server runs a single loop, so its async LLM requests share one capped
+    pool; sync and async calls are capped separately.
+    """
+    def create():
+        import asyncio
+        import weakref
+
+        import httpx
+
+        class LoopLocalTransport(httpx.AsyncBaseTransport):
+            def __init__(self):
+                self._transports = weakref.WeakKeyDictionary()
+
+            async def handle_async_request(self, request):
+                loop = asyncio.get_running_loop()
+                transport = self._transports.get(loop)
+                if transport is None:
+                    transport = self._transports[loop] = httpx.AsyncHTTPTransport(limits=_llm_limits())
+                return await transport.handle_async_request(request)
+
+            async def aclose(self):
+                transport = self._transports.pop(asyncio.get_running_loop(), None)
+                if transport is not None:
+                    await transport.aclose()
+
+        return httpx.AsyncClient(
+            transport=LoopLocalTransport(),
+            timeout=httpx.Timeout(LLM_REQUEST_TIMEOUT, pool=None),
+        )
+
+    return lazy_resource("llm_async_http_client", create)
+
+
+def get_genai_client():
+    """Shared google-genai client backed by the pooled HTTP clients."""
+    def create():
+        from google import genai
+        from google.genai.types import HttpOptions
+        return genai.Client(http_options=HttpOptions(
+            httpx_client=get_llm_http_client(),
+            # Also makes the async calls use httpx instead of an unpooled aiohttp session
+            httpx_async_client=get_llm_async_http_client(),
+        ))
+
+    return lazy_resource("genai_client", create)
+
+
+def _chat_model_key(model: str, temperature: float) -> str:
+    return f"chat_model:{model}:{temperature}"
+
+
+def get_chat_model(temperature: float = 0, model: str = MODEL_NAME):
+    """Shared chat model for a model name and temperature."""
+    def create():
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        llm = ChatGoogleGenerativeAI(model=model, temperature=temperature)
+        # The model's validator always builds its own client: release its sync
+        # pool (the async one opens nothing until used) and send requests
+        # through the shared client instead
+        llm.client.close()
+        llm.client = get_genai_client()
+        return llm
+
+    return lazy_resource(_chat_model_key(model, temperature), create)
+
+
+def lazy_chat_model(temperature: float = 0, schema=None, model: str = MODEL_NAME) -> Runnable:
+    """Chat model runnable (optionally with structured output) created on first use."""
+    name = _chat_model_key(model, temperature)
+    if schema is None:
+        return lazy_runnable(f"{name}:runnable", lambda: get_chat_model(temperature, model))
+
+    return lazy_runnable(
+        f"{name}:{schema.__name__}",
+        lambda: get_chat_model(temperature, model).with_structured_output(schema),
+    )
+
+
+def embedding_namespace(backend: Optional[str] = None) -> str:
+    """Model behind an embedding backend, which identifies its vectors in the embedding cache."""
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "local":
+        return f"local:{LOCAL_EMBEDDING_MODEL_NAME}"
+    return f"{EMBEDDING_MODEL_NAME}:{EMBEDDING_TASK_TYPE}"
+
+
+def collection_suffix(backend: Optional[str] = None) -> str:
+    """
+    Suffix of the collections holding the vectors of an embedding backend.
+
+    The Google backend keeps the original collection names. Other backends
+    get their own collections per model, so switching backends never mixes
+    vectors of different models in one collection.
+    """
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "google":
+        return ""
+    digest = hashlib.sha256(embedding_namespace(backend).encode("utf-8")).hexdigest()[:8]
+    return f"__{backend}_{digest}"
+
+
+def ingest_manifest_path(backend: Optional[str] = None) -> str:
+    """Ingest manifest of a backend's Civil Code collection (each collection is synced on its own)."""
+    root, ext = os.path.splitext(INGEST_MANIFEST_PATH)
+    return f"{root}{collection_suffix(backend)}{ext}"
+
+
+def create_embeddings(backend: Optional[str] = None):
+    """
+    Embeddings model of a backend.
+
+    Google requests go through the batched, retrying bulk embedding pipeline;
+    the local model encodes in batches on LOCAL_EMBEDDING_DEVICE. Both sit
+    behind the on-disk embedding cache when enabled.
+    """
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "local":
+        from sentence_transformers import SentenceTransformer
+
+        from utils.local_embeddings import SentenceTransformerEmbeddings
+        embeddings = SentenceTransformerEmbeddings(
+            SentenceTransformer(LOCAL_EMBEDDING_MODEL_NAME, device=LOCAL_EMBEDDING_DEVICE),
+            batch_size=LOCAL_EMBEDDING_BATCH_SIZE,
+        )
+    elif backend == "google":
+        from langchain_google_genai.embeddings import GoogleGenerativeAIEmbeddings
+
+        from utils.embedding_pipeline import BatchedEmbeddings, print_progress
+        embeddings = BatchedEmbeddings(
+            GoogleGenerativeAIEmbeddings(
+                model=EMBEDDING_MODEL_NAME,
+                task_type=EMBEDDING_TASK_TYPE
+            ),
+            batch_size=EMBEDDING_BATCH_SIZE,
+            max_concurrency=EMBEDDING_MAX_CONCURRENCY,
+            max_retries=EMBEDDING_MAX_RETRIES,
+            initial_backoff=EMBEDDING_RETRY_BACKOFF,
+            max_backoff=EMBEDDING_RETRY_MAX_BACKOFF,
+            progress=print_progress,
+        )
+    else:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    if not EMBEDDING_CACHE_ENABLED:
+        return embeddings
+
+    from utils.embedding_cache import CachedEmbeddings
+    return CachedEmbeddings(
+        embeddings,
+        EMBEDDING_CACHE_PATH,
+        namespace=embedding_namespace(backend),
+    )
+
+
+def get_embeddings():
+    """Shared embeddings model of the configured EMBEDDING_BACKEND."""
+    return lazy_resource("embeddings", create_embeddings)
+
+
+def get_vectorstore():
+    """Persistent Civil Code vector store of the configured embedding backend."""
+    def create():
+        from chromadb.config import Settings
+        from langchain_chroma import Chroma
+        return Chroma(
+            collection_name=CIVIL_CODE_COLLECTION + collection_suffix(),
+            embedding_function=get_embeddings(),
+            persist_directory=VECTORSTORE_PATH,
+            client_settings=Settings(
+                anonymized_telemetry=False,
+                is_persistent=True,
+            )
+        )
+
+    return lazy_resource("vectorstore", create)
+
+
+def get_lexical_index():
+    """BM25 index over the chunks stored in the Civil Code vector store (no embedding calls)."""
+    def create():
+        from langchain_core.documents import Document
+
+        from utils.lexical_index import BM25Index
+        stored = get_vectorstore().get(include=["documents", "metadatas"])
+        return BM25Index(
+            Document(id=doc_id, page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])
+        )
+
+    return lazy_resource("lexical_index", create)
+
+
+def get_retriever():
+    """Retriever over the Civil Code, dense, hybrid or lexical as set by RETRIEVAL_MODE."""
+    def create():
+        dense = get_vectorstore().as_retriever(search_kwargs={"k": RETRIEVAL_K})
+        if RETRIEVAL_MODE == "dense":
+            return dense
+
+        from utils.hybrid_retriever import HybridRetriever
+        return HybridRetriever(
+            dense=dense,
+            lexical=get_lexical_index(),
+            mode=RETRIEVAL_MODE,
+            k=RETRIEVAL_K,
+            fetch_k=HYBRID_FETCH_K,
+            rrf_k=RRF_K,
+            confidence_threshold=LEXICAL_CONFIDENCE_THRESHOLD,
+        )
+
+    return lazy_resource("retriever", create)
+
+
+def get_article_index():
+    """Civil Code articles by number, as written by ingest/ingest.py."""
+    def create():
+        from utils.article_index import ArticleIndex
+        return ArticleIndex.load(ARTICLE_INDEX_PATH)
+
+    return lazy_resource("article_index", create)
+
+
+def get_internal_index_manager():
+    """Per-condominium internal document indexes, persisted under INTERNAL_INDEX_PATH."""
+    def create():
+        import chromadb
+        from chromadb.config import Settings
+        from langchain_chroma import Chroma
+
+        from utils.internal_index import InternalIndexManager
+        client = chromadb.PersistentClient(
+            path=INTERNAL_INDEX_PATH,
+            settings=Settings(anonymized_telemetry=False),
+        )
+        return InternalIndexManager(
+            lambda name: Chroma(
+                client=client,
+                collection_name=name + collection_suffix(),
+                embedding_function=get_embeddings(),
+            ),
+            max_loaded=INTERNAL_INDEX_MAX_LOADED,
+            idle_seconds=INTERNAL_INDEX_IDLE_SECONDS,
+        )
+
+    return lazy_resource("internal_index_manager", create)
+
+
+def get_reranker():
+    """Cross-encoder reranker (the model is only loaded when reranking runs)."""
+    def create():
+        from sentence_transformers import CrossEncoder
+
+        from utils.reranker import CachedReranker
+        return CachedReranker(
+            CrossEncoder(RERANK_MODEL_NAME),
+            batch_size=RERANK_BATCH_SIZE,
+            cache_size=RERANK_CACHE_SIZE,
+        )
+
+    return lazy_resource("reranker", create)
+
+
+def get_answer_cache():
+    """Persistent answer cache used by process_question."""
+    def create():
+        from utils.answer_cache import AnswerCache
+        return AnswerCache(
+            ANSWER_CACHE_PATH,
+            ttl_seconds=ANSWER_CACHE_TTL,
+            max_entries=ANSWER_CACHE_MAX_ENTRIES,
+            similarity_threshold=ANSWER_CACHE_SIMILARITY_THRESHOLD,
+            embed_fn=lambda text: get_embeddings().embed_query(text),
+        )
+
+    return lazy_resource("answer_cache", create)
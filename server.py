@@ -0,0 +1,348 @@
+"""
+Headless HTTP API over the RAG workflow, for clients other than the Streamlit app.
+
+    python server.py
+
+Endpoints (the condominium is chosen with the X-Tenant-ID header or the
+tenant_id query parameter):
+
+    GET    /health                  worker pool usage
+    POST   /ask                     {"question": "..."} -> answer, sources and suggestion
+    POST   /analyze                 multipart PDF upload -> 202 with a job id
+    GET    /analyze/{job_id}        job status and, once done, the analysis report
+    GET    /documents               internal documents of the condominium
+    POST   /documents               multipart PDF uploads, added to the index
+    PUT    /documents               multipart PDF uploads, replacing the index
+    DELETE /documents/{hash}        remove one internal document
+
+Questions and analyses run on bounded worker pools. Requests beyond the
+workers wait in a bounded queue, and are rejected with 503 and a
+Retry-After header once it is full, instead of piling up. Uploads larger
+than SERVER_MAX_UPLOAD_MB in total are rejected with 413.
+"""
+import asyncio
+import json
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from config import (
+    DEFAULT_TENANT_ID,
+    SERVER_ANALYSIS_QUEUE_SIZE,
+    SERVER_ANALYSIS_WORKERS,
+    SERVER_ASK_QUEUE_SIZE,
+    SERVER_ASK_WORKERS,
+    SERVER_HOST,
+    SERVER_JOB_HISTORY,
+    SERVER_MAX_UPLOAD_MB,
+    SERVER_PORT,
+)
+from rag_workflow import (
+    aanalyze_document,
+    add_internal_documents,
+    apost_process_answer,
+    aprocess_question,
+    get_internal_documents,
+    remove_internal_document,
+    set_internal_retriever,
+)
+
+
+class WorkerPool:
+    """
+    A fixed number of workers consuming a bounded queue of jobs.
+
+    submit() never waits: it raises asyncio.QueueFull when max_queue jobs
+    are already waiting, so callers can push back on clients.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.busy = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        self._queue = asyncio.Queue(self.max_queue)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": self.workers, "busy": self.busy, "queued": self.queued, "max_queue": self.max_queue}
+
+    def submit(self, job: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Queue a coroutine function and return a future with its result."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((job, future))
+        return future
+
+    async def _work(self):
+        while True:
+            job, future = await self._queue.get()
+            try:
+                # The client may have gone away while the job was queued
+                if future.done():
+                    continue
+                self.busy += 1
+                try:
+                    result = await job()
+                    if not future.done():
+                        future.set_result(result)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                finally:
+                    self.busy -= 1
+            finally:
+                self._queue.task_done()
+
+
+ASK_POOL = web.AppKey("ask_pool", WorkerPool)
+ANALYSIS_POOL = web.AppKey("analysis_pool", WorkerPool)
+JOBS = web.AppKey("jobs", OrderedDict)
+MAX_UPLOAD = web.AppKey("max_upload", int)
+
+
+def _error(status: int, message: str, **headers) -> web.Response:
+    return web.json_response({"error": message}, status=status, headers=headers or None)
+
+
+def _overloaded(pool: WorkerPool) -> web.Response:
+    return _error(503, f"Too many pending {pool.name} requests, try again later", **{"Retry-After": "5"})
+
+
+def _tenant_id(request: web.Request) -> str:
+    return request.headers.get("X-Tenant-ID") or request.query.get("tenant_id") or DEFAULT_TENANT_ID
+
+
+def _document_to_dict(doc) -> Dict[str, Any]:
+    return {
+        "source": doc.metadata.get("source_file") or doc.metadata.get("source", ""),
+        "content": doc.page_content,
+    }
+
+
+async def _read_pdfs(request: web.Request) -> List[Tuple[str, bytes]]:
+    """
+    Every file part of a multipart upload, as (filename, bytes).
+
+    aiohttp's client_max_size does not cover request.multipart(), so parts
+    are read in chunks and the upload is rejected with 413 as soon as all
+    parts together pass the app's MAX_UPLOAD bytes.
+    """
+    files = []
+    if not request.content_type.startswith("multipart/"):
+        return files
+    max_size, total = request.app[MAX_UPLOAD], 0
+    reader = await request.multipart()
+    async for part in reader:
+        if not part.filename:
+            continue
+        data = bytearray()
+        while chunk := await part.read_chunk():
+            total += len(chunk)
+            if total > max_size:
+                raise web.HTTPRequestEntityTooLarge(
+                    max_size=max_size, actual_size=total, content_type="application/json",
+                    text=json.dumps({"error": f"Upload exceeds {max_size // (1024 * 1024)} MB"}),
+                )
+            data.extend(chunk)
+        files.append((part.filename, bytes(data)))
+    return files
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({
+        "status": "ok",
+        "ask": request.app[ASK_POOL].stats(),
+        "analysis": request.app[ANALYSIS_POOL].stats(),
+    })
+
+
+async def ask(request: web.Request) -> web.Response:
+    try:
+        body = await request.json()
+    except ValueError:
+        return _error(400, "Body must be JSON")
+    if not isinstance(body, dict):
+        return _error(400, "Body must be a JSON object")
+    question = str(body.get("question", "")).strip()
+    if not question:
+        return _error(400, "Missing question")
+    tenant_id = body.get("tenant_id") or _tenant_id(request)
+
+    async def answer():
+        result, _ = await aprocess_question(question, tenant_id)
+        extras = await apost_process_answer(question, result["solution"], result["documents"])
+        return {
+            "answer": result["solution"],
+            "sources": [_document_to_dict(doc) for doc in extras["sources"]],
+            "suggestion": extras["suggestion"],
+        }
+
+    pool = request.app[ASK_POOL]
+    try:
+        future = pool.submit(answer)
+    except asyncio.QueueFull:
+        return _overloaded(pool)
+
+    try:
+        return web.json_response(await future)
+    except Exception as e:
+        print(f"Error answering question: {e}")
+        return _error(500, str(e))
+
+
+async def analyze(request: web.Request) -> web.Response:
+    pool = request.app[ANALYSIS_POOL]
+    # Checked before reading the upload, not only when submitting
+    if pool.full:
+        return _overloaded(pool)
+    files = await _read_pdfs(request)
+    if len(files) != 1:
+        return _error(400, "Upload exactly one PDF file")
+    name, file_bytes = files[0]
+
+    jobs = request.app[JOBS]
+    job_id = uuid.uuid4().hex
+    job = {"job_id": job_id, "document_name": name, "status": "queued", "report": None, "error": None}
+
+    async def run():
+        job["status"] = "running"
+        return await aanalyze_document(file_bytes, name)
+
+    def finished(future: asyncio.Future):
+        if future.cancelled():
+            job.update(status="failed", error="cancelled")
+        elif future.exception() is not None:
+            print(f"Error analyzing {name}: {future.exception()}")
+            job.update(status="failed", error=str(future.exception()))
+        else:
+            job.update(status="done", report=future.result().to_dict())
+
+    try:
+        pool.submit(run).add_done_callback(finished)
+    except asyncio.QueueFull:
+        return _overloaded(pool)
+
+    jobs[job_id] = job
+    while len(jobs) > SERVER_JOB_HISTORY:
+        jobs.popitem(last=False)
+
+    return web.json_response(job, status=202, headers={"Location": f"/analyze/{job_id}"})
+
+
+async def analysis_status(request: web.Request) -> web.Response:
+    job = request.app[JOBS].get(request.match_info["job_id"])
+    if job is None:
+        return _error(404, "Unknown job")
+    return web.json_response(job)
+
+
+async def list_documents(request: web.Request) -> web.Response:
+    documents = await asyncio.to_thread(get_internal_documents, _tenant_id(request))
+    return web.json_response({
+        "documents": [{"document_hash": document_hash, "name": name} for document_hash, name in documents]
+    })
+
+
+async def _index_documents(request: web.Request, replace: bool) -> web.Response:
+    pool = request.app[ASK_POOL]
+    if pool.full:
+        return _overloaded(pool)
+    files = await _read_pdfs(request)
+    if not files:
+        return _error(400, "Upload at least one PDF file")
+    tenant_id = _tenant_id(request)
+
+    async def index():
+        # Parsing and embedding are blocking: run them off the event loop
+        if replace:
+            await asyncio.to_thread(set_internal_retriever, files, tenant_id)
+            return await asyncio.to_thread(get_internal_documents, tenant_id)
+        return await asyncio.to_thread(add_internal_documents, files, tenant_id)
+
+    try:
+        future = pool.submit(index)
+    except asyncio.QueueFull:
+        return _overloaded(pool)
+
+    try:
+        result = await future
+    except Exception as e:
+        print(f"Error indexing documents: {e}")
+        return _error(500, str(e))
+
+    if replace:
+        return web.json_response({
+            "documents": [{"document_hash": document_hash, "name": name} for document_hash, name in result]
+        })
+    return web.json_response({"documents": result})
+
+
+async def add_documents(request: web.Request) -> web.Response:
+    return await _index_documents(request, replace=False)
+
+
+async def replace_documents(request: web.Request) -> web.Response:
+    return await _index_documents(request, replace=True)
+
+
+async def delete_document(request: web.Request) -> web.Response:
+    removed = await asyncio.to_thread(
+        remove_internal_document, request.match_info["document_hash"], _tenant_id(request)
+    )
+    if not removed:
+        return _error(404, "Unknown document")
+    return web.Response(status=204)
+
+
+def create_app(ask_workers: int = SERVER_ASK_WORKERS, ask_queue_size: int = SERVER_ASK_QUEUE_SIZE,
+               analysis_workers: int = SERVER_ANALYSIS_WORKERS,
+               analysis_queue_size: int = SERVER_ANALYSIS_QUEUE_SIZE,
+               max_upload_mb: int = SERVER_MAX_UPLOAD_MB) -> web.Application:
+    """Build the HTTP application; worker pools start and stop with it."""
+    app = web.Application(client_max_size=max_upload_mb * 1024 * 1024)
+    app[MAX_UPLOAD] = max_upload_mb * 1024 * 1024
+    app[ASK_POOL] = WorkerPool("question", ask_workers, ask_queue_size)
+    app[ANALYSIS_POOL] = WorkerPool("analysis", analysis_workers, analysis_queue_size)
+    app[JOBS] = OrderedDict()
+
+    async def pools(app: web.Application):
+        await app[ASK_POOL].start()
+        await app[ANALYSIS_POOL].start()
+        yield
+        await app[ASK_POOL].stop()
+        await app[ANALYSIS_POOL].stop()
+
+    app.cleanup_ctx.append(pools)
+    app.router.add_get("/health", health)
+    app.router.add_post("/ask", ask)
+    app.router.add_post("/analyze", analyze)
+    app.router.add_get("/analyze/{job_id}", analysis_status)
+    app.router.add_get("/documents", list_documents)
+    app.router.add_post("/documents", add_documents)
+    app.router.add_put("/documents", replace_documents)
+    app.router.add_delete("/documents/{document_hash}", delete_document)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(create_app(), host=SERVER_HOST, port=SERVER_PORT)
@@ -0,0 +1,105 @@
+import pytest
+from langchain_core.documents import Document
+
+from utils.answer_cache import AnswerCache, normalize_question
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return AnswerCache(str(tmp_path / "answers.sqlite3"), ttl_seconds=60, max_entries=2, clock=clock)
+
+
+@pytest.fixture
+def sample_result():
+    return {
+        "question": "Posso ter cachorro?",
+        "solution": "Sim, a convencao nao pode proibir totalmente.",
+        "documents": [
+            Document(page_content="Art. 1.336 ...", metadata={"source": "Art_1336.txt"}, id="abc"),
+        ],
+    }
+
+
+class TestNormalizeQuestion:
+    def test_ignores_case_accents_and_punctuation(self):
+        assert normalize_question("Qual o QUÓRUM para obras?") == normalize_question("qual o quorum para obras")
+
+    def test_collapses_whitespace(self):
+        assert normalize_question("  posso   ter\ncachorro ") == "posso ter cachorro"
+
+
+class TestAnswerCache:
+    def test_miss_on_empty_cache(self, cache):
+        assert cache.get("posso ter cachorro?", "ctx") is None
+
+    def test_roundtrip_keeps_documents(self, cache, sample_result):
+        cache.set("Posso ter cachorro?", "ctx", sample_result)
+        result = cache.get("posso ter cachorro", "ctx")
+        assert result["solution"] == sample_result["solution"]
+        doc = result["documents"][0]
+        assert isinstance(doc, Document)
+        assert doc.page_content == "Art. 1.336 ..."
+        assert doc.metadata == {"source": "Art_1336.txt"}
+        assert doc.id == "abc"
+
+    def test_miss_on_different_context(self, cache, sample_result):
+        cache.set("Posso ter cachorro?", "ctx", sample_result)
+        assert cache.get("Posso ter cachorro?", "other-ctx") is None
+
+    def test_entries_expire(self, cache, clock, sample_result):
+        cache.set("Posso ter cachorro?", "ctx", sample_result)
+        clock.now += 61
+        assert cache.get("Posso ter cachorro?", "ctx") is None
+
+    def test_evicts_least_recently_used(self, cache, clock, sample_result):
+        cache.set("primeira", "ctx", sample_result)
+        clock.now += 1
+        cache.set("segunda", "ctx", sample_result)
+        clock.now += 1
+        cache.get("primeira", "ctx")
+        clock.now += 1
+        cache.set("terceira", "ctx", sample_result)
+        assert cache.get("primeira", "ctx") is not None
+        assert cache.get("segunda", "ctx") is None
+        assert cache.get("terceira", "ctx") is not None
+
+    def test_persists_across_instances(self, tmp_path, sample_result):
+        path = str(tmp_path / "answers.sqlite3")
+        AnswerCache(path).set("Posso ter cachorro?", "ctx", sample_result)
+        assert AnswerCache(path).get("Posso ter cachorro?", "ctx") is not None
+
+    def test_clear(self, cache, sample_result):
+        cache.set("Posso ter cachorro?", "ctx", sample_result)
+        cache.clear()
+        assert cache.get("Posso ter cachorro?", "ctx") is None
+
+
+class TestSimilarityLookup:
+    @staticmethod
+    def embed(text):
+        # Questions about dogs point the same way, everything else is orthogonal
+        return [1.0, 0.0] if "cachorro" in text or "cao" in text else [0.0, 1.0]
+
+    def test_hits_similar_question(self, tmp_path, sample_result):
+        cache = AnswerCache(str(tmp_path / "a.sqlite3"), similarity_threshold=0.9, embed_fn=self.embed)
+        cache.set("Posso ter cachorro?", "ctx", sample_result)
+        assert cache.get("Posso ter um cachorro no apartamento?", "ctx") is not None
+        assert cache.get("Qual o quorum para obras?", "ctx") is None
+
+    def test_similarity_respects_context(self, tmp_path, sample_result):
+        cache = AnswerCache(str(tmp_path / "a.sqlite3"), similarity_threshold=0.9, embed_fn=self.embed)
+        cache.set("Posso ter cachorro?", "ctx", sample_result)
+        assert cache.get("Posso ter um cachorro?", "other-ctx") is None
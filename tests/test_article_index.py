@@ -0,0 +1,49 @@
+from langchain_core.documents import Document
+
+from utils.article_index import ArticleIndex
+
+
+def article(number, text):
+    return Document(id=f"art-{number.lower()}", page_content=text,
+                    metadata={"source": f"ingest/data/artigos/Art_{number}.txt"})
+
+
+def make_index():
+    return ArticleIndex.from_documents([
+        article("1336", "Art. 1.336. São deveres do condômino"),
+        article("1337", "Art. 1.337. O condômino que não cumpre"),
+        article("1331-A", "Art. 1.331-A. Texto"),
+    ])
+
+
+class TestArticleIndex:
+    def test_keys_by_article_number(self):
+        index = make_index()
+        assert len(index) == 3
+        assert "1331-A" in index
+        assert "1338" not in index
+
+    def test_finds_cited_articles_in_order(self):
+        docs = make_index().find("O que dizem os arts. 1.337 e 1.336, IV?")
+        assert [doc.id for doc in docs] == ["art-1337", "art-1336"]
+
+    def test_ignores_unknown_and_uncited_articles(self):
+        index = make_index()
+        assert index.find("o que diz o art. 2.000?") == []
+        assert index.find("Posso ter cachorro no apartamento?") == []
+
+    def test_limit(self):
+        assert len(make_index().find("arts. 1.336, 1.337 e 1.331-A", limit=2)) == 2
+
+    def test_round_trips_through_disk(self, tmp_path):
+        path = str(tmp_path / "db" / "article_index.json")
+        make_index().save(path)
+
+        loaded = ArticleIndex.load(path)
+        doc = loaded.lookup(["1336"])[0]
+        assert doc.id == "art-1336"
+        assert doc.page_content == "Art. 1.336. São deveres do condômino"
+        assert doc.metadata["source"].endswith("Art_1336.txt")
+
+    def test_missing_file_is_an_empty_index(self, tmp_path):
+        assert len(ArticleIndex.load(str(tmp_path / "missing.json"))) == 0
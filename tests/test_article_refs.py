@@ -0,0 +1,55 @@
+import pytest
+from langchain_core.documents import Document
+
+from utils.article_refs import (
+    article_from_source,
+    document_article,
+    find_article_refs,
+    normalize_article,
+    strip_article_refs,
+)
+
+
+class TestFindArticleRefs:
+    @pytest.mark.parametrize("text, expected", [
+        ("Conforme o art. 1.336 do Código Civil", ["1336"]),
+        ("veda tais atos (art. 1.336, IV e art. 1.337, parágrafo único)", ["1336", "1337"]),
+        ("arts. 1.336, IV e 1.337", ["1336", "1337"]),
+        ("Art. 1.331-A e artigos 1.332, 1.333 ou 1.334.", ["1331-A", "1332", "1333", "1334"]),
+        ("De acordo com o Art. 1336, § 2º, e 1.337", ["1336", "1337"]),
+        ("art. 1.336 e novamente o art. 1.336", ["1336"]),
+        ("As partes e os artefatos", []),
+    ])
+    def test_finds_references(self, text, expected):
+        assert find_article_refs(text) == expected
+
+
+class TestStripArticleRefs:
+    def test_removes_every_reference(self):
+        text = "Veda atos contra o sossego (art. 1.336, IV e art. 1.337, parágrafo único)."
+        stripped = strip_article_refs(text)
+        assert find_article_refs(stripped) == []
+        assert stripped.startswith("Veda atos contra o sossego (")
+
+    def test_keeps_text_without_references(self):
+        assert strip_article_refs("O artigo da convenção") == "O artigo da convenção"
+
+
+class TestArticleKeys:
+    def test_normalize(self):
+        assert normalize_article("1.336") == "1336"
+        assert normalize_article("1.331", "a") == "1331-A"
+
+    def test_from_source(self):
+        assert article_from_source("ingest/data/artigos/Art_1336.txt") == "1336"
+        assert article_from_source("Art_1331-A.txt") == "1331-A"
+        assert article_from_source("convencao.pdf") is None
+
+    def test_document_article_from_heading(self):
+        doc = Document(page_content="Art. 1.337. O condômino...", metadata={"source": "upload.pdf"})
+        assert document_article(doc) == "1337"
+
+    def test_document_article_prefers_metadata(self):
+        doc = Document(page_content="texto", metadata={"source": "ingest/data/artigos/Art_1348.txt"})
+        assert document_article(doc) == "1348"
+        assert document_article(Document(page_content="texto")) is None
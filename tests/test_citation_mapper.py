@@ -0,0 +1,67 @@
+from langchain_core.documents import Document
+
+import chains.source_identifier as source_identifier
+from utils.citation_mapper import map_citations, split_sentences
+
+
+def article(number, text):
+    return Document(page_content=text, metadata={"source": f"ingest/data/artigos/Art_{number}.txt"})
+
+
+DOCUMENTS = [
+    article(1336, "Art. 1.336. São deveres do condômino: contribuir para as despesas do condomínio; "
+                  "não alterar a forma e a cor da fachada."),
+    article(1337, "Art. 1.337. O condômino que não cumpre reiteradamente com os seus deveres "
+                  "poderá ser constrangido a pagar multa."),
+    Document(page_content="Regimento interno: é proibida a permanência de animais de grande porte "
+                          "nas áreas comuns do edifício.", metadata={"source": "regimento.pdf"}),
+]
+
+
+class TestSplitSentences:
+    def test_keeps_article_abbreviations(self):
+        assert split_sentences("Veja o art. 1.336. Depois o Art. 1.337.") == [
+            "Veja o art. 1.336.", "Depois o Art. 1.337."
+        ]
+
+
+class TestMapCitations:
+    def test_maps_cited_articles(self):
+        used, confident = map_citations("Segundo o art. 1.337, o condômino paga multa.", DOCUMENTS)
+        assert used == [1]
+        assert confident
+
+    def test_maps_by_lexical_overlap(self):
+        answer = "O regimento proíbe animais de grande porte nas áreas comuns do edifício."
+        used, confident = map_citations(answer, DOCUMENTS)
+        assert used == [2]
+        assert confident
+
+    def test_no_match_is_not_confident(self):
+        used, confident = map_citations("Não há informação suficiente sobre piscinas.", DOCUMENTS)
+        assert used == []
+        assert not confident
+
+    def test_empty_input(self):
+        assert map_citations("", DOCUMENTS) == ([], False)
+        assert map_citations("resposta", []) == ([], False)
+
+
+class TestIdentifyUsedSources:
+    def test_does_not_call_the_model_when_confident(self, monkeypatch):
+        def fail(*args):
+            raise AssertionError("model should not be called")
+
+        monkeypatch.setattr(source_identifier, "CITATION_LLM_FALLBACK", True)
+        monkeypatch.setattr(source_identifier, "identify_used_sources_llm", fail)
+        used = source_identifier.identify_used_sources("Conforme o art. 1.336, pague as despesas.", DOCUMENTS)
+        assert used == [DOCUMENTS[0]]
+
+    def test_falls_back_to_the_model_when_enabled(self, monkeypatch):
+        monkeypatch.setattr(source_identifier, "CITATION_LLM_FALLBACK", True)
+        monkeypatch.setattr(source_identifier, "identify_used_sources_llm", lambda a, d, q: d[:1])
+        assert source_identifier.identify_used_sources("Sem relação.", DOCUMENTS) == DOCUMENTS[:1]
+
+    def test_without_fallback_returns_no_sources(self, monkeypatch):
+        monkeypatch.setattr(source_identifier, "CITATION_LLM_FALLBACK", False)
+        assert source_identifier.identify_used_sources("Sem relação.", DOCUMENTS) == []
@@ -1,5 +1,5 @@
 import pytest
-from chains.clause_extractor import ExtractedClause, deduplicate_clauses
+from chains.clause_extractor import ExtractedClause, deduplicate_clauses, extract_clauses_locally
 
 
 class TestExtractedClause:
@@ -100,3 +100,13 @@ class TestDeduplicateClauses:
         assert result[0].clause_number == "Art. 15, Par. 2"
         assert result[0].clause_text == "E proibido fazer barulho apos as 22h."
         assert result[0].topic == "property_use"
+
+
+class TestExtractClausesLocally:
+    def test_returns_extracted_clauses(self):
+        result = extract_clauses_locally("Art. 1º - É proibida a criação de animais.\nArt. 2º - A taxa vence no dia 10.")
+        assert [c.clause_number for c in result.clauses] == ["Art. 1", "Art. 2"]
+        assert [c.topic for c in result.clauses] == ["pets", "fees"]
+
+    def test_none_for_unstructured_text(self):
+        assert extract_clauses_locally("Texto sem numeração de artigos.") is None
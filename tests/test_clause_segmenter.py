@@ -0,0 +1,73 @@
+import pytest
+from langchain_core.documents import Document
+
+from utils.clause_segmenter import classify_topic, segment_clauses
+from utils.legal_splitter import LegalTextSplitter
+
+CONVENCAO = """CONVENÇÃO DO CONDOMÍNIO EDIFÍCIO AURORA
+CAPÍTULO I - DAS ÁREAS COMUNS
+CLÁUSULA PRIMEIRA - É proibida a permanência de animais de estimação nas unidades.
+CLÁUSULA SEGUNDA - A piscina e o salão de festas funcionam das 8h às 22h.
+CLÁUSULA TERCEIRA - O condômino inadimplente pagará juros sobre a taxa condominial.
+CLÁUSULA QUARTA - Os casos omissos serão resolvidos pelo síndico.
+"""
+
+ARTIGO = """Art. 1.336. São deveres do condômino:
+I - contribuir para as despesas do condomínio na proporção das suas frações ideais;
+II - não realizar obras que comprometam a segurança da edificação;
+III - não alterar a forma e a cor da fachada, das partes e esquadrias externas;
+§ 1º O condômino que não pagar a sua contribuição ficará sujeito aos juros moratórios.
+§ 2º O condômino que não cumprir qualquer dos deveres pagará a multa prevista.
+"""
+
+
+class TestClassifyTopic:
+    def test_matches_keywords_across_inflections(self):
+        assert classify_topic("Os cães devem usar coleira") == "pets"
+        assert classify_topic("A assembleia delibera por maioria dos votos") == "quorum"
+        assert classify_topic("Hóspedes e visitantes se identificam") == "visitors"
+
+    def test_most_frequent_topic_wins(self):
+        assert classify_topic("Multa e advertência ao infrator pelo atraso da taxa") == "fines"
+
+    def test_general_without_keywords(self):
+        assert classify_topic("Os casos omissos serão resolvidos pelo síndico") == "general"
+
+
+class TestSegmentClauses:
+    def test_segments_clauses_with_topics(self):
+        clauses = segment_clauses(CONVENCAO)
+        assert [c["clause_number"] for c in clauses] == [
+            "CLÁUSULA PRIMEIRA", "CLÁUSULA SEGUNDA", "CLÁUSULA TERCEIRA", "CLÁUSULA QUARTA"]
+        assert [c["topic"] for c in clauses] == ["pets", "common_areas", "fees", "general"]
+        assert clauses[1]["clause_text"].startswith("CLÁUSULA SEGUNDA - A piscina")
+
+    def test_names_the_parts_of_a_split_article(self):
+        chunks = LegalTextSplitter(chunk_size=200, chunk_overlap=0).split_documents([Document(page_content=ARTIGO)])
+        numbers = [segment_clauses(c.page_content, metadata=c.metadata)[0]["clause_number"] for c in chunks]
+        assert numbers[0] == "Art. 1.336"
+        assert "Art. 1.336, § 2º" in numbers
+        assert len(set(numbers)) == len(numbers)
+
+    @pytest.mark.parametrize("text", [
+        "Art. 3º A taxa condominial vence no dia 10.\nParágrafo único. O atraso implica multa.",
+        "Art. 3º A taxa condominial vence no dia 10.\n§ 1º O atraso implica multa.",
+        "Art. 3º São deveres do condômino:\nII - pagar a taxa condominial.",
+    ])
+    def test_unsplit_articles_keep_their_number(self, text):
+        chunks = LegalTextSplitter(chunk_size=2000, chunk_overlap=0, pack_units=True).split_documents(
+            [Document(page_content=text)])
+        assert len(chunks) == 1
+        clauses = segment_clauses(chunks[0].page_content, metadata=chunks[0].metadata)
+        assert [c["clause_number"] for c in clauses] == ["Art. 3"]
+
+    def test_leaves_unstructured_chunks_to_the_llm(self):
+        assert segment_clauses("Ata da assembleia realizada em 10 de março.") is None
+
+    def test_leaves_chunks_cut_mid_clause_to_the_llm(self):
+        chunk = "das partes e esquadrias externas, conforme a convenção. " * 5 + "\nArt. 2 - Texto curto."
+        assert segment_clauses(chunk) is None
+        assert segment_clauses(chunk, min_coverage=0) is not None
+
+    def test_leaves_bare_headings_to_the_llm(self):
+        assert segment_clauses("Art. 1") is None
@@ -0,0 +1,33 @@
+import pytest
+
+from chains.document_request_detector import match_document_request
+
+
+class TestMatchDocumentRequest:
+    @pytest.mark.parametrize("question, document_type", [
+        ("Redija uma notificação de barulho para o apartamento 101", "notificacao_barulho"),
+        ("Escreva uma notificação de cobrança para a unidade 32", "notificacao_inadimplencia"),
+        ("Escreva uma advertência para o morador que estacionou na vaga errada", "advertencia"),
+        ("Por favor, redija a convocação da assembleia ordinária", "convocacao_assembleia"),
+        ("Me ajude a escrever um comunicado sobre a obra no elevador", "comunicado_geral"),
+        ("Elabore a ata da assembleia de ontem", "ata_assembleia"),
+    ])
+    def test_obvious_requests(self, question, document_type):
+        result = match_document_request(question)
+        assert result.is_explicit_request is True
+        assert result.document_type == document_type
+        assert result.document_name
+        assert result.extracted_context == question
+
+    @pytest.mark.parametrize("question", [
+        "Quais são as regras sobre barulho?",
+        "O que fazer quando o vizinho faz barulho?",
+        "Escreva uma notificação",
+        "Preciso de um modelo de ata",
+        "Notificação de inadimplência para a unidade 45",
+        "Advertência para o morador do 302 por barulho",
+        "Me ajude com uma convocação de assembleia",
+        "Você pode me enviar um comunicado sobre a piscina?",
+    ])
+    def test_everything_else_is_left_to_the_model(self, question):
+        assert match_document_request(question) is None
@@ -0,0 +1,69 @@
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from utils.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.document_calls = []
+        self.query_calls = []
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.query_calls.append(text)
+        return [float(len(text)), 2.0]
+
+
+@pytest.fixture
+def underlying():
+    return CountingEmbeddings()
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "embeddings.sqlite3")
+
+
+class TestCachedEmbeddings:
+    def test_embeds_misses_once(self, underlying, cache_path):
+        embeddings = CachedEmbeddings(underlying, cache_path, namespace="model:task")
+        first = embeddings.embed_documents(["art. 1336", "art. 1337"])
+        second = embeddings.embed_documents(["art. 1337", "art. 1336"])
+        assert underlying.document_calls == [["art. 1336", "art. 1337"]]
+        assert second == [first[1], first[0]]
+
+    def test_only_sends_new_texts(self, underlying, cache_path):
+        embeddings = CachedEmbeddings(underlying, cache_path, namespace="model:task")
+        embeddings.embed_documents(["a"])
+        embeddings.embed_documents(["a", "bb", "bb"])
+        assert underlying.document_calls == [["a"], ["bb"]]
+
+    def test_query_cache(self, underlying, cache_path):
+        embeddings = CachedEmbeddings(underlying, cache_path, namespace="model:task")
+        assert embeddings.embed_query("quorum") == embeddings.embed_query("quorum")
+        assert underlying.query_calls == ["quorum"]
+
+    def test_queries_and_documents_are_cached_separately(self, underlying, cache_path):
+        embeddings = CachedEmbeddings(underlying, cache_path, namespace="model:task")
+        embeddings.embed_documents(["quorum"])
+        assert embeddings.embed_query("quorum") == [6.0, 2.0]
+
+    def test_namespace_separates_models(self, underlying, cache_path):
+        CachedEmbeddings(underlying, cache_path, namespace="model-a").embed_documents(["x"])
+        CachedEmbeddings(underlying, cache_path, namespace="model-b").embed_documents(["x"])
+        assert len(underlying.document_calls) == 2
+
+    def test_persists_across_instances(self, underlying, cache_path):
+        CachedEmbeddings(underlying, cache_path, namespace="model:task").embed_documents(["x"])
+        other = CountingEmbeddings()
+        assert CachedEmbeddings(other, cache_path, namespace="model:task").embed_documents(["x"]) == [[1.0, 1.0]]
+        assert other.document_calls == []
+
+    def test_empty_input(self, underlying, cache_path):
+        embeddings = CachedEmbeddings(underlying, cache_path, namespace="model:task")
+        assert embeddings.embed_documents([]) == []
+        assert underlying.document_calls == []
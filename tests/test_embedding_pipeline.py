@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from utils.embedding_pipeline import BatchedEmbeddings, is_retryable
+
+
+class APIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"{code} error")
+        self.code = code
+
+
+class WrappedError(Exception):
+    pass
+
+
+class FakeEmbeddings(Embeddings):
+    """Local embedding model: one-dimensional vectors holding the text length."""
+
+    def __init__(self, failures=None, latency=0.0):
+        self.failures = list(failures or [])
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failure = self.failures.pop(0) if self.failures else None
+        try:
+            time.sleep(self.latency)
+            if failure is not None:
+                raise failure
+            return [[float(len(text))] for text in texts]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def pipeline(model, **kwargs):
+    kwargs.setdefault("sleep", lambda _: None)
+    return BatchedEmbeddings(model, **kwargs)
+
+
+class TestIsRetryable:
+    @pytest.mark.parametrize("code", [429, 500, 503])
+    def test_rate_limit_and_server_errors(self, code):
+        assert is_retryable(APIError(code))
+
+    def test_client_errors_are_not_retried(self):
+        assert not is_retryable(APIError(400))
+
+    def test_follows_wrapped_errors(self):
+        try:
+            try:
+                raise APIError(429)
+            except APIError as e:
+                raise WrappedError("Error embedding content") from e
+        except WrappedError as e:
+            assert is_retryable(e)
+
+
+class TestBatchedEmbeddings:
+    def test_batches_and_preserves_order(self):
+        model = FakeEmbeddings()
+        texts = ["a" * n for n in range(1, 11)]
+
+        vectors = pipeline(model, batch_size=3, max_concurrency=4).embed_documents(texts)
+
+        assert vectors == [[float(n)] for n in range(1, 11)]
+        assert sorted(len(call) for call in model.calls) == [1, 3, 3, 3]
+
+    def test_bounds_concurrency(self):
+        model = FakeEmbeddings(latency=0.02)
+        pipeline(model, batch_size=1, max_concurrency=2).embed_documents(["x"] * 8)
+        assert model.max_in_flight <= 2
+
+    def test_retries_rate_limits_with_backoff(self):
+        model = FakeEmbeddings(failures=[APIError(429), APIError(503)])
+        delays = []
+
+        vectors = pipeline(model, batch_size=10, initial_backoff=1.0, sleep=delays.append).embed_documents(["ab"])
+
+        assert vectors == [[2.0]]
+        assert len(model.calls) == 3
+        assert len(delays) == 2
+        assert 0.5 <= delays[0] <= 1.0 and 1.0 <= delays[1] <= 2.0
+
+    def test_gives_up_after_max_retries(self):
+        model = FakeEmbeddings(failures=[APIError(429)] * 3)
+        with pytest.raises(APIError):
+            pipeline(model, max_retries=2).embed_documents(["a"])
+        assert len(model.calls) == 3
+
+    def test_does_not_retry_client_errors(self):
+        model = FakeEmbeddings(failures=[APIError(400)])
+        with pytest.raises(APIError):
+            pipeline(model).embed_documents(["a"])
+        assert len(model.calls) == 1
+
+    def test_reports_progress(self):
+        progress = []
+        pipeline(
+            FakeEmbeddings(), batch_size=2, max_concurrency=1,
+            progress=lambda done, total, elapsed: progress.append((done, total)),
+        ).embed_documents(["a"] * 5)
+        assert progress == [(2, 5), (4, 5), (5, 5)]
+
+    def test_empty_input(self):
+        model = FakeEmbeddings()
+        assert pipeline(model).embed_documents([]) == []
+        assert model.calls == []
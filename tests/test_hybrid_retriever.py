@@ -0,0 +1,62 @@
+import asyncio
+
+from langchain_core.documents import Document
+
+from utils.hybrid_retriever import HybridRetriever
+from utils.lexical_index import BM25Index
+
+
+class FakeDenseRetriever:
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = []
+
+    def invoke(self, query, config=None, **kwargs):
+        self.calls.append(kwargs)
+        return self.docs[:kwargs.get("k", 4)]
+
+    async def ainvoke(self, query, config=None, **kwargs):
+        return self.invoke(query, config, **kwargs)
+
+
+MULTA = Document(page_content="Art. 1.337. Multa correspondente até ao quíntuplo do valor")
+SINDICO = Document(page_content="Art. 1.348. Compete ao síndico convocar a assembleia")
+DEVERES = Document(page_content="Art. 1.336. São deveres do condômino")
+
+
+def make_retriever(mode, **kwargs):
+    dense = FakeDenseRetriever([SINDICO, DEVERES, MULTA])
+    retriever = HybridRetriever(dense=dense, lexical=BM25Index([MULTA, SINDICO, DEVERES]), mode=mode, **kwargs)
+    return retriever, dense
+
+
+class TestHybridRetriever:
+    def test_dense_mode_only_uses_the_vector_store(self):
+        retriever, dense = make_retriever("dense", k=2)
+        assert retriever.invoke("multa quíntuplo") == [SINDICO, DEVERES]
+        assert dense.calls == [{"k": 2}]
+
+    def test_hybrid_fuses_both_rankings(self):
+        retriever, dense = make_retriever("hybrid", k=2, fetch_k=3)
+        found = retriever.invoke("multa quíntuplo síndico")
+        assert set(doc.page_content for doc in found) == {MULTA.page_content, SINDICO.page_content}
+        assert dense.calls == [{"k": 3}]
+
+    def test_k_override(self):
+        retriever, _ = make_retriever("hybrid", k=1, fetch_k=3)
+        assert len(retriever.invoke("multa", k=3)) == 3
+
+    def test_confident_lexical_match_skips_the_embedding_call(self):
+        retriever, dense = make_retriever("lexical", k=1)
+        assert retriever.invoke("multa até o quíntuplo") == [MULTA]
+        assert dense.calls == []
+
+    def test_unconfident_lexical_match_falls_back_to_hybrid(self):
+        retriever, dense = make_retriever("lexical", k=2)
+        retriever.invoke("multa por cachorro barulhento")
+        assert len(dense.calls) == 1
+
+    def test_async(self):
+        retriever, dense = make_retriever("lexical", k=1)
+        assert asyncio.run(retriever.ainvoke("multa até o quíntuplo")) == [MULTA]
+        assert dense.calls == []
@@ -0,0 +1,156 @@
+import uuid
+
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from ingest.ingest import article_id, ingest, load_articles, load_manifest, plan_changes
+
+
+class CountingFakeEmbedding(DeterministicFakeEmbedding):
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def docs_path(tmp_path):
+    path = tmp_path / "artigos"
+    path.mkdir()
+    (path / "Art_1336.txt").write_text("Art. 1.336. São deveres do condômino", encoding="utf-8")
+    (path / "Art_1337.txt").write_text("Art. 1.337. O condômino que não cumpre", encoding="utf-8")
+    (path / "Art_1331-A.txt").write_text("Art. 1.331-A. Texto", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def embeddings():
+    return CountingFakeEmbedding(size=8)
+
+
+@pytest.fixture
+def vectorstore(embeddings):
+    return Chroma(collection_name=f"test_{uuid.uuid4().hex}", embedding_function=embeddings)
+
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    return str(tmp_path / "manifest.json")
+
+
+@pytest.fixture
+def article_index_path(tmp_path):
+    return str(tmp_path / "article_index.json")
+
+
+class TestArticleId:
+    def test_plain_article(self):
+        assert article_id("ingest/data/artigos/Art_1336.txt") == "art-1336"
+
+    def test_lettered_article(self):
+        assert article_id("Art_1358-A.txt") == "art-1358-a"
+
+
+class TestLoadArticles:
+    def test_keeps_source_path_metadata(self, docs_path):
+        articles = load_articles(str(docs_path))
+        assert set(articles) == {"art-1336", "art-1337", "art-1331-a"}
+        assert articles["art-1336"].metadata["source"].endswith("Art_1336.txt")
+
+
+class TestPlanChanges:
+    def test_new_and_changed_articles_are_upserted(self):
+        to_upsert, to_delete = plan_changes(
+            current={"a": "1", "b": "2", "c": "3"},
+            manifest={"a": "1", "b": "old"},
+            stored_ids=["a", "b"],
+        )
+        assert sorted(to_upsert) == ["b", "c"]
+        assert to_delete == []
+
+    def test_removed_and_legacy_ids_are_deleted(self):
+        _, to_delete = plan_changes(
+            current={"a": "1"},
+            manifest={"a": "1", "b": "2"},
+            stored_ids=["a", "b", "3f2c-legacy-uuid"],
+        )
+        assert to_delete == ["3f2c-legacy-uuid", "b"]
+
+    def test_missing_from_store_is_upserted(self):
+        to_upsert, _ = plan_changes(current={"a": "1"}, manifest={"a": "1"}, stored_ids=[])
+        assert to_upsert == ["a"]
+
+
+class TestIngest:
+    def test_second_run_is_a_no_op(self, vectorstore, embeddings, docs_path, manifest_path):
+        first = ingest(vectorstore, str(docs_path), manifest_path)
+        calls = embeddings.calls
+        second = ingest(vectorstore, str(docs_path), manifest_path)
+
+        assert first["upserted"] == 3
+        assert second == {"upserted": 0, "deleted": 0, "unchanged": 3}
+        assert embeddings.calls == calls
+        assert len(vectorstore.get(include=[])["ids"]) == 3
+
+    def test_updates_changed_and_removes_deleted_articles(self, vectorstore, docs_path, manifest_path):
+        ingest(vectorstore, str(docs_path), manifest_path)
+        (docs_path / "Art_1336.txt").write_text("Art. 1.336. Nova redação", encoding="utf-8")
+        (docs_path / "Art_1337.txt").unlink()
+
+        stats = ingest(vectorstore, str(docs_path), manifest_path)
+        assert stats == {"upserted": 1, "deleted": 1, "unchanged": 1}
+
+        stored = vectorstore.get()
+        assert sorted(stored["ids"]) == ["art-1331-a", "art-1336"]
+        assert "Art. 1.336. Nova redação" in stored["documents"]
+        assert set(load_manifest(manifest_path)) == {"art-1331-a", "art-1336"}
+
+    def test_each_backend_syncs_against_its_own_manifest(self, embeddings, docs_path, tmp_path, monkeypatch):
+        import resources
+
+        monkeypatch.setattr(resources, "INGEST_MANIFEST_PATH", str(tmp_path / "manifest.json"))
+        stores = {
+            backend: Chroma(collection_name=f"test_{uuid.uuid4().hex}", embedding_function=embeddings)
+            for backend in ("google", "local")
+        }
+        for backend, store in stores.items():
+            ingest(store, str(docs_path), resources.ingest_manifest_path(backend))
+        (docs_path / "Art_1336.txt").write_text("Art. 1.336. Nova redação", encoding="utf-8")
+
+        ingest(stores["local"], str(docs_path), resources.ingest_manifest_path("local"))
+        stats = ingest(stores["google"], str(docs_path), resources.ingest_manifest_path("google"))
+        assert stats["upserted"] == 1
+        assert "Art. 1.336. Nova redação" in stores["google"].get(ids=["art-1336"])["documents"]
+
+    def test_removes_legacy_duplicates(self, vectorstore, docs_path, manifest_path):
+        vectorstore.add_texts(["Art. 1.336. São deveres do condômino"], ids=["legacy-uuid"])
+        ingest(vectorstore, str(docs_path), manifest_path)
+        assert "legacy-uuid" not in vectorstore.get(include=[])["ids"]
+
+    def test_writes_the_article_index(self, vectorstore, docs_path, manifest_path, article_index_path):
+        from utils.article_index import ArticleIndex
+
+        ingest(vectorstore, str(docs_path), manifest_path, article_index_path=article_index_path)
+        index = ArticleIndex.load(article_index_path)
+
+        assert len(index) == 3
+        assert [doc.id for doc in index.lookup(["1336", "1331-A"])] == ["art-1336", "art-1331-a"]
+        assert index.lookup(["1337"])[0].metadata["source"].endswith("Art_1337.txt")
+
+    def test_article_index_only_written_when_asked(self, vectorstore, docs_path, manifest_path, tmp_path,
+                                                   monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        ingest(vectorstore, str(docs_path), manifest_path)
+        assert not (tmp_path / "db").exists()
+
+
+class TestBenchmark:
+    def test_leaves_the_db_directory_untouched(self, tmp_path, monkeypatch):
+        from ingest import benchmark
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["benchmark", "--articles", "5", "--latency", "0"])
+        benchmark.main()
+        assert not (tmp_path / "db").exists()
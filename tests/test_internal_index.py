@@ -0,0 +1,112 @@
+import chromadb
+import pytest
+from chromadb.config import Settings
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from utils.internal_index import InternalIndexManager, collection_name
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def client(tmp_path):
+    return chromadb.PersistentClient(path=str(tmp_path), settings=Settings(anonymized_telemetry=False))
+
+
+@pytest.fixture
+def factory(client):
+    def create(name):
+        return Chroma(client=client, collection_name=name, embedding_function=DeterministicFakeEmbedding(size=8))
+    return create
+
+
+def chunks(*texts):
+    return [Document(page_content=text) for text in texts]
+
+
+class TestCollectionName:
+    def test_is_stable_and_distinct(self):
+        assert collection_name("Condomínio Sol") == collection_name("Condomínio Sol")
+        assert collection_name("condo/a") != collection_name("condo a")
+
+    def test_is_a_valid_chroma_name(self, client):
+        client.get_or_create_collection(collection_name("Edifício Sol Nascente / Bloco A"))
+        client.get_or_create_collection(collection_name("%%%"))
+
+
+class TestInternalIndex:
+    def test_add_and_retrieve(self, factory):
+        index = InternalIndexManager(factory).get("condo-a")
+        assert index.is_empty and index.fingerprint == ""
+
+        assert index.add_document("regimento.pdf", "h1", chunks("Animais são permitidos.", "Silêncio às 22h."))
+        assert index.document_names == ["regimento.pdf"]
+        assert index.fingerprint != ""
+        results = index.retriever.invoke("animais")
+        assert {doc.metadata["source_file"] for doc in results} == {"regimento.pdf"}
+
+    def test_same_document_is_not_indexed_twice(self, factory):
+        index = InternalIndexManager(factory).get("condo-a")
+        index.add_document("regimento.pdf", "h1", chunks("texto"))
+        assert not index.add_document("regimento (1).pdf", "h1", chunks("texto"))
+        assert index.document_names == ["regimento.pdf"]
+        assert len(index.vectorstore.get(include=[])["ids"]) == 1
+
+    def test_remove_document_keeps_the_others(self, factory):
+        index = InternalIndexManager(factory).get("condo-a")
+        index.add_document("convencao.pdf", "h1", chunks("convenção 1", "convenção 2"))
+        index.add_document("ata.pdf", "h2", chunks("ata"))
+
+        assert index.remove_document("h2")
+        assert not index.remove_document("h2")
+        assert index.documents == [("h1", "convencao.pdf")]
+        assert sorted(index.vectorstore.get()["documents"]) == ["convenção 1", "convenção 2"]
+
+    def test_persists_across_managers(self, factory):
+        first = InternalIndexManager(factory).get("condo-a")
+        first.add_document("convencao.pdf", "h1", chunks("a"))
+        first.add_document("regimento.pdf", "h2", chunks("b"))
+
+        reloaded = InternalIndexManager(factory).get("condo-a")
+        assert reloaded.document_names == ["convencao.pdf", "regimento.pdf"]
+        assert reloaded.fingerprint == first.fingerprint
+
+
+class TestInternalIndexManager:
+    def test_tenants_are_isolated(self, factory):
+        manager = InternalIndexManager(factory)
+        manager.get("condo-a").add_document("a.pdf", "h1", chunks("a"))
+        assert manager.get("condo-b").is_empty
+
+    def test_evicts_least_recently_used(self, factory):
+        manager = InternalIndexManager(factory, max_loaded=2)
+        manager.get("a")
+        manager.get("b")
+        manager.get("a")
+        manager.get("c")
+        assert manager.loaded_tenants() == ["a", "c"]
+
+    def test_evicts_idle_indexes(self, factory):
+        clock = FakeClock()
+        manager = InternalIndexManager(factory, idle_seconds=60, clock=clock)
+        manager.get("a")
+        clock.now = 30
+        manager.get("b")
+        clock.now = 80
+        manager.evict_idle()
+        assert manager.loaded_tenants() == ["b"]
+
+    def test_evicted_index_is_reloaded_from_disk(self, factory):
+        manager = InternalIndexManager(factory, max_loaded=1)
+        manager.get("a").add_document("a.pdf", "h1", chunks("a"))
+        manager.get("b")
+        assert manager.loaded_tenants() == ["b"]
+        assert manager.get("a").document_names == ["a.pdf"]
@@ -0,0 +1,104 @@
+from langchain_core.documents import Document
+
+from utils.legal_splitter import LegalTextSplitter
+
+
+def split(text, **kwargs):
+    return LegalTextSplitter(**kwargs).split_documents([Document(page_content=text)])
+
+
+CONVENCAO = """CONVENÇÃO DO CONDOMÍNIO EDIFÍCIO AURORA
+
+CAPÍTULO I - DAS ÁREAS COMUNS
+CLÁUSULA PRIMEIRA - O salão de festas pode ser reservado por qualquer condômino.
+CLÁUSULA SEGUNDA - A piscina funciona das 8h às 22h, conforme o Art. 1.336
+do Código Civil.
+
+CAPÍTULO II - DAS DESPESAS
+CLÁUSULA TERCEIRA - As despesas são rateadas pela fração ideal.
+"""
+
+CODIGO = """Art. 1.336. São deveres do condômino:
+I - contribuir para as despesas do condomínio na proporção das suas frações ideais;
+II - não realizar obras que comprometam a segurança da edificação;
+III - não alterar a forma e a cor da fachada, das partes e esquadrias externas;
+IV - dar às suas partes a mesma destinação que tem a edificação.
+§ 1º O condômino que não pagar a sua contribuição ficará sujeito aos juros moratórios.
+§ 2º O condômino que não cumprir qualquer dos deveres pagará a multa prevista.
+Art. 1.337. O condômino que não cumpre reiteradamente com os seus deveres poderá ser constrangido a pagar multa.
+"""
+
+
+class TestUnits:
+    def test_one_chunk_per_clause_with_section(self):
+        chunks = split(CONVENCAO, chunk_size=1000, chunk_overlap=0)
+        clauses = [c for c in chunks if c.metadata.get("unit_type") == "clause"]
+        assert [c.metadata["clause"] for c in clauses] == ["PRIMEIRA", "SEGUNDA", "TERCEIRA"]
+        assert clauses[0].metadata["section"] == "CAPÍTULO I - DAS ÁREAS COMUNS"
+        assert clauses[2].metadata["section"] == "CAPÍTULO II - DAS DESPESAS"
+        assert chunks[0].metadata["unit_type"] == "preamble"
+
+    def test_article_reference_is_not_a_heading(self):
+        chunks = split(CONVENCAO, chunk_size=1000, chunk_overlap=0)
+        segunda = next(c for c in chunks if c.metadata.get("clause") == "SEGUNDA")
+        assert "do Código Civil" in segunda.page_content
+
+    def test_articles_are_normalized(self):
+        chunks = split(CODIGO, chunk_size=1000, chunk_overlap=0)
+        assert [c.metadata["article"] for c in chunks] == ["1336", "1337"]
+        assert chunks[0].page_content.startswith("Art. 1.336.") and chunks[0].page_content.endswith("multa prevista.")
+
+    def test_unstructured_text_falls_back_to_characters(self):
+        chunks = split("Ata da assembleia. " * 10, chunk_size=50, chunk_overlap=0)
+        assert len(chunks) > 1
+        assert all(len(c.page_content) <= 50 and c.metadata == {} for c in chunks)
+
+
+class TestLongUnits:
+    def test_splits_at_incisos_and_paragraphs_repeating_the_heading(self):
+        chunks = split(CODIGO, chunk_size=200, chunk_overlap=0)
+        article = [c for c in chunks if c.metadata["article"] == "1336"]
+        assert len(article) > 1
+        assert all(c.page_content.startswith("Art. 1.336.") for c in article)
+        assert "continuation" not in article[0].metadata
+        assert all(c.metadata["continuation"] for c in article[1:])
+        assert all(len(c.page_content) <= 200 for c in chunks)
+        paragraph = next(c for c in article if c.metadata.get("paragraph") == "2")
+        assert "§ 2º" in paragraph.page_content
+        assert any(c.metadata.get("inciso") for c in article)
+
+    def test_pack_units_never_cuts_a_unit(self):
+        chunks = split(CONVENCAO, chunk_size=400, chunk_overlap=0, pack_units=True)
+        assert len(chunks) < 4
+        text = "\n".join(c.page_content for c in chunks)
+        for heading in ("CLÁUSULA PRIMEIRA", "CLÁUSULA SEGUNDA", "CLÁUSULA TERCEIRA"):
+            assert sum(heading in c.page_content for c in chunks) == 1
+        assert "fração ideal" in text
+
+
+class TestSplitDocuments:
+    def test_keeps_units_across_page_breaks_with_start_page(self):
+        pages = [
+            Document(page_content="Art. 1º - O condomínio", metadata={"source": "c.pdf", "page": 0}),
+            Document(page_content="é administrado pelo síndico.\nArt. 2º - A assembleia se reúne anualmente.",
+                     metadata={"source": "c.pdf", "page": 1}),
+        ]
+        chunks = LegalTextSplitter(chunk_size=1000, chunk_overlap=0).split_documents(pages)
+        assert [c.metadata["article"] for c in chunks] == ["1", "2"]
+        assert "administrado pelo síndico" in chunks[0].page_content
+        assert [c.metadata["page"] for c in chunks] == [0, 1]
+        assert chunks[1].metadata["source"] == "c.pdf"
+
+    def test_accepts_a_page_iterator(self):
+        pages = (Document(page_content=f"Art. {n}º - Texto do artigo {n}.", metadata={"page": n}) for n in range(3))
+        chunks = LegalTextSplitter(chunk_size=1000, chunk_overlap=0).split_documents(pages)
+        assert [c.metadata["page"] for c in chunks] == [0, 1, 2]
+
+    def test_empty_input(self):
+        assert LegalTextSplitter().split_documents([]) == []
+
+
+class TestSplitText:
+    def test_returns_strings(self):
+        chunks = LegalTextSplitter(chunk_size=1000, chunk_overlap=0).split_text(CODIGO)
+        assert chunks[0].startswith("Art. 1.336.") and chunks[1].startswith("Art. 1.337.")
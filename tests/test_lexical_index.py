@@ -0,0 +1,62 @@
+import pytest
+from langchain_core.documents import Document
+
+from utils.lexical_index import BM25Index, reciprocal_rank_fusion, stem, tokenize
+
+ARTICLES = [
+    "Art. 1.336. São deveres do condômino: contribuir para as despesas do condomínio",
+    "Art. 1.337. O condômino que não cumpre reiteradamente com os seus deveres poderá ser "
+    "constrangido a pagar multa correspondente até ao quíntuplo do valor",
+    "Art. 1.351. Depende da aprovação de 2/3 (dois terços) dos votos dos condôminos a alteração da convenção",
+    "Art. 1.348. Compete ao síndico convocar a assembleia dos condôminos",
+]
+
+
+def docs(*texts):
+    return [Document(page_content=text) for text in texts]
+
+
+class TestTokenize:
+    @pytest.mark.parametrize("words", [
+        ["condôminos", "condômina", "condômino"],
+        ["obrigações", "obrigação"],
+        ["despesas", "despesa"],
+        ["animais", "animal"],
+    ])
+    def test_inflections_share_a_stem(self, words):
+        assert len({stem(tokenize(word)[0]) for word in words}) == 1
+
+    def test_folds_accents_and_drops_stopwords(self):
+        assert tokenize("Quórum de dois terços") == ["quorum", "dois", "terc"]
+
+    def test_article_numbers_are_single_tokens(self):
+        assert tokenize("art. 1.336") == ["art", "1336"]
+
+
+class TestBM25Index:
+    def test_ranks_exact_terms_first(self):
+        index = BM25Index(docs(*ARTICLES))
+        found, confidence = index.search("multa de até o quíntuplo", k=2)
+        assert found[0].page_content.startswith("Art. 1.337")
+        assert confidence == 1.0
+
+    def test_confidence_is_low_for_unknown_terms(self):
+        index = BM25Index(docs(*ARTICLES))
+        found, confidence = index.search("posso ter cachorro no condomínio?", k=2)
+        assert found
+        assert confidence < 0.5
+
+    def test_no_match(self):
+        assert BM25Index(docs(*ARTICLES)).search("cachorro", k=2) == ([], 0.0)
+        assert BM25Index([]).search("multa") == ([], 0.0)
+
+
+class TestReciprocalRankFusion:
+    def test_documents_in_both_rankings_win(self):
+        a, b, c = docs("a", "b", "c")
+        fused = reciprocal_rank_fusion([[a, b], [c, b]])
+        assert [doc.page_content for doc in fused] == ["b", "a", "c"]
+
+    def test_matches_documents_by_content(self):
+        fused = reciprocal_rank_fusion([docs("a"), docs("a")])
+        assert len(fused) == 1
@@ -0,0 +1,36 @@
+import numpy as np
+
+from utils.local_embeddings import SentenceTransformerEmbeddings
+
+
+class FakeSentenceTransformer:
+    """Encodes a text as its normalized (length, vowel count) vector."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False, convert_to_numpy=True,
+               show_progress_bar=True):
+        self.calls.append((len(texts), batch_size, normalize_embeddings))
+        vectors = np.array([[len(t), sum(c in "aeiou" for c in t) + 1] for t in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestSentenceTransformerEmbeddings:
+    def test_encodes_documents_in_one_batched_call(self):
+        model = FakeSentenceTransformer()
+        embeddings = SentenceTransformerEmbeddings(model, batch_size=16)
+
+        vectors = embeddings.embed_documents(["multa", "quorum", "sindico"])
+        assert len(vectors) == 3
+        assert all(isinstance(x, float) for x in vectors[0])
+        assert model.calls == [(3, 16, True)]
+
+    def test_query_matches_document_vector(self):
+        embeddings = SentenceTransformerEmbeddings(FakeSentenceTransformer())
+        assert embeddings.embed_query("multa") == embeddings.embed_documents(["multa"])[0]
+
+    def test_no_texts(self):
+        model = FakeSentenceTransformer()
+        assert SentenceTransformerEmbeddings(model).embed_documents([]) == []
+        assert model.calls == []
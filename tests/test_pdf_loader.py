@@ -0,0 +1,93 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fpdf import FPDF
+
+from utils import pdf_loader
+from utils.pdf_loader import iter_pdf_pages, split_pdf, split_pdfs
+
+
+def make_pdf(*pages: str) -> bytes:
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=11)
+    for text in pages:
+        pdf.add_page()
+        pdf.multi_cell(0, 8, text)
+    return bytes(pdf.output())
+
+
+@pytest.fixture
+def convencao():
+    return make_pdf(
+        "Art. 1 - E permitida a criacao de animais de pequeno porte.",
+        "Art. 2 - O horario de silencio e das 22h as 8h. " * 20,
+    )
+
+
+class TestIterPdfPages:
+    def test_yields_one_document_per_page(self, convencao):
+        pages = list(iter_pdf_pages(convencao, "convencao.pdf"))
+        assert len(pages) == 2
+        assert "animais de pequeno porte" in pages[0].page_content
+        assert pages[1].metadata["page"] == 1
+        assert pages[1].metadata["source"] == "convencao.pdf"
+
+    def test_does_not_write_files(self, convencao, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        list(iter_pdf_pages(convencao, "convencao.pdf"))
+        assert os.listdir(tmp_path) == []
+
+
+class TestSplitPdf:
+    def test_splits_pages_into_chunks(self, convencao):
+        splits = split_pdf(convencao, "convencao.pdf", chunk_size=200, chunk_overlap=20)
+        assert len(splits) > 2
+        assert all(len(doc.page_content) <= 200 for doc in splits)
+        assert splits[0].metadata["page"] == 0
+        assert splits[-1].metadata["page"] == 1
+
+    def test_concurrent_parsing_keeps_documents_apart(self):
+        documents = [make_pdf(f"Documento numero {idx}") for idx in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda idx: split_pdf(documents[idx], f"doc{idx}.pdf", 1000, 0), range(8)
+            ))
+        for idx, splits in enumerate(results):
+            assert f"Documento numero {idx}" in splits[0].page_content
+            assert splits[0].metadata["source"] == f"doc{idx}.pdf"
+
+    def test_splits_at_articles_with_metadata(self, convencao):
+        splits = split_pdf(convencao, "convencao.pdf", chunk_size=2000, chunk_overlap=0)
+        assert [doc.metadata["article"] for doc in splits] == ["1", "2"]
+        assert splits[1].page_content.startswith("Art. 2")
+        assert splits[1].metadata["page"] == 1
+
+    def test_packs_whole_units(self, convencao):
+        splits = split_pdf(convencao, "convencao.pdf", chunk_size=2000, chunk_overlap=0, pack_units=True)
+        assert len(splits) == 1
+        assert "Art. 1" in splits[0].page_content and "Art. 2" in splits[0].page_content
+
+
+class TestSplitPdfs:
+    def test_parses_in_processes_and_keeps_upload_order(self):
+        documents = [(f"ata{idx}.pdf", make_pdf(f"Ata numero {idx}")) for idx in range(4)]
+        results = split_pdfs(documents, 1000, 0, max_workers=2)
+        assert [r.name for r in results] == ["ata0.pdf", "ata1.pdf", "ata2.pdf", "ata3.pdf"]
+        for idx, result in enumerate(results):
+            assert result.error is None
+            assert f"Ata numero {idx}" in result.chunks[0].page_content
+
+    def test_reports_failures_without_aborting(self):
+        documents = [("ok.pdf", make_pdf("Convencao")), ("ruim.pdf", b"isto nao e um pdf")]
+        results = split_pdfs(documents, 1000, 0, max_workers=2)
+        assert results[0].error is None and results[0].chunks
+        assert results[1].error is not None and results[1].chunks == []
+
+    def test_reuses_one_pool_not_forked_from_the_caller(self):
+        documents = [(f"ata{idx}.pdf", make_pdf(f"Ata numero {idx}")) for idx in range(2)]
+        split_pdfs(documents, 1000, 0, max_workers=2)
+        pool = pdf_loader._pool
+        split_pdfs(documents, 1000, 0, max_workers=2)
+        assert pdf_loader._pool is pool
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
@@ -1,10 +1,21 @@
-import pytest
+import asyncio
+import random
+import time
 from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+import rag_workflow
+from chains.clause_extractor import ExtractedClause
+from utils.pdf_loader import ParsedPdf
 from rag_workflow import (
     ClauseAnalysisResult,
     DocumentAnalysisReport,
     clear_internal_documents,
     get_internal_document_names,
+    merge_clause_results,
 )
 
 
@@ -112,6 +123,26 @@ class TestDocumentAnalysisReport:
         assert result["clauses"] == []
 
 
+@pytest.fixture
+def internal_index_manager(monkeypatch):
+    """Per-tenant internal indexes in ephemeral collections with fake embeddings."""
+    import uuid
+
+    from langchain_chroma import Chroma
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    from utils.internal_index import InternalIndexManager
+
+    prefix = uuid.uuid4().hex[:8]
+    manager = InternalIndexManager(lambda name: Chroma(
+        collection_name=f"{prefix}_{name}",
+        embedding_function=DeterministicFakeEmbedding(size=8),
+    ))
+    monkeypatch.setattr(rag_workflow, "get_internal_index_manager", lambda: manager)
+    return manager
+
+
+@pytest.mark.usefixtures("internal_index_manager")
 class TestInternalDocumentManagement:
     def test_clear_internal_documents(self):
         # Call clear and verify it doesn't raise errors
@@ -128,3 +159,539 @@ class TestInternalDocumentManagement:
         result1 = get_internal_document_names()
         result2 = get_internal_document_names()
         assert result1 is not result2
+
+    def test_documents_are_isolated_per_condominium(self):
+        chunk = Document(page_content="Regimento interno: animais permitidos.")
+        rag_workflow.get_internal_index("condo-a").add_document("regimento.pdf", "hash-a", [chunk])
+
+        assert get_internal_document_names("condo-a") == ["regimento.pdf"]
+        assert get_internal_document_names("condo-b") == []
+        assert rag_workflow.check_internal_docs_available({"tenant_id": "condo-a"}) == "has_internal"
+        assert rag_workflow.check_internal_docs_available({"tenant_id": "condo-b"}) == "no_internal"
+
+        clear_internal_documents("condo-a")
+        assert get_internal_document_names("condo-a") == []
+
+    def test_add_and_remove_single_documents(self, monkeypatch):
+        parsed = []
+
+        def fake_split(filename, file_bytes):
+            parsed.append(file_bytes)
+            return [Document(page_content=file_bytes.decode("utf-8"))]
+
+        monkeypatch.setattr(rag_workflow, "_split_internal_document", fake_split)
+
+        convencao = rag_workflow.add_internal_document("convencao.pdf", b"convencao", "condo")
+        ata = rag_workflow.add_internal_document("ata.pdf", b"ata", "condo")
+        rag_workflow.add_internal_document("convencao-copia.pdf", b"convencao", "condo")
+
+        assert parsed == [b"convencao", b"ata"]
+        assert rag_workflow.get_internal_documents("condo") == [(convencao, "convencao.pdf"), (ata, "ata.pdf")]
+
+        assert rag_workflow.remove_internal_document(ata, "condo")
+        assert get_internal_document_names("condo") == ["convencao.pdf"]
+
+    def test_set_internal_retriever_only_indexes_changes(self, monkeypatch):
+        parsed = []
+
+        def fake_split_pdfs(documents, chunk_size, chunk_overlap, max_workers):
+            parsed.extend(file_bytes for _, file_bytes in documents)
+            return [ParsedPdf(name=name, chunks=[Document(page_content="texto")]) for name, _ in documents]
+
+        monkeypatch.setattr(rag_workflow, "split_pdfs", fake_split_pdfs)
+
+        rag_workflow.set_internal_retriever([("convencao.pdf", b"convencao"), ("ata.pdf", b"ata")], "condo")
+        rag_workflow.set_internal_retriever([("convencao.pdf", b"convencao"), ("ata2.pdf", b"ata2")], "condo")
+
+        assert parsed == [b"convencao", b"ata", b"ata2"]
+        assert get_internal_document_names("condo") == ["convencao.pdf", "ata2.pdf"]
+
+    def test_add_internal_documents_reports_failures(self, monkeypatch):
+        def fake_split_pdfs(documents, chunk_size, chunk_overlap, max_workers):
+            return [
+                ParsedPdf(name=name, error="PDF corrompido") if file_bytes == b"ruim"
+                else ParsedPdf(name=name, chunks=[Document(page_content=file_bytes.decode("utf-8"))])
+                for name, file_bytes in documents
+            ]
+
+        monkeypatch.setattr(rag_workflow, "split_pdfs", fake_split_pdfs)
+        rag_workflow.add_internal_documents([("ata1.pdf", b"ata1")], "condo")
+
+        results = rag_workflow.add_internal_documents(
+            [("ata2.pdf", b"ata2"), ("ruim.pdf", b"ruim"), ("ata1.pdf", b"ata1")], "condo"
+        )
+
+        assert [(r["name"], r["status"]) for r in results] == [
+            ("ata2.pdf", "added"), ("ruim.pdf", "failed"), ("ata1.pdf", "already_indexed"),
+        ]
+        assert results[1]["error"] == "PDF corrompido"
+        assert get_internal_document_names("condo") == ["ata1.pdf", "ata2.pdf"]
+
+
+class TestMergeClauseResults:
+    def test_keeps_clause_order(self):
+        left = [{"clause_index": 0}, {"clause_index": 3}]
+        right = [{"clause_index": 1}, {"clause_index": 2}]
+        result = merge_clause_results(left, right)
+        assert [r["clause_index"] for r in result] == [0, 1, 2, 3]
+
+    def test_empty_lists(self):
+        assert merge_clause_results([], []) == []
+
+
+class TestAnalysisGraph:
+    @pytest.fixture
+    def fake_chains(self, monkeypatch):
+        clauses = [
+            ExtractedClause(clause_number=f"Art. {i}", clause_text=f"Clausula {i}", topic="general")
+            for i in range(1, 11)
+        ]
+
+        class FakeExtractor:
+            def batch(self, inputs, config=None, return_exceptions=False):
+                return [SimpleNamespace(clauses=clauses) for _ in inputs]
+
+            async def abatch(self, inputs, config=None, return_exceptions=False):
+                return self.batch(inputs, config, return_exceptions)
+
+        def analysis(inputs):
+            return SimpleNamespace(
+                is_potentially_illegal=inputs["clause_number"] == "Art. 3",
+                confidence="alta",
+                conflicting_articles=[],
+                explanation="",
+                legal_principle_violated=None,
+                recommendation="",
+            )
+
+        class FakeDetector:
+            def invoke(self, inputs):
+                # Finish out of order to exercise the ordered merge
+                time.sleep(random.uniform(0, 0.02))
+                return analysis(inputs)
+
+            async def ainvoke(self, inputs):
+                await asyncio.sleep(random.uniform(0, 0.02))
+                return analysis(inputs)
+
+        class FakeRetriever:
+            def invoke(self, query):
+                return []
+
+            async def ainvoke(self, query):
+                return []
+
+        monkeypatch.setattr(rag_workflow, "clause_extractor_chain", FakeExtractor())
+        monkeypatch.setattr(rag_workflow, "illegality_detector_chain", FakeDetector())
+        monkeypatch.setattr(rag_workflow, "get_retriever", lambda: FakeRetriever())
+
+    def test_analyzes_every_clause_in_order(self, fake_chains):
+        result = rag_workflow.get_analysis_graph().invoke(
+            {"document_chunks": ["a", "b"], "extracted_clauses": [], "analysis_results": []},
+            config={"max_concurrency": 4},
+        )
+        numbers = [r["clause_number"] for r in result["analysis_results"]]
+        assert numbers == [f"Art. {i}" for i in range(1, 11)]
+        flagged = [r["clause_number"] for r in result["analysis_results"] if r["is_potentially_illegal"]]
+        assert flagged == ["Art. 3"]
+
+    def test_aanalyze_document_awaits_the_graph(self, monkeypatch, fake_chains):
+        splits = [Document(page_content="a"), Document(page_content="b")]
+        monkeypatch.setattr(rag_workflow, "split_pdf", lambda *args, **kwargs: splits)
+
+        report = asyncio.run(rag_workflow.aanalyze_document(b"%PDF", "convencao.pdf"))
+        assert report.document_name == "convencao.pdf"
+        assert [c.clause_number for c in report.clauses] == [f"Art. {i}" for i in range(1, 11)]
+        assert report.potentially_illegal_count == 1
+
+    def test_no_clauses(self, monkeypatch):
+        class EmptyExtractor:
+            def batch(self, inputs, config=None, return_exceptions=False):
+                return [SimpleNamespace(clauses=[]) for _ in inputs]
+
+        monkeypatch.setattr(rag_workflow, "clause_extractor_chain", EmptyExtractor())
+        result = rag_workflow.get_analysis_graph().invoke(
+            {"document_chunks": ["a"], "extracted_clauses": [], "analysis_results": []}
+        )
+        assert result["analysis_results"] == []
+
+
+class TestExtractClausesNode:
+    def test_isolates_failed_chunks_and_keeps_order(self, monkeypatch):
+        class FlakyExtractor:
+            def batch(self, inputs, config=None, return_exceptions=False):
+                assert return_exceptions
+                assert config["max_concurrency"] == rag_workflow.CLAUSE_EXTRACTION_MAX_CONCURRENCY
+                results = []
+                for item in inputs:
+                    if item["document_chunk"] == "broken":
+                        results.append(ValueError("boom"))
+                    else:
+                        results.append(SimpleNamespace(clauses=[
+                            ExtractedClause(
+                                clause_number=item["document_chunk"],
+                                clause_text=item["document_chunk"],
+                                topic="general",
+                            )
+                        ]))
+                return results
+
+        monkeypatch.setattr(rag_workflow, "clause_extractor_chain", FlakyExtractor())
+        result = rag_workflow.extract_clauses_node({
+            "document_chunks": ["Art. 1", "broken", "Art. 2", "Art. 1"],
+            "extracted_clauses": [],
+            "analysis_results": [],
+        })
+        numbers = [c["clause_number"] for c in result["extracted_clauses"]]
+        assert numbers == ["Art. 1", "Art. 2"]
+
+    def test_only_unstructured_chunks_reach_the_llm(self, monkeypatch):
+        sent = []
+
+        class RecordingExtractor:
+            def batch(self, inputs, config=None, return_exceptions=False):
+                sent.extend(item["document_chunk"] for item in inputs)
+                return [SimpleNamespace(clauses=[
+                    ExtractedClause(clause_number="Item 1", clause_text=item["document_chunk"], topic="general")
+                ]) for item in inputs]
+
+            async def abatch(self, inputs, config=None, return_exceptions=False):
+                return self.batch(inputs, config, return_exceptions)
+
+        monkeypatch.setattr(rag_workflow, "clause_extractor_chain", RecordingExtractor())
+        state = {
+            "document_chunks": ["Art. 1º - É proibida a criação de animais.", "1. Sem numeração legal."],
+            "extracted_clauses": [],
+            "analysis_results": [],
+        }
+        for result in (rag_workflow.extract_clauses_node(state),
+                       asyncio.run(rag_workflow.aextract_clauses_node(state))):
+            assert [c["clause_number"] for c in result["extracted_clauses"]] == ["Art. 1", "Item 1"]
+            assert result["extracted_clauses"][0]["topic"] == "pets"
+        assert sent == ["1. Sem numeração legal."] * 2
+
+        monkeypatch.setattr(rag_workflow, "CLAUSE_SEGMENTER_ENABLED", False)
+        sent.clear()
+        rag_workflow.extract_clauses_node(state)
+        assert len(sent) == 2
+
+    def test_numbers_continuation_chunks_after_their_part(self, monkeypatch):
+        heading = "Art. 5º São deveres do condômino:"
+        state = {
+            "document_chunks": [f"{heading}\nI - pagar a taxa.", f"{heading}\n§ 1º O atraso implica multa."],
+            "chunk_metadata": [{"article": "5"}, {"article": "5", "paragraph": "1", "continuation": True}],
+            "extracted_clauses": [],
+            "analysis_results": [],
+        }
+        result = rag_workflow.extract_clauses_node(state)
+        assert [c["clause_number"] for c in result["extracted_clauses"]] == ["Art. 5", "Art. 5, § 1º"]
+
+
+class TestCitedArticles:
+    @pytest.fixture
+    def article_index(self, monkeypatch):
+        from utils.article_index import ArticleIndex
+
+        index = ArticleIndex.from_documents([
+            Document(page_content="Art. 1.336. São deveres do condômino"),
+            Document(page_content="Art. 1.337. O condômino que não cumpre"),
+        ])
+        monkeypatch.setattr(rag_workflow, "get_article_index", lambda: index)
+        return index
+
+    def test_retrieve_merges_cited_articles_first(self, monkeypatch, article_index):
+        vector_docs = [Document(page_content="Art. 1.335. São direitos"),
+                       Document(page_content="Art. 1.337. O condômino que não cumpre")]
+        monkeypatch.setattr(rag_workflow, "RERANK_ENABLED", False)
+        monkeypatch.setattr(rag_workflow, "get_retriever",
+                            lambda: SimpleNamespace(invoke=lambda question, **kwargs: vector_docs))
+
+        result = rag_workflow.retrieve({"question": "O que dizem os arts. 1.337 e 1.336?"})
+        contents = [doc.page_content[:10] for doc in result["documents"]]
+        assert contents == ["Art. 1.337", "Art. 1.336", "Art. 1.335"]
+        assert len(result["cited_documents"]) == 2
+
+    def test_lookup_can_be_disabled(self, monkeypatch, article_index):
+        monkeypatch.setattr(rag_workflow, "ARTICLE_LOOKUP_ENABLED", False)
+        assert rag_workflow.cited_articles("art. 1.336") == []
+
+    def test_rerank_keeps_cited_articles(self, monkeypatch, article_index):
+        cited = article_index.find("art. 1.336")
+        others = [Document(page_content="Art. 1.335. São direitos"), Document(page_content="Art. 1.348")]
+
+        class FakeReranker:
+            def rerank(self, question, documents, top_k, threshold):
+                assert cited[0] not in documents
+                return documents[:1]
+
+        monkeypatch.setattr(rag_workflow, "get_reranker", lambda: FakeReranker())
+        result = rag_workflow.rerank_documents({
+            "question": "o que diz o art. 1.336?",
+            "documents": cited + others,
+            "cited_documents": cited,
+        })
+        assert result["documents"] == cited + others[:1]
+
+
+class TestInternalNode:
+    def test_keeps_only_relevant_internal_documents(self, monkeypatch):
+        class FakeGrader:
+            def batch(self, inputs, config=None, return_exceptions=False):
+                results = []
+                for item in inputs:
+                    content = item["document"].page_content
+                    if content == "erro":
+                        results.append(RuntimeError("boom"))
+                    else:
+                        results.append(SimpleNamespace(score="Sim" if content.startswith("rel") else "não"))
+                return results
+
+        monkeypatch.setattr(rag_workflow, "internal_docs", FakeGrader())
+        external = [Document(page_content="Art. 1336")]
+        internal_docs = [
+            Document(page_content="relevante 1"),
+            Document(page_content="irrelevante"),
+            Document(page_content="erro"),
+            Document(page_content="relevante 2"),
+            Document(page_content="relevante 1"),
+        ]
+        result = rag_workflow.internal({
+            "question": "pergunta",
+            "documents": external,
+            "internal_documents": internal_docs,
+        })
+        contents = [doc.page_content for doc in result["documents"]]
+        assert contents == ["Art. 1336", "relevante 1", "relevante 2"]
+        assert external == [Document(page_content="Art. 1336")]
+
+
+class TestProcessQuestionCache:
+    def test_second_call_is_served_from_cache(self, monkeypatch, tmp_path):
+        from utils.answer_cache import AnswerCache
+
+        calls = []
+
+        class FakeGraph:
+            def invoke(self, input):
+                calls.append(input["question"])
+                return {
+                    "question": input["question"],
+                    "solution": "resposta",
+                    "documents": [Document(page_content="Art. 1336")],
+                }
+
+        cache = AnswerCache(str(tmp_path / "answers.sqlite3"))
+        monkeypatch.setattr(rag_workflow, "ANSWER_CACHE_ENABLED", True)
+        monkeypatch.setattr(rag_workflow, "get_graph", lambda: FakeGraph())
+        monkeypatch.setattr(rag_workflow, "get_answer_cache", lambda: cache)
+        monkeypatch.setattr(rag_workflow, "_context_fingerprint", lambda tenant_id: "ctx")
+
+        first, _ = rag_workflow.process_question("Posso ter cachorro?")
+        second, _ = rag_workflow.process_question("posso ter cachorro")
+        assert calls == ["Posso ter cachorro?"]
+        assert second["solution"] == first["solution"]
+        assert second["documents"][0].page_content == "Art. 1336"
+
+    def test_fingerprint_changes_with_the_model_and_prompts(self, monkeypatch):
+        collection = SimpleNamespace(id="c", count=lambda: 3)
+        monkeypatch.setattr(rag_workflow, "get_vectorstore", lambda: SimpleNamespace(_collection=collection))
+        monkeypatch.setattr(rag_workflow, "get_internal_index", lambda tenant_id: SimpleNamespace(fingerprint="i"))
+        monkeypatch.setattr(rag_workflow, "_ingest_version", lambda: "v")
+
+        fingerprint = rag_workflow._context_fingerprint()
+        monkeypatch.setattr(rag_workflow, "MODEL_NAME", "another-model")
+        other_model = rag_workflow._context_fingerprint()
+        monkeypatch.setattr(rag_workflow, "ANSWER_PROMPT_VERSION", rag_workflow.ANSWER_PROMPT_VERSION + 1)
+        other_prompts = rag_workflow._context_fingerprint()
+        assert len({fingerprint, other_model, other_prompts}) == 3
+
+
+class TestStreamQuestion:
+    @pytest.fixture
+    def graph(self, monkeypatch, internal_index_manager):
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+        from langchain_core.output_parsers import StrOutputParser
+
+        from chains.generate_answer import prompt
+
+        model = GenericFakeChatModel(messages=iter([AIMessage(content="O condômino deve pagar as despesas.")]))
+        async def ainvoke(question, **kwargs):
+            return [Document(page_content="Art. 1336")]
+
+        retriever = SimpleNamespace(
+            invoke=lambda question, **kwargs: [Document(page_content="Art. 1336")],
+            ainvoke=ainvoke,
+        )
+
+        monkeypatch.setattr(rag_workflow, "RERANK_ENABLED", False)
+        monkeypatch.setattr(rag_workflow, "ANSWER_CACHE_ENABLED", False)
+        monkeypatch.setattr(rag_workflow, "get_retriever", lambda: retriever)
+        monkeypatch.setattr(rag_workflow, "generate_chain", prompt | model | StrOutputParser())
+        compiled = rag_workflow.create_graph()
+        monkeypatch.setattr(rag_workflow, "get_graph", lambda: compiled)
+        return compiled
+
+    def test_streams_answer_tokens_and_keeps_final_state(self, graph):
+        stream = rag_workflow.stream_question("Quem paga as despesas?")
+        tokens = list(stream)
+
+        assert len(tokens) > 1
+        assert "".join(tokens) == "O condômino deve pagar as despesas."
+        assert stream.result["solution"] == "O condômino deve pagar as despesas."
+        assert stream.result["documents"][0].page_content == "Art. 1336"
+
+    def test_cached_answer_is_yielded_at_once(self, monkeypatch, graph):
+        cached = {"question": "q", "solution": "resposta em cache", "documents": []}
+        monkeypatch.setattr(rag_workflow, "ANSWER_CACHE_ENABLED", True)
+        monkeypatch.setattr(rag_workflow, "_context_fingerprint", lambda tenant_id: "ctx")
+        monkeypatch.setattr(rag_workflow, "_get_cached_answer", lambda question, fingerprint: cached)
+
+        stream = rag_workflow.stream_question("q")
+        assert list(stream) == ["resposta em cache"]
+        assert stream.result is cached
+
+    def test_aprocess_question_runs_the_graph_asynchronously(self, graph):
+        result, footprint = asyncio.run(rag_workflow.aprocess_question("Quem paga as despesas?"))
+
+        assert result["solution"] == "O condômino deve pagar as despesas."
+        assert result["documents"][0].page_content == "Art. 1336"
+        assert set(footprint) == {"memory_diff", "cpu_diff"}
+
+
+class TestPostProcessAnswer:
+    def test_runs_both_calls_in_parallel(self, monkeypatch):
+        def slow_sources(answer, documents, question):
+            time.sleep(0.2)
+            return documents[:1]
+
+        def slow_suggestion(question, answer):
+            time.sleep(0.2)
+            return {"should_suggest": False}
+
+        monkeypatch.setattr(rag_workflow, "identify_used_sources", slow_sources)
+        monkeypatch.setattr(rag_workflow, "check_document_suggestion", slow_suggestion)
+
+        docs = [Document(page_content="Art. 1336"), Document(page_content="Art. 1337")]
+        start = time.perf_counter()
+        result = rag_workflow.post_process_answer("pergunta", "resposta", docs)
+
+        assert time.perf_counter() - start < 0.35
+        assert result == {"sources": docs[:1], "suggestion": {"should_suggest": False}}
+
+    def test_async_version_can_be_cancelled(self, monkeypatch):
+        import asyncio
+
+        cancelled = []
+
+        async def never_finishes(*args):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        monkeypatch.setattr(rag_workflow, "aidentify_used_sources", never_finishes)
+        monkeypatch.setattr(rag_workflow, "acheck_document_suggestion", never_finishes)
+
+        async def run():
+            task = asyncio.ensure_future(rag_workflow.apost_process_answer("pergunta", "resposta", []))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        assert cancelled == [True, True]
+
+
+class TestSpeculativeAnswer:
+    @pytest.fixture
+    def fake_stream(self, monkeypatch):
+        """AnswerStream replacement that records whether it ran and was closed."""
+        events = []
+
+        class FakeAnswerStream:
+            def __init__(self, question, tenant_id):
+                self.result = None
+                self.footprint = None
+
+            def __iter__(self):
+                events.append("started")
+                try:
+                    for token in ["O ", "condômino ", "paga."]:
+                        time.sleep(0.05)
+                        yield token
+                    self.result = {"solution": "O condômino paga."}
+                finally:
+                    events.append("closed")
+
+        monkeypatch.setattr(rag_workflow, "AnswerStream", FakeAnswerStream)
+        return events
+
+    def test_streams_answer_when_not_a_document_request(self, monkeypatch, fake_stream):
+        monkeypatch.setattr(
+            rag_workflow, "detect_explicit_document_request",
+            lambda question: time.sleep(0.1) or {"is_explicit_request": False},
+        )
+        answer = rag_workflow.SpeculativeAnswer("Quem paga a taxa condominial, afinal")
+
+        assert answer.document_request == {"is_explicit_request": False}
+        assert "".join(answer) == "O condômino paga."
+        assert answer.result == {"solution": "O condômino paga."}
+
+    def test_cancels_answer_for_document_requests(self, monkeypatch, fake_stream):
+        monkeypatch.setattr(
+            rag_workflow, "detect_explicit_document_request",
+            lambda question: time.sleep(0.07) or {"is_explicit_request": True, "document_type": "advertencia"},
+        )
+        answer = rag_workflow.SpeculativeAnswer("Preciso de uma advertência")
+
+        assert answer.cancelled
+        assert list(answer) != ["O ", "condômino ", "paga."]
+        assert fake_stream == ["started", "closed"]
+        assert answer.result is None
+
+    def test_streams_answer_for_requests_without_a_document_type(self, monkeypatch, fake_stream):
+        monkeypatch.setattr(
+            rag_workflow, "detect_explicit_document_request",
+            lambda question: {"is_explicit_request": True, "document_type": None},
+        )
+        answer = rag_workflow.SpeculativeAnswer("Preciso de um documento")
+
+        assert not rag_workflow.opens_document_form(answer.document_request)
+        assert not answer.cancelled
+        assert "".join(answer) == "O condômino paga."
+        assert answer.result == {"solution": "O condômino paga."}
+
+    def test_local_prefilter_skips_the_answer(self, monkeypatch, fake_stream):
+        def fail(question):
+            raise AssertionError("detector model should not be called")
+
+        monkeypatch.setattr(rag_workflow, "detect_explicit_document_request", fail)
+        answer = rag_workflow.SpeculativeAnswer("Redija uma notificação de barulho para o 101")
+
+        assert answer.document_request["document_type"] == "notificacao_barulho"
+        assert list(answer) == []
+        assert fake_stream == []
+
+
+class TestDetectExplicitDocumentRequest:
+    @pytest.mark.parametrize("question", [
+        "Notificação de inadimplência para a unidade 45",
+        "Advertência para o morador do 302 por barulho",
+        "Me ajude com uma convocação de assembleia",
+        "Você pode me enviar um comunicado sobre a piscina?",
+    ])
+    def test_requests_the_prefilter_misses_reach_the_model(self, monkeypatch, question):
+        asked = []
+
+        class FakeDetector:
+            def invoke(self, inputs):
+                asked.append(inputs["question"])
+                return SimpleNamespace(is_explicit_request=True, document_type="comunicado_geral",
+                                       document_name="Comunicado Geral", extracted_context=inputs["question"])
+
+        monkeypatch.setattr(rag_workflow, "document_request_detector_chain", FakeDetector())
+        assert rag_workflow.detect_explicit_document_request(question)["is_explicit_request"] is True
+        assert asked == [question]
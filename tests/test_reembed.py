@@ -0,0 +1,68 @@
+import chromadb
+import pytest
+from chromadb.config import Settings
+from langchain_chroma import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from ingest.reembed import base_names, copy_collection, reembed
+from resources import CIVIL_CODE_COLLECTION
+
+LOCAL = "__local_0123abcd"
+
+
+class CountingFakeEmbedding(DeterministicFakeEmbedding):
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def client(tmp_path):
+    return chromadb.PersistentClient(path=str(tmp_path), settings=Settings(anonymized_telemetry=False))
+
+
+def store(client, name, size=8):
+    return Chroma(client=client, collection_name=name, embedding_function=DeterministicFakeEmbedding(size=size))
+
+
+class TestCopyCollection:
+    def test_copies_ids_texts_and_metadata_once(self, client):
+        source = store(client, "source")
+        source.add_texts(["Art. 1.336", "Art. 1.337"], metadatas=[{"source": "a"}, {"source": "b"}],
+                         ids=["art-1336", "art-1337"])
+        embeddings = CountingFakeEmbedding(size=4)
+        target = Chroma(client=client, collection_name="target", embedding_function=embeddings)
+
+        assert copy_collection(source, target, batch_size=1) == 2
+        assert copy_collection(source, target) == 0
+        assert embeddings.calls == 2
+
+        copied = target.get(ids=["art-1337"], include=["documents", "metadatas", "embeddings"])
+        assert copied["documents"] == ["Art. 1.337"]
+        assert copied["metadatas"] == [{"source": "b"}]
+        assert len(copied["embeddings"][0]) == 4
+
+
+class TestReembed:
+    def test_base_names_by_backend(self, client):
+        for name in ["internal_a_111111111111", "internal_a_111111111111" + LOCAL, "langchain"]:
+            client.create_collection(name)
+        assert base_names(client, "") == ["internal_a_111111111111"]
+        assert base_names(client, LOCAL) == ["internal_a_111111111111"]
+
+    def test_fills_every_target_collection(self, tmp_path):
+        settings = Settings(anonymized_telemetry=False)
+        civil_code = chromadb.PersistentClient(path=str(tmp_path / "db"), settings=settings)
+        internal = chromadb.PersistentClient(path=str(tmp_path / "internal"), settings=settings)
+        store(civil_code, CIVIL_CODE_COLLECTION).add_texts(["Art. 1.336"], ids=["art-1336"])
+        store(internal, "internal_a_111111111111").add_texts(["Regimento"], ids=["h:0"])
+        store(internal, "internal_b_222222222222").add_texts(["Convenção"], ids=["h:0"])
+
+        added = reembed(civil_code, internal, DeterministicFakeEmbedding(size=4), "", LOCAL)
+        assert added == {CIVIL_CODE_COLLECTION: 1, "internal_a_111111111111": 1, "internal_b_222222222222": 1}
+        assert store(internal, "internal_b_222222222222" + LOCAL, size=4).get()["documents"] == ["Convenção"]
+        assert reembed(civil_code, internal, DeterministicFakeEmbedding(size=4), "", LOCAL) == {
+            CIVIL_CODE_COLLECTION: 0, "internal_a_111111111111": 0, "internal_b_222222222222": 0,
+        }
@@ -0,0 +1,74 @@
+import pytest
+from langchain_core.documents import Document
+
+from utils.reranker import CachedReranker, document_id, hash_text
+
+
+class FakeCrossEncoder:
+    """Scores a pair by the number of question words found in the chunk."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32):
+        self.calls.append(len(pairs))
+        return [
+            float(sum(word in text for word in question.split()))
+            for question, text in pairs
+        ]
+
+
+@pytest.fixture
+def documents():
+    return [
+        Document(page_content="multa de ate dois por cento", id="a"),
+        Document(page_content="quorum de dois tercos", id="b"),
+        Document(page_content="animais de estimacao", id="c"),
+    ]
+
+
+class TestDocumentId:
+    def test_uses_vector_store_id(self):
+        assert document_id(Document(page_content="x", id="abc")) == "abc"
+
+    def test_falls_back_to_content_hash(self):
+        doc = Document(page_content="texto")
+        assert document_id(doc) == hash_text("texto")
+
+
+class TestCachedReranker:
+    def test_scores_all_pairs_in_one_call(self, documents):
+        model = FakeCrossEncoder()
+        reranker = CachedReranker(model)
+        scores = reranker.score("quorum dois tercos", documents)
+        assert scores == [1.0, 3.0, 0.0]
+        assert model.calls == [3]
+
+    def test_reuses_cached_scores(self, documents):
+        model = FakeCrossEncoder()
+        reranker = CachedReranker(model)
+        reranker.score("quorum dois tercos", documents[:2])
+        reranker.score("quorum dois tercos", documents)
+        assert model.calls == [2, 1]
+
+    def test_cache_is_per_question(self, documents):
+        model = FakeCrossEncoder()
+        reranker = CachedReranker(model)
+        reranker.score("quorum", documents)
+        reranker.score("multa", documents)
+        assert model.calls == [3, 3]
+
+    def test_rerank_orders_and_filters(self, documents):
+        reranker = CachedReranker(FakeCrossEncoder())
+        result = reranker.rerank("quorum dois tercos", documents, top_k=5, threshold=0.5)
+        assert [doc.id for doc in result] == ["b", "a"]
+
+    def test_rerank_applies_top_k(self, documents):
+        reranker = CachedReranker(FakeCrossEncoder())
+        result = reranker.rerank("quorum dois tercos", documents, top_k=1, threshold=-1)
+        assert [doc.id for doc in result] == ["b"]
+
+    def test_rerank_empty(self):
+        model = FakeCrossEncoder()
+        assert CachedReranker(model).rerank("q", [], top_k=5, threshold=0) == []
+        assert model.calls == []
@@ -0,0 +1,145 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+import resources
+from resources import get_chat_model, is_loaded, lazy_resource, lazy_runnable, reset_resources
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    reset_resources()
+    yield
+    reset_resources()
+
+
+class TestLazyResource:
+    def test_creates_once(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        first = lazy_resource("thing", factory)
+        second = lazy_resource("thing", factory)
+        assert first is second
+        assert len(calls) == 1
+
+    def test_is_loaded(self):
+        assert is_loaded("thing") is False
+        lazy_resource("thing", object)
+        assert is_loaded("thing") is True
+
+    def test_reset_resources(self):
+        first = lazy_resource("thing", object)
+        reset_resources()
+        assert lazy_resource("thing", object) is not first
+
+
+class TestLazyRunnable:
+    def test_defers_creation_until_invoked(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return FakeListChatModel(responses=["resposta"] * 5)
+
+        chain = ChatPromptTemplate.from_messages([("human", "{q}")]) | lazy_runnable("llm", factory) | StrOutputParser()
+        assert calls == []
+        assert chain.invoke({"q": "pergunta"}) == "resposta"
+        assert chain.batch([{"q": "a"}, {"q": "b"}]) == ["resposta", "resposta"]
+        assert "".join(chain.stream({"q": "c"})) == "resposta"
+        assert len(calls) == 1
+
+
+class TestGetChatModel:
+    def test_keyed_by_model_and_temperature(self, monkeypatch):
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        assert get_chat_model(0) is get_chat_model(0)
+        assert get_chat_model(0) is not get_chat_model(0.3)
+        assert get_chat_model(0, "other-model") is not get_chat_model(0)
+
+    def test_models_share_one_pooled_client(self, monkeypatch):
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        shared = resources.get_genai_client()
+        assert get_chat_model(0).client is shared
+        assert get_chat_model(0.3).client is shared
+        assert shared._api_client._httpx_client is resources.get_llm_http_client()
+        assert shared._api_client._async_httpx_client is resources.get_llm_async_http_client()
+        assert not shared._api_client._use_aiohttp()
+
+
+class TestAsyncLlmHttpClient:
+    def test_one_capped_pool_per_event_loop(self, monkeypatch):
+        import asyncio
+
+        import httpx
+
+        pools = []
+
+        class FakeTransport(httpx.AsyncBaseTransport):
+            def __init__(self, limits):
+                self.limits = limits
+                pools.append(self)
+
+            async def handle_async_request(self, request):
+                return httpx.Response(200, request=request)
+
+        monkeypatch.setattr(httpx, "AsyncHTTPTransport", FakeTransport)
+        client = resources.get_llm_async_http_client()
+
+        async def two_requests():
+            await client.get("https://llm.test/a")
+            await client.get("https://llm.test/b")
+
+        asyncio.run(two_requests())
+        assert len(pools) == 1
+        asyncio.run(two_requests())
+        assert len(pools) == 2
+        assert all(pool.limits.max_connections == resources.LLM_MAX_CONNECTIONS for pool in pools)
+
+
+class TestGetEmbeddings:
+    def test_pipeline_behind_the_cache(self, monkeypatch, tmp_path):
+        from utils.embedding_cache import CachedEmbeddings
+        from utils.embedding_pipeline import BatchedEmbeddings
+
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        monkeypatch.setattr(resources, "EMBEDDING_CACHE_ENABLED", True)
+        monkeypatch.setattr(resources, "EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+
+        embeddings = resources.get_embeddings()
+        assert isinstance(embeddings, CachedEmbeddings)
+        assert isinstance(embeddings.underlying, BatchedEmbeddings)
+        assert embeddings.path == str(tmp_path / "embeddings.sqlite3")
+
+
+class TestImportIsLazy:
+    def test_importing_workflow_creates_no_clients(self):
+        import rag_workflow  # noqa: F401
+        for name in ("embeddings", "vectorstore", "retriever", "reranker"):
+            assert not is_loaded(name)
+        assert not any(key.startswith("chat_model") for key in resources._registry)
+
+    def test_each_backend_has_its_own_collections_and_cache_namespace(self, monkeypatch):
+        local = resources.collection_suffix("local")
+        assert resources.collection_suffix("google") == ""
+        assert local.startswith("__local_")
+        assert resources.embedding_namespace("local") != resources.embedding_namespace("google")
+
+        # Another local model gets other collections
+        monkeypatch.setattr(resources, "LOCAL_EMBEDDING_MODEL_NAME", "other-model")
+        assert resources.collection_suffix("local") != local
+        assert resources.embedding_namespace("local") == "local:other-model"
+
+    def test_each_backend_has_its_own_ingest_manifest(self, monkeypatch):
+        monkeypatch.setattr(resources, "INGEST_MANIFEST_PATH", "./db/ingest_manifest.json")
+        assert resources.ingest_manifest_path("google") == "./db/ingest_manifest.json"
+        local = resources.ingest_manifest_path("local")
+        assert local == f"./db/ingest_manifest{resources.collection_suffix('local')}.json"
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            resources.create_embeddings("nope")
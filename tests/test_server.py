@@ -0,0 +1,255 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import FormData
+from aiohttp.test_utils import TestClient, TestServer
+from langchain_core.documents import Document
+
+import server
+
+
+def run(app, scenario):
+    """Run an async scenario against the app on a test server."""
+    async def main():
+        async with TestClient(TestServer(app)) as client:
+            return await scenario(client)
+    return asyncio.run(main())
+
+
+def pdf_form(*names):
+    form = FormData()
+    for name in names:
+        form.add_field("file", b"%PDF-1.4 " + name.encode(), filename=name, content_type="application/pdf")
+    return form
+
+
+@pytest.fixture
+def fake_workflow(monkeypatch):
+    async def aprocess_question(question, tenant_id):
+        return {"solution": f"resposta para {tenant_id}", "documents": [Document(page_content="Art. 1336")]}, {}
+
+    async def apost_process_answer(question, answer, documents):
+        return {"sources": documents, "suggestion": {"should_suggest": False}}
+
+    monkeypatch.setattr(server, "aprocess_question", aprocess_question)
+    monkeypatch.setattr(server, "apost_process_answer", apost_process_answer)
+
+
+class TestWorkerPool:
+    def test_rejects_jobs_beyond_the_queue(self):
+        async def scenario():
+            pool = server.WorkerPool("test", workers=1, max_queue=1)
+            await pool.start()
+            release = asyncio.Event()
+
+            async def job():
+                await release.wait()
+                return "ok"
+
+            running = pool.submit(job)
+            await asyncio.sleep(0)  # the worker picks up the first job
+            queued = pool.submit(job)
+            with pytest.raises(asyncio.QueueFull):
+                pool.submit(job)
+            assert pool.stats() == {"workers": 1, "busy": 1, "queued": 1, "max_queue": 1}
+
+            release.set()
+            assert await running == "ok"
+            assert await queued == "ok"
+            await pool.stop()
+
+        asyncio.run(scenario())
+
+    def test_propagates_job_errors(self):
+        async def scenario():
+            pool = server.WorkerPool("test", workers=2, max_queue=2)
+            await pool.start()
+
+            async def job():
+                raise ValueError("boom")
+
+            with pytest.raises(ValueError):
+                await pool.submit(job)
+            await pool.stop()
+
+        asyncio.run(scenario())
+
+
+class TestAsk:
+    def test_answers_with_sources(self, fake_workflow):
+        async def scenario(client):
+            response = await client.post("/ask", json={"question": "Posso ter cachorro?"},
+                                         headers={"X-Tenant-ID": "condo-a"})
+            return response.status, await response.json()
+
+        status, body = run(server.create_app(), scenario)
+        assert status == 200
+        assert body["answer"] == "resposta para condo-a"
+        assert body["sources"] == [{"source": "", "content": "Art. 1336"}]
+        assert body["suggestion"] == {"should_suggest": False}
+
+    def test_requires_a_question(self, fake_workflow):
+        async def scenario(client):
+            response = await client.post("/ask", json={"question": " "})
+            return response.status
+
+        assert run(server.create_app(), scenario) == 400
+
+    def test_rejects_requests_when_the_queue_is_full(self, monkeypatch, fake_workflow):
+        app = server.create_app(ask_workers=1, ask_queue_size=1)
+        pool = app[server.ASK_POOL]
+
+        async def wait_for(busy, queued):
+            while (pool.busy, pool.queued) != (busy, queued):
+                await asyncio.sleep(0.01)
+
+        async def scenario(client):
+            release = asyncio.Event()
+
+            async def slow(question, tenant_id):
+                await release.wait()
+                return {"solution": "resposta", "documents": []}, {}
+
+            monkeypatch.setattr(server, "aprocess_question", slow)
+            first = asyncio.ensure_future(client.post("/ask", json={"question": "um"}))
+            await asyncio.wait_for(wait_for(1, 0), 5)
+            second = asyncio.ensure_future(client.post("/ask", json={"question": "dois"}))
+            await asyncio.wait_for(wait_for(1, 1), 5)
+            rejected = await client.post("/ask", json={"question": "tres"})
+
+            release.set()
+            statuses = [(await first).status, (await second).status]
+            return rejected.status, rejected.headers.get("Retry-After"), statuses
+
+        status, retry_after, statuses = run(app, scenario)
+        assert status == 503
+        assert retry_after == "5"
+        assert statuses == [200, 200]
+
+
+class TestAnalyze:
+    def test_runs_analysis_as_a_job(self, monkeypatch):
+        async def aanalyze_document(document_bytes, document_name):
+            return SimpleNamespace(to_dict=lambda: {"document_name": document_name, "clauses": []})
+
+        monkeypatch.setattr(server, "aanalyze_document", aanalyze_document)
+
+        async def scenario(client):
+            response = await client.post("/analyze", data=pdf_form("convencao.pdf"))
+            job = await response.json()
+            for _ in range(50):
+                status = await (await client.get(f"/analyze/{job['job_id']}")).json()
+                if status["status"] == "done":
+                    break
+                await asyncio.sleep(0.01)
+            missing = await client.get("/analyze/nao-existe")
+            return response.status, status, missing.status
+
+        status, job, missing = run(server.create_app(), scenario)
+        assert status == 202
+        assert job["status"] == "done"
+        assert job["report"] == {"document_name": "convencao.pdf", "clauses": []}
+        assert missing == 404
+
+    def test_reports_failed_analyses(self, monkeypatch):
+        async def aanalyze_document(document_bytes, document_name):
+            raise RuntimeError("PDF ilegível")
+
+        monkeypatch.setattr(server, "aanalyze_document", aanalyze_document)
+
+        async def scenario(client):
+            job = await (await client.post("/analyze", data=pdf_form("convencao.pdf"))).json()
+            for _ in range(50):
+                status = await (await client.get(f"/analyze/{job['job_id']}")).json()
+                if status["status"] == "failed":
+                    return status
+                await asyncio.sleep(0.01)
+
+        assert run(server.create_app(), scenario)["error"] == "PDF ilegível"
+
+    def test_requires_one_file(self):
+        async def scenario(client):
+            return (await client.post("/analyze", data=pdf_form())).status
+
+        assert run(server.create_app(), scenario) == 400
+
+    def test_rejects_uploads_over_the_limit(self, monkeypatch):
+        analyzed = []
+
+        async def aanalyze_document(document_bytes, document_name):
+            analyzed.append(document_name)
+
+        monkeypatch.setattr(server, "aanalyze_document", aanalyze_document)
+
+        async def scenario(client):
+            form = FormData()
+            form.add_field("file", b"%PDF-1.4 " + b"0" * (2 * 1024 * 1024), filename="grande.pdf",
+                           content_type="application/pdf")
+            response = await client.post("/analyze", data=form)
+            return response.status, await response.json()
+
+        status, body = run(server.create_app(max_upload_mb=1), scenario)
+        assert status == 413
+        assert body == {"error": "Upload exceeds 1 MB"}
+        assert analyzed == []
+
+
+class TestDocuments:
+    def test_add_list_and_remove(self, monkeypatch):
+        indexed = {}
+
+        def add_internal_documents(documents, tenant_id):
+            results = []
+            for name, _ in documents:
+                indexed[(tenant_id, name)] = name
+                results.append({"name": name, "document_hash": name, "status": "added", "error": None})
+            return results
+
+        monkeypatch.setattr(server, "add_internal_documents", add_internal_documents)
+        monkeypatch.setattr(server, "get_internal_documents",
+                            lambda tenant_id: [(h, n) for (t, h), n in indexed.items() if t == tenant_id])
+        monkeypatch.setattr(server, "remove_internal_document",
+                            lambda document_hash, tenant_id: indexed.pop((tenant_id, document_hash), None) is not None)
+
+        async def scenario(client):
+            added = await (await client.post("/documents?tenant_id=a", data=pdf_form("regimento.pdf"))).json()
+            listed = await (await client.get("/documents?tenant_id=a")).json()
+            other = await (await client.get("/documents?tenant_id=b")).json()
+            removed = await client.delete("/documents/regimento.pdf?tenant_id=a")
+            missing = await client.delete("/documents/regimento.pdf?tenant_id=a")
+            return added, listed, other, removed.status, missing.status
+
+        added, listed, other, removed, missing = run(server.create_app(), scenario)
+        assert [d["status"] for d in added["documents"]] == ["added"]
+        assert listed["documents"] == [{"document_hash": "regimento.pdf", "name": "regimento.pdf"}]
+        assert other["documents"] == []
+        assert (removed, missing) == (204, 404)
+
+    def test_replace_documents(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(server, "set_internal_retriever",
+                            lambda documents, tenant_id: calls.append(([n for n, _ in documents], tenant_id)))
+        monkeypatch.setattr(server, "get_internal_documents", lambda tenant_id: [("h1", "convencao.pdf")])
+
+        async def scenario(client):
+            response = await client.put("/documents", data=pdf_form("convencao.pdf"),
+                                        headers={"X-Tenant-ID": "condo-a"})
+            return await response.json()
+
+        body = run(server.create_app(), scenario)
+        assert calls == [(["convencao.pdf"], "condo-a")]
+        assert body["documents"] == [{"document_hash": "h1", "name": "convencao.pdf"}]
+
+    def test_rejects_uploads_over_the_limit_across_files(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(server, "add_internal_documents", lambda documents, tenant_id: calls.append(documents))
+
+        async def scenario(client):
+            form = FormData()
+            for name in ("a.pdf", "b.pdf", "c.pdf"):
+                form.add_field("file", b"0" * (400 * 1024), filename=name, content_type="application/pdf")
+            return (await client.post("/documents", data=form)).status
+
+        assert run(server.create_app(max_upload_mb=1), scenario) == 413
+        assert calls == []
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question for cache lookups (case, accents, punctuation, spacing)."""
+    text = unicodedata.normalize("NFKD", question.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def _encode(value: Any) -> Any:
+    """Make a graph result JSON serializable (documents become tagged dicts)."""
+    if isinstance(value, Document):
+        return {
+            "__document__": True,
+            "id": value.id,
+            "page_content": value.page_content,
+            "metadata": value.metadata,
+        }
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    """Inverse of _encode."""
+    if isinstance(value, dict):
+        if value.get("__document__"):
+            return Document(
+                id=value.get("id"),
+                page_content=value["page_content"],
+                metadata=value.get("metadata") or {},
+            )
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+class AnswerCache:
+    """
+    SQLite-backed cache of answers produced by the QA graph.
+
+    Entries are keyed by the normalized question plus a fingerprint of the
+    retrieval context (vector store and internal documents), so answers are
+    never served for a different document set. Optionally, questions that
+    miss the exact key are matched by embedding similarity. Entries expire
+    after ttl_seconds and the least recently used ones are evicted past
+    max_entries.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None,
+                 max_entries: int = 1000,
+                 similarity_threshold: Optional[float] = None,
+                 embed_fn: Optional[Callable[[str], List[float]]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embed_fn = embed_fn
+        self._clock = clock
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    key TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    embedding BLOB,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_fingerprint ON answers (fingerprint)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per operation keeps the cache safe to use from any thread
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _key(normalized: str, fingerprint: str) -> str:
+        return hashlib.sha256(f"{fingerprint}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def _use_similarity(self) -> bool:
+        return self.similarity_threshold is not None and self.embed_fn is not None
+
+    def _embed(self, normalized: str) -> np.ndarray:
+        vector = np.asarray(self.embed_fn(normalized), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, question: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a question, or None on a miss."""
+        normalized = normalize_question(question)
+        now = self._clock()
+
+        with closing(self._connect()) as conn, conn:
+            if self.ttl_seconds is not None:
+                conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl_seconds,))
+
+            row = conn.execute(
+                "SELECT key, result FROM answers WHERE key = ?",
+                (self._key(normalized, fingerprint),)
+            ).fetchone()
+
+            if row is None and self._use_similarity():
+                row = self._most_similar(conn, normalized, fingerprint)
+
+            if row is None:
+                return None
+
+            conn.execute("UPDATE answers SET last_access = ? WHERE key = ?", (now, row[0]))
+            return _decode(json.loads(row[1]))
+
+    def _most_similar(self, conn: sqlite3.Connection, normalized: str, fingerprint: str):
+        query = self._embed(normalized)
+        best_row, best_score = None, self.similarity_threshold
+        rows = conn.execute(
+            "SELECT key, result, embedding FROM answers WHERE fingerprint = ? AND embedding IS NOT NULL",
+            (fingerprint,)
+        )
+        for key, result, blob in rows:
+            score = float(np.dot(query, np.frombuffer(blob, dtype=np.float32)))
+            if score >= best_score:
+                best_row, best_score = (key, result), score
+        return best_row
+
+    def set(self, question: str, fingerprint: str, result: Dict[str, Any]):
+        """Store a result and evict the least recently used entries past max_entries."""
+        normalized = normalize_question(question)
+        now = self._clock()
+        embedding = self._embed(normalized).tobytes() if self._use_similarity() else None
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers "
+                "(key, fingerprint, question, embedding, result, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._key(normalized, fingerprint),
+                    fingerprint,
+                    normalized,
+                    embedding,
+                    json.dumps(_encode(result), ensure_ascii=False, default=str),
+                    now,
+                    now,
+                )
+            )
+            conn.execute(
+                "DELETE FROM answers WHERE key NOT IN "
+                "(SELECT key FROM answers ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        """Remove every cached answer."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM answers")
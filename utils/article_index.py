@@ -0,0 +1,66 @@
+import json
+import os
+from typing import Dict, Iterable, List
+
+from langchain_core.documents import Document
+
+from utils.article_refs import document_article, find_article_refs
+
+
+class ArticleIndex:
+    """
+    Civil Code articles keyed by number, for questions that cite them directly.
+
+    Built by ingest/ingest.py next to the vector store, so "o que diz o
+    art. 1.336?" resolves to the article itself with a dictionary lookup
+    instead of relying on similarity search to surface it.
+    """
+
+    def __init__(self, articles: Dict[str, Document]):
+        self.articles = articles
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document]) -> "ArticleIndex":
+        articles = {}
+        for doc in documents:
+            article = document_article(doc)
+            if article is not None and article not in articles:
+                articles[article] = doc
+        return cls(articles)
+
+    @classmethod
+    def load(cls, path: str) -> "ArticleIndex":
+        """Load a saved index (empty if ingest has not written one yet)."""
+        if not os.path.exists(path):
+            return cls({})
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls({
+            article: Document(id=entry.get("id"), page_content=entry["content"], metadata=entry["metadata"])
+            for article, entry in data.get("articles", {}).items()
+        })
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            article: {"id": doc.id, "content": doc.page_content, "metadata": doc.metadata}
+            for article, doc in self.articles.items()
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"articles": data}, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def __contains__(self, article: str) -> bool:
+        return article in self.articles
+
+    def lookup(self, articles: Iterable[str]) -> List[Document]:
+        """Documents of the given article keys, in order, skipping unknown ones."""
+        return [self.articles[article] for article in articles if article in self.articles]
+
+    def find(self, text: str, limit: int = 5) -> List[Document]:
+        """Articles cited in a text ("art. 1.336", "arts. 1.336 e 1.337"), at most limit."""
+        return self.lookup(find_article_refs(text))[:limit]
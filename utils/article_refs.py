@@ -0,0 +1,95 @@
+import os
+import re
+from typing import Iterator, List, Optional, Tuple
+
+# "art.", "arts.", "artigo", "artigos" (any case)
+_ANCHOR = re.compile(r"\b(?:arts?|artigos?)\b\.?\s*", re.IGNORECASE)
+
+# "1.336", "1336", "1.331-A", "1331 - a"
+_NUMBER = re.compile(r"(\d{1,3}(?:\.\d{3})+|\d+)(?:\s*-\s*([A-Za-z])\b)?")
+
+# Qualifiers that may follow a number before the next one: ", IV", ", § 2º", ", parágrafo único"
+_QUALIFIER = re.compile(
+    r"(?:\s*,?\s*(?:inciso\s+)?(?:[IVXLC]+\b|§+\s*\d+\s*[º°o]?|par[aá]grafo\s+[úu]nico|caput))*",
+    re.IGNORECASE,
+)
+
+# Separators between numbers in a list: "1.336, 1.337", "1.336 e 1.337", "1.336 ou 1.337"
+_SEPARATOR = re.compile(r"\s*(?:,\s*(?:e\s+)?|e\s+|ou\s+)", re.IGNORECASE)
+
+# Article file names written by ingest/data/get_codigo_civil.py: Art_1336.txt, Art_1331-A.txt
+_FILENAME = re.compile(r"^Art_(\d+)(?:-([A-Za-z]))?$")
+
+
+def normalize_article(number: str, letter: Optional[str] = None) -> str:
+    """Canonical article key: "1.336" -> "1336", ("1.331", "a") -> "1331-A"."""
+    key = number.replace(".", "")
+    return f"{key}-{letter.upper()}" if letter else key
+
+
+def _iter_refs(text: str) -> Iterator[Tuple[int, int, List[str]]]:
+    """(start, end, article keys) of every reference such as "arts. 1.336, IV e 1.337"."""
+    for anchor in _ANCHOR.finditer(text):
+        refs = []
+        pos = anchor.end()
+        while True:
+            number = _NUMBER.match(text, pos)
+            if number is None:
+                break
+            refs.append(normalize_article(number.group(1), number.group(2)))
+
+            pos = _QUALIFIER.match(text, number.end()).end()
+            separator = _SEPARATOR.match(text, pos)
+            if separator is None or _NUMBER.match(text, separator.end()) is None:
+                break
+            pos = separator.end()
+        if refs:
+            yield anchor.start(), pos, refs
+
+
+def find_article_refs(text: str) -> List[str]:
+    """
+    Find the article numbers cited in a text, in order and without repetitions.
+
+    Understands lists such as "arts. 1.336, IV e 1.337, parágrafo único",
+    which yields ["1336", "1337"].
+    """
+    refs = [ref for _, _, found in _iter_refs(text) for ref in found]
+    return list(dict.fromkeys(refs))
+
+
+def strip_article_refs(text: str) -> str:
+    """Text with its article references removed ("veda (art. 1.336, IV) atos" -> "veda () atos")."""
+    for start, end, _ in reversed(list(_iter_refs(text))):
+        text = text[:start] + text[end:]
+    return text
+
+
+def article_from_source(source: str) -> Optional[str]:
+    """Article key of an ingested article file path, or None for other sources."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    match = _FILENAME.match(stem)
+    if match is None:
+        return None
+    return normalize_article(match.group(1), match.group(2))
+
+
+def document_article(doc) -> Optional[str]:
+    """
+    Article a Civil Code chunk belongs to.
+
+    Taken from the chunk metadata ("article" or the source file name), or
+    from a heading such as "Art. 1.336." at the start of its text.
+    """
+    metadata = doc.metadata or {}
+    if metadata.get("article"):
+        return metadata["article"]
+
+    article = article_from_source(metadata.get("source", ""))
+    if article is not None:
+        return article
+
+    heading = re.match(r"\s*Art\.\s*" + _NUMBER.pattern, doc.page_content)
+    if heading is not None:
+        return normalize_article(heading.group(1), heading.group(2))
+    return None
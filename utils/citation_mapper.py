@@ -0,0 +1,88 @@
+import math
+import re
+import unicodedata
+from typing import List, Set, Tuple
+
+from utils.article_refs import document_article, find_article_refs
+
+STOPWORDS = {
+    "a", "ao", "aos", "as", "com", "como", "da", "das", "de", "do", "dos", "e", "ela", "elas",
+    "ele", "eles", "em", "entre", "essa", "esse", "esta", "este", "isso", "isto", "ja", "lhe",
+    "mais", "mas", "mesmo", "na", "nao", "nas", "nem", "no", "nos", "o", "os", "ou", "para",
+    "pela", "pelas", "pelo", "pelos", "por", "qual", "quando", "que", "se", "sem", "ser", "seu",
+    "seus", "sua", "suas", "tambem", "tem", "um", "uma", "umas", "uns", "foi", "sao", "pode",
+    "deve", "caso", "sobre", "ate", "ainda", "apenas", "assim", "cada", "onde", "muito",
+}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+|\n+")
+# "Art." and "§" abbreviations must not end a sentence
+_ABBREVIATION_END = re.compile(r"\b(?:arts?|n|inc)\.$", re.IGNORECASE)
+
+
+def fold(text: str) -> str:
+    """Lowercase text without accents."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def content_tokens(text: str) -> List[str]:
+    """Word tokens of a text without accents, stopwords or very short words."""
+    return [t for t in re.findall(r"\w+", fold(text)) if len(t) > 2 and t not in STOPWORDS]
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split an answer into sentences, keeping "Art. 1.336" references whole."""
+    sentences, current = [], ""
+    for part in _SENTENCE_END.split(text):
+        current = f"{current} {part}".strip() if current else part.strip()
+        if current and not _ABBREVIATION_END.search(current):
+            sentences.append(current)
+            current = ""
+    if current:
+        sentences.append(current)
+    return sentences
+
+
+def map_citations(answer: str, documents: list, min_overlap: float = 0.5,
+                  min_sentence_tokens: int = 4) -> Tuple[List[int], bool]:
+    """
+    Map an answer to the retrieved documents it was built from, without an LLM.
+
+    A document is used when the answer cites its article number ("Art.
+    1.336") or when one answer sentence is mostly covered by the document's
+    words, weighting rare words over the ones every document shares.
+
+    Returns:
+        The indices of the used documents (in retrieval order) and whether
+        the mapping is confident, i.e. at least one document matched.
+    """
+    if not documents or not answer:
+        return [], False
+
+    cited = set(find_article_refs(answer))
+    doc_tokens: List[Set[str]] = [set(content_tokens(doc.page_content)) for doc in documents]
+
+    # Inverse document frequency over the retrieved documents
+    n_docs = len(documents)
+    def idf(token: str) -> float:
+        df = sum(1 for tokens in doc_tokens if token in tokens)
+        return math.log((n_docs + 1) / (df + 1)) + 1.0
+
+    sentences = [set(content_tokens(sentence)) for sentence in split_sentences(answer)]
+    sentences = [tokens for tokens in sentences if len(tokens) >= min_sentence_tokens]
+    weights = {token: idf(token) for tokens in sentences for token in tokens}
+
+    used = []
+    for idx, (doc, tokens) in enumerate(zip(documents, doc_tokens)):
+        if document_article(doc) in cited:
+            used.append(idx)
+            continue
+
+        for sentence in sentences:
+            total = sum(weights[token] for token in sentence)
+            covered = sum(weights[token] for token in sentence & tokens)
+            if covered / total >= min_overlap:
+                used.append(idx)
+                break
+
+    return used, bool(used)
@@ -0,0 +1,90 @@
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from utils.legal_splitter import ARTICLE_HEADING, CLAUSE_HEADING, find_units
+from utils.lexical_index import tokenize
+
+# Keywords of each clause topic, in tie-break order; matched on stemmed tokens
+TOPIC_KEYWORDS = {
+    "pets": "animal animais cachorro cachorros cão cães gato gatos pet pets estimação coleira focinheira",
+    "fines": "multa multas penalidade penalidades sanção sanções advertência advertências infração infrações "
+             "infrator punição",
+    "fees": "taxa taxas contribuição contribuições despesas rateio cota cotas boleto juros inadimplente "
+            "inadimplência orçamento vencimento fração",
+    "quorum": "assembleia assembleias quórum votação voto votos maioria convocação deliberação deliberações "
+              "unanimidade ata",
+    "visitors": "visitante visitantes visita visitas hóspede hóspedes convidado convidados prestadores "
+                "entregadores",
+    "common_areas": "piscina salão festas academia churrasqueira playground garagem vaga vagas elevador "
+                    "elevadores quadra sauna jardim",
+    "property_use": "reforma reformas obra obras barulho ruído ruídos silêncio mudança mudanças fachada "
+                    "locação aluguel temporada residencial comercial",
+}
+
+_TOPIC_STEMS = {topic: set(tokenize(words)) for topic, words in TOPIC_KEYWORDS.items()}
+
+
+def classify_topic(text: str) -> str:
+    """Topic with the most keyword occurrences in text, "general" if none occurs."""
+    counts = Counter(tokenize(text))
+    best, best_score = "general", 0
+    for topic, stems in _TOPIC_STEMS.items():
+        score = sum(counts[stem] for stem in stems)
+        if score > best_score:
+            best, best_score = topic, score
+    return best
+
+
+def _part_label(metadata: Dict[str, Any]) -> str:
+    """Where a continuation piece of a split unit starts: "§ 2º", "inciso III"..."""
+    labels = []
+    paragraph = metadata.get("paragraph")
+    if paragraph:
+        labels.append("parágrafo único" if paragraph == "único" else f"§ {paragraph}º")
+    if metadata.get("inciso"):
+        labels.append(f"inciso {metadata['inciso']}")
+    return ", ".join(labels)
+
+
+def segment_clauses(text: str, min_coverage: float = 0.8,
+                    metadata: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, str]]]:
+    """
+    Split a well-structured chunk into its articles or clauses without a model.
+
+    Returns clause_number, clause_text and topic for every unit, or None when
+    the chunk should go to the LLM extractor instead: no article or clause
+    headings, a heading with no text after it, or less than min_coverage of
+    the chunk inside units (e.g. a chunk cut in the middle of a clause).
+
+    metadata is the chunk's LegalTextSplitter metadata. When the chunk is a
+    later part of a split unit, its first unit is numbered after the part
+    ("Art. 1.336, § 2º") so deduplication by number keeps every part.
+    """
+    units = find_units(text)
+    if units is None:
+        return None
+    part = _part_label(metadata) if metadata and metadata.get("continuation") else ""
+
+    clauses, covered = [], 0
+    for start, end, unit_metadata in units:
+        if unit_metadata["unit_type"] not in ("article", "clause"):
+            continue
+        unit = text[start:end].strip()
+        pattern = CLAUSE_HEADING if unit_metadata["unit_type"] == "clause" else ARTICLE_HEADING
+        heading = pattern.match(unit)
+        if heading is None or not re.search(r"[^\W\d_]{2,}", unit[heading.end():]):
+            return None
+        covered += len(unit)
+        number = " ".join(heading.group(0).split())
+        if part and not clauses:
+            number = f"{number}, {part}"
+        clauses.append({
+            "clause_number": number,
+            "clause_text": unit,
+            "topic": classify_topic(unit),
+        })
+
+    if covered < min_coverage * len(text.strip()):
+        return None
+    return clauses
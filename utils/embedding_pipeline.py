@@ -0,0 +1,112 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+# HTTP status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+ProgressCallback = Callable[[int, int, float], None]
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of an API error, following wrapped exceptions (__cause__)."""
+    while error is not None:
+        for attr in ("code", "status_code"):
+            code = getattr(error, attr, None)
+            if isinstance(code, int):
+                return code
+        response = getattr(error, "response", None)
+        code = getattr(response, "status_code", None)
+        if isinstance(code, int):
+            return code
+        error = error.__cause__
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Check if an embedding error is a rate limit or a transient server error."""
+    code = _status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    return "RESOURCE_EXHAUSTED" in str(error) or "429" in str(error)
+
+
+def print_progress(done: int, total: int, elapsed: float):
+    """Default progress reporter: embedded documents and throughput."""
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"Embedded {done}/{total} documents ({rate:.1f} docs/s)")
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Bulk embedding stage wrapping another Embeddings model.
+
+    Texts are split into batches of batch_size, at most max_concurrency
+    batches are embedded at the same time, and batches failing with a rate
+    limit (429) or a transient server error (5xx) are retried with
+    exponential backoff and jitter. Output order matches input order.
+    """
+
+    def __init__(self, underlying: Embeddings, batch_size: int = 100,
+                 max_concurrency: int = 4, max_retries: int = 5,
+                 initial_backoff: float = 1.0, max_backoff: float = 30.0,
+                 progress: Optional[ProgressCallback] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.underlying = underlying
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.progress = progress
+        self._sleep = sleep
+
+    def _with_retry(self, func: Callable, *args):
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = min(self.max_backoff, self.initial_backoff * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.0)
+                attempt += 1
+                print(f"Embedding request failed ({e}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                self._sleep(delay)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents in concurrent, retried batches."""
+        if not texts:
+            return []
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        total = len(texts)
+        start = time.perf_counter()
+        done = 0
+        lock = threading.Lock()
+
+        def embed_batch(batch: List[str]) -> List[List[float]]:
+            nonlocal done
+            vectors = self._with_retry(self.underlying.embed_documents, batch)
+            if self.progress is not None:
+                with lock:
+                    done += len(batch)
+                    self.progress(done, total, time.perf_counter() - start)
+            return vectors
+
+        if len(batches) == 1 or self.max_concurrency <= 1:
+            results = [embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                results = list(executor.map(embed_batch, batches))
+
+        return [vector for batch_vectors in results for vector in batch_vectors]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, retrying on rate limits and transient errors."""
+        return self._with_retry(self.underlying.embed_query, text)
@@ -0,0 +1,70 @@
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from utils.lexical_index import BM25Index, reciprocal_rank_fusion
+
+RETRIEVAL_MODES = ("dense", "hybrid", "lexical")
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Dense retrieval fused with a local BM25 index by reciprocal rank fusion.
+
+    Modes:
+        dense: the vector store only.
+        hybrid: both rankings, fused.
+        lexical: BM25 alone when its best match covers at least
+            confidence_threshold of the query terms, so the query is never
+            embedded; hybrid otherwise. A threshold of 0 makes it lexical-only.
+
+    Like the vector store retriever, invoke() accepts a k override.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    dense: Any
+    lexical: BM25Index
+    mode: str = "hybrid"
+    k: int = 4
+    fetch_k: int = 20
+    rrf_k: int = 60
+    confidence_threshold: float = 0.9
+
+    def _fuse(self, dense_docs: List[Document], lexical_docs: List[Document], k: int) -> List[Document]:
+        return reciprocal_rank_fusion([dense_docs, lexical_docs], k=self.rrf_k)[:k]
+
+    def _lexical(self, query: str, k: int):
+        """Lexical candidates, and whether they are good enough to skip dense retrieval."""
+        docs, confidence = self.lexical.search(query, max(k, self.fetch_k))
+        confident = self.mode == "lexical" and bool(docs) and confidence >= self.confidence_threshold
+        return docs, confident
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+                                k: Optional[int] = None) -> List[Document]:
+        k = k or self.k
+        config = {"callbacks": run_manager.get_child()}
+        if self.mode == "dense":
+            return self.dense.invoke(query, config, k=k)
+
+        lexical_docs, confident = self._lexical(query, k)
+        if confident:
+            return lexical_docs[:k]
+        dense_docs = self.dense.invoke(query, config, k=max(k, self.fetch_k))
+        return self._fuse(dense_docs, lexical_docs, k)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun,
+                                       k: Optional[int] = None) -> List[Document]:
+        k = k or self.k
+        config = {"callbacks": run_manager.get_child()}
+        if self.mode == "dense":
+            return await self.dense.ainvoke(query, config, k=k)
+
+        lexical_docs, confident = self._lexical(query, k)
+        if confident:
+            return lexical_docs[:k]
+        dense_docs = await self.dense.ainvoke(query, config, k=max(k, self.fetch_k))
+        return self._fuse(dense_docs, lexical_docs, k)
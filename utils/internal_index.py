@@ -0,0 +1,162 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+
+def collection_name(tenant_id: str) -> str:
+    """Chroma collection name for a tenant (readable prefix + hash, always a valid name)."""
+    slug = re.sub(r"[^a-zA-Z0-9_-]+", "-", tenant_id).strip("-_")[:40]
+    digest = hashlib.sha256(tenant_id.encode("utf-8")).hexdigest()[:12]
+    return f"internal_{slug}_{digest}" if slug else f"internal_{digest}"
+
+
+class InternalIndex:
+    """
+    Internal documents of one condominium, stored in its own persistent collection.
+
+    Every chunk carries the name and content hash of the document it came
+    from, so the list of indexed documents is recovered from the collection
+    after a restart without re-embedding anything.
+    """
+
+    def __init__(self, tenant_id: str, vectorstore):
+        self.tenant_id = tenant_id
+        self.vectorstore = vectorstore
+        self.retriever = vectorstore.as_retriever()
+        self._lock = threading.RLock()
+        self._documents: "OrderedDict[str, str]" = OrderedDict()  # content hash -> file name
+        self._load()
+
+    def _load(self):
+        metadatas = self.vectorstore.get(include=["metadatas"])["metadatas"]
+        found = {}
+        for metadata in metadatas:
+            document_hash = (metadata or {}).get("document_hash")
+            if document_hash and document_hash not in found:
+                found[document_hash] = (metadata.get("added_at", 0), metadata.get("source_file", ""))
+
+        for document_hash, (_, name) in sorted(found.items(), key=lambda item: item[1][0]):
+            self._documents[document_hash] = name
+
+    @property
+    def document_names(self) -> List[str]:
+        with self._lock:
+            return list(self._documents.values())
+
+    @property
+    def documents(self) -> List[Tuple[str, str]]:
+        """Indexed documents as (content hash, file name), in upload order."""
+        with self._lock:
+            return list(self._documents.items())
+
+    def __contains__(self, document_hash: str) -> bool:
+        return document_hash in self._documents
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._documents
+
+    @property
+    def fingerprint(self) -> str:
+        """Identify the indexed document set (empty string when there are no documents)."""
+        with self._lock:
+            if not self._documents:
+                return ""
+            return hashlib.sha256("".join(sorted(self._documents)).encode("utf-8")).hexdigest()
+
+    def add_document(self, name: str, document_hash: str, chunks: List[Document]) -> bool:
+        """Index the chunks of one document. Returns False if it was already indexed."""
+        with self._lock:
+            if document_hash in self._documents:
+                return False
+
+            added_at = time.time()
+            for chunk in chunks:
+                chunk.metadata.update({
+                    "source_file": name,
+                    "document_hash": document_hash,
+                    "added_at": added_at,
+                })
+            if chunks:
+                self.vectorstore.add_documents(
+                    chunks,
+                    ids=[f"{document_hash}:{idx}" for idx in range(len(chunks))],
+                )
+            self._documents[document_hash] = name
+            return True
+
+    def remove_document(self, document_hash: str) -> bool:
+        """Remove the chunks of one document. Returns False if it was not indexed."""
+        with self._lock:
+            if document_hash not in self._documents:
+                return False
+
+            ids = self.vectorstore.get(where={"document_hash": document_hash}, include=[])["ids"]
+            if ids:
+                self.vectorstore.delete(ids=ids)
+            del self._documents[document_hash]
+            return True
+
+    def clear(self):
+        """Remove every document of this condominium."""
+        with self._lock:
+            if self._documents:
+                self.vectorstore.reset_collection()
+                self.retriever = self.vectorstore.as_retriever()
+            self._documents.clear()
+
+
+class InternalIndexManager:
+    """
+    Loads per-tenant internal indexes on demand and keeps the recently used ones in memory.
+
+    Indexes live on disk, so evicting one only drops it from memory: the
+    next request for that tenant reopens its collection. Indexes idle for
+    longer than idle_seconds, and the least recently used ones beyond
+    max_loaded, are evicted.
+    """
+
+    def __init__(self, vectorstore_factory: Callable[[str], object], max_loaded: int = 32,
+                 idle_seconds: float = 1800, clock: Callable[[], float] = time.monotonic):
+        self.vectorstore_factory = vectorstore_factory
+        self.max_loaded = max_loaded
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._indexes: "OrderedDict[str, InternalIndex]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+
+    def get(self, tenant_id: str) -> InternalIndex:
+        """Return the index of a tenant, loading it from disk if needed."""
+        with self._lock:
+            now = self._clock()
+            index = self._indexes.get(tenant_id)
+            if index is None:
+                index = InternalIndex(tenant_id, self.vectorstore_factory(collection_name(tenant_id)))
+                self._indexes[tenant_id] = index
+            self._indexes.move_to_end(tenant_id)
+            self._last_used[tenant_id] = now
+            self._evict(now)
+            return index
+
+    def _evict(self, now: float):
+        for tenant_id in list(self._indexes):
+            idle = now - self._last_used[tenant_id] > self.idle_seconds
+            if idle or len(self._indexes) > self.max_loaded:
+                del self._indexes[tenant_id]
+                del self._last_used[tenant_id]
+
+    def evict_idle(self):
+        """Drop indexes that have been idle for longer than idle_seconds."""
+        with self._lock:
+            self._evict(self._clock())
+
+    def loaded_tenants(self) -> List[str]:
+        """Tenants currently held in memory, least recently used first."""
+        with self._lock:
+            return list(self._indexes)
@@ -0,0 +1,213 @@
+import bisect
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from utils.article_refs import normalize_article
+
+# A heading number is followed by punctuation or a capitalized sentence; a
+# reference wrapped to the start of a line ("Art. 1.336 do Código Civil") is not
+_HEADING_END = r"(?!\.?\d)(?=[ \t]*[º°ªo]?[ \t]*(?:[.:)\-–—]|[ \t][A-ZÀ-Ú]|$))"
+
+# Units: "Art. 1.336.", "Art. 5º -", "Artigo 12", "Art. 1.331-A"
+ARTICLE_HEADING = re.compile(
+    r"^[ \t]*(?:Art\.|Artigo)[ \t]*(\d{1,3}(?:\.\d{3})+|\d+)(?:[ \t]*-[ \t]*([A-Z])\b)?" + _HEADING_END,
+    re.MULTILINE,
+)
+# "CLÁUSULA PRIMEIRA", "Cláusula 3ª"
+CLAUSE_HEADING = re.compile(
+    r"^[ \t]*(?:CL[ÁA]USULA|Cl[áa]usula)[ \t]+(\d+|[^\W\d_]+)" + _HEADING_END,
+    re.MULTILINE,
+)
+# Divisions, only kept as context: "CAPÍTULO II - DAS DESPESAS", "Seção I"
+DIVISION_HEADING = re.compile(
+    r"^[ \t]*(?:T[ÍI]TULO|T[íi]tulo|CAP[ÍI]TULO|Cap[íi]tulo|SE[ÇC][ÃA]O|Se[çc][ãa]o)[ \t]+"
+    r"(?:[IVXLC]+|\d+|[ÚU]NIC[OA]|[ÚúUu]nic[oa])\b.*$",
+    re.MULTILINE,
+)
+# Parts of a unit: "§ 1º", "Parágrafo único", incisos "IV -"
+PARAGRAPH_MARKER = re.compile(r"^[ \t]*(?:§[ \t]*(\d+)|(Par[áa]grafo[ \t]+[úu]nico|PAR[ÁA]GRAFO[ \t]+[ÚU]NICO))", re.MULTILINE)
+INCISO_MARKER = re.compile(r"^[ \t]*([IVXLC]+)[ \t]*[-–—.)][ \t]", re.MULTILINE)
+
+
+@dataclass
+class _Piece:
+    text: str
+    metadata: Dict[str, str] = field(default_factory=dict)
+    start: int = 0  # offset in the split text where the piece starts
+
+
+def _first_line(text: str) -> str:
+    return text.strip().splitlines()[0].strip() if text.strip() else ""
+
+
+def find_units(text: str) -> Optional[List[Tuple[int, int, Dict[str, str]]]]:
+    """
+    (start, end, metadata) of every article or clause of text, plus "preamble"
+    and "text" units for what lies outside them. None if the text has no
+    article or clause headings.
+    """
+    clauses = list(CLAUSE_HEADING.finditer(text))
+    # A convention numbered by clauses may still cite "Art." at a line start
+    headings = clauses or list(ARTICLE_HEADING.finditer(text))
+    if not headings:
+        return None
+
+    divisions = list(DIVISION_HEADING.finditer(text))
+    boundaries = sorted([(m.start(), m) for m in headings] + [(m.start(), m) for m in divisions],
+                        key=lambda item: item[0])
+
+    units = []
+    if text[:boundaries[0][0]].strip():
+        units.append((0, boundaries[0][0], {"unit_type": "preamble"}))
+
+    section = ""
+    for idx, (start, match) in enumerate(boundaries):
+        end = boundaries[idx + 1][0] if idx + 1 < len(boundaries) else len(text)
+        if match.re is DIVISION_HEADING:
+            section = match.group(0).strip()
+            # Text under a division heading that is not in any unit
+            if text[match.end():end].strip():
+                units.append((match.end(), end, {"unit_type": "text", "section": section}))
+            continue
+
+        if match.re is CLAUSE_HEADING:
+            metadata = {"unit_type": "clause", "clause": match.group(1).upper()}
+        else:
+            metadata = {"unit_type": "article", "article": normalize_article(match.group(1), match.group(2))}
+        if section:
+            metadata["section"] = section
+        units.append((start, end, metadata))
+    return units
+
+
+class LegalTextSplitter:
+    """
+    Split legal texts (Civil Code articles, condominium conventions and bylaws)
+    at their normative units instead of at arbitrary character counts.
+
+    Every "Art." or "Cláusula" becomes one chunk, carrying its number and
+    the enclosing "Capítulo"/"Seção" as metadata. A unit longer than
+    chunk_size is split at its "§", "Parágrafo único" and inciso
+    boundaries, each part repeating the unit heading and carrying the
+    "paragraph"/"inciso" it starts at, with "continuation" set on every
+    part after the first. Only text with no
+    such structure, or a single part still too long, falls back to the
+    character splitter (the only place chunk_overlap applies).
+
+    With pack_units, consecutive units are packed into chunks of up to
+    chunk_size without ever cutting one, for callers that want fewer calls
+    rather than one chunk per unit.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, pack_units: bool = False):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.pack_units = pack_units
+
+    def _fallback(self, text: str) -> List[str]:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        splitter = RecursiveCharacterTextSplitter(chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
+        return splitter.split_text(text)
+
+    def _split_unit(self, text: str, metadata: Dict[str, str], offset: int) -> List[_Piece]:
+        offset += len(text) - len(text.lstrip())
+        text = text.strip()
+        if len(text) <= self.chunk_size:
+            return [_Piece(text, metadata, offset)]
+
+        # Part boundaries after the heading line
+        starts = sorted({m.start() for m in PARAGRAPH_MARKER.finditer(text)}
+                        | {m.start() for m in INCISO_MARKER.finditer(text)})
+        starts = [0] + [s for s in starts if s > 0]
+        parts = [(offset + s, text[s:e].strip()) for s, e in zip(starts, starts[1:] + [len(text)])]
+
+        heading = _first_line(text)
+        pieces: List[_Piece] = []
+        paragraph = None
+        current = None
+        for start, part in parts:
+            paragraph_match = PARAGRAPH_MARKER.match(part)
+            if paragraph_match:
+                paragraph = paragraph_match.group(1) or "único"
+            part_meta = dict(metadata)
+            if paragraph:
+                part_meta["paragraph"] = paragraph
+            inciso = INCISO_MARKER.match(part)
+            if inciso:
+                part_meta["inciso"] = inciso.group(1)
+
+            if current is not None and len(current.text) + 1 + len(part) <= self.chunk_size:
+                current.text = f"{current.text}\n{part}"
+                continue
+
+            if current is not None:
+                pieces.append(current)
+            if start == offset:
+                current = _Piece(part, part_meta, start)
+            else:
+                # Later parts repeat the unit heading so they stay self-contained,
+                # and are marked so the heading is not taken for a new unit
+                part_meta["continuation"] = True
+                current = _Piece(f"{heading}\n{part}", part_meta, start)
+            if len(current.text) > self.chunk_size:
+                pieces.extend(_Piece(chunk, part_meta, start) for chunk in self._fallback(current.text))
+                current = None
+
+        if current is not None:
+            pieces.append(current)
+        return pieces
+
+    def _pack(self, pieces: List[_Piece]) -> List[_Piece]:
+        packed: List[_Piece] = []
+        for piece in pieces:
+            if packed and len(packed[-1].text) + 2 + len(piece.text) <= self.chunk_size:
+                packed[-1].text = f"{packed[-1].text}\n\n{piece.text}"
+            else:
+                packed.append(_Piece(piece.text, dict(piece.metadata), piece.start))
+        return packed
+
+    def _split_pieces(self, text: str) -> List[_Piece]:
+        units = find_units(text)
+        if units is None:
+            return [_Piece(chunk) for chunk in self._fallback(text)]
+
+        pieces = []
+        for start, end, metadata in units:
+            if metadata["unit_type"] in ("preamble", "text"):
+                pieces.extend(_Piece(chunk, metadata, start) for chunk in self._fallback(text[start:end].strip()))
+            else:
+                pieces.extend(self._split_unit(text[start:end], metadata, start))
+        return self._pack(pieces) if self.pack_units else pieces
+
+    def split_text(self, text: str) -> List[str]:
+        return [piece.text for piece in self._split_pieces(text)]
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        """
+        Split the pages of one document as a single text, so units spanning a
+        page break stay whole. Each chunk keeps the metadata of the page it
+        starts on.
+
+        Pages are consumed as they come, but only their text and metadata are
+        kept. The whole text is needed before splitting: whether the document
+        is numbered by clauses or by articles, and where a unit ends, is only
+        known once every page has been read.
+        """
+        texts, offsets, pages_metadata, position = [], [], [], 0
+        for doc in documents:
+            offsets.append(position)
+            texts.append(doc.page_content)
+            pages_metadata.append(doc.metadata)
+            position += len(doc.page_content) + 1
+        if not texts:
+            return []
+
+        chunks = []
+        for piece in self._split_pieces("\n".join(texts)):
+            page_metadata = pages_metadata[bisect.bisect_right(offsets, piece.start) - 1]
+            chunks.append(Document(page_content=piece.text, metadata={**page_metadata, **piece.metadata}))
+        return chunks
@@ -0,0 +1,118 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from utils.citation_mapper import STOPWORDS, fold
+
+# Thousands separators in article numbers: "1.336" -> "1336"
+_THOUSANDS = re.compile(r"(?<=\d)\.(?=\d{3}\b)")
+
+# Plural endings, longest first: "condições" -> "condicao", "condôminos" -> "condomino"
+_PLURALS = [("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ns", "m"), ("s", "")]
+
+# Derivational endings that mostly change the word class, not the meaning
+_SUFFIXES = [
+    "amentos", "imentos", "amento", "imento", "mente", "idades", "idade", "acoes", "acao",
+    "adores", "ador", "avel", "ivel", "ancia", "encia", "ista", "ismo", "eza",
+]
+
+
+def stem(token: str) -> str:
+    """
+    Light Portuguese stemmer for folded (accentless, lowercase) tokens.
+
+    Strips plurals, a few derivational suffixes and the final gender vowel,
+    so "condôminos", "condômina" and "condômino" share a stem. Short
+    tokens and numbers are left alone.
+    """
+    if len(token) <= 3 or token.isdigit():
+        return token
+
+    for suffix, replacement in _PLURALS:
+        if token.endswith(suffix):
+            # "processo", "onus", "lapis": a bare s after these is not a plural
+            if suffix != "s" or not token.endswith(("ss", "us", "is")):
+                token = token[:-len(suffix)] + replacement
+            break
+
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            token = token[:-len(suffix)]
+            break
+
+    if len(token) > 4 and token[-1] in "aeo":
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Stemmed word tokens of a Portuguese text, without accents or stopwords."""
+    text = _THOUSANDS.sub("", fold(text))
+    return [
+        stem(token) for token in re.findall(r"\w+", text)
+        if token not in STOPWORDS and (len(token) > 2 or token.isdigit())
+    ]
+
+
+class BM25Index:
+    """In-memory inverted index scoring documents with Okapi BM25."""
+
+    def __init__(self, documents: Iterable[Document], k1: float = 1.5, b: float = 0.75):
+        self.documents = list(documents)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._lengths: List[int] = []
+
+        for idx, doc in enumerate(self.documents):
+            tokens = tokenize(doc.page_content)
+            self._lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self._postings[term][idx] = tf
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 1.0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self.documents) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 4) -> Tuple[List[Document], float]:
+        """
+        Return the k best matching documents and a confidence for the best one.
+
+        The confidence is the share of the query's terms, weighted by idf,
+        that the best document contains: 1.0 when it has every term.
+        """
+        terms = set(tokenize(query))
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            idf = self.idf(term)
+            for idx, tf in self._postings.get(term, {}).items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[idx] / self._avg_length)
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        if not ranked:
+            return [], 0.0
+
+        best = ranked[0][0]
+        total = sum(self.idf(term) for term in terms)
+        covered = sum(self.idf(term) for term in terms if best in self._postings.get(term, {}))
+        return [self.documents[idx] for idx, _ in ranked], covered / total if total else 0.0
+
+
+def reciprocal_rank_fusion(rankings: Sequence[List[Document]], k: int = 60) -> List[Document]:
+    """Merge ranked lists by summing 1 / (k + rank); documents are matched by content."""
+    scores: Dict[str, float] = defaultdict(float)
+    documents: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            scores[doc.page_content] += 1.0 / (k + rank + 1)
+            documents.setdefault(doc.page_content, doc)
+    return [documents[content] for content in sorted(scores, key=scores.get, reverse=True)]
@@ -0,0 +1,129 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+
+def iter_pdf_pages(file_bytes: bytes, source: str) -> Iterator[Document]:
+    """
+    Parse a PDF from memory, yielding one Document per page as it is read.
+
+    Nothing touches the disk, so concurrent uploads and analyses cannot
+    clobber each other's files. Page metadata matches PyPDFLoader, with
+    source set to the uploaded file name.
+    """
+    from langchain_community.document_loaders.parsers import PyPDFParser
+    from langchain_core.document_loaders import Blob
+
+    blob = Blob.from_data(file_bytes, path=source, mime_type="application/pdf")
+    yield from PyPDFParser().lazy_parse(blob)
+
+
+def split_pdf(file_bytes: bytes, source: str, chunk_size: int, chunk_overlap: int,
+              pack_units: bool = False) -> List[Document]:
+    """
+    Parse a PDF from memory and split it at its articles, clauses, paragraphs and incisos.
+
+    Pages are still parsed one at a time, but unlike the old page-by-page
+    split the text of every page is kept until the end: units often span a
+    page break (see LegalTextSplitter.split_documents).
+    """
+    from utils.legal_splitter import LegalTextSplitter
+
+    splitter = LegalTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, pack_units=pack_units)
+    return splitter.split_documents(iter_pdf_pages(file_bytes, source))
+
+
+@dataclass
+class ParsedPdf:
+    """Chunks of one uploaded PDF, or the error that prevented parsing it."""
+    name: str
+    chunks: List[Document] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _split_pdf_job(job: Tuple[str, bytes, int, int]) -> List[Document]:
+    name, file_bytes, chunk_size, chunk_overlap = job
+    return split_pdf(file_bytes, name, chunk_size, chunk_overlap)
+
+
+def _collect(name: str, get_chunks: Callable[[], List[Document]]) -> ParsedPdf:
+    try:
+        return ParsedPdf(name=name, chunks=get_chunks())
+    except Exception as e:
+        print(f"Error parsing {name}: {e}")
+        return ParsedPdf(name=name, error=str(e))
+
+
+# Modules the parse workers need; imported once per worker instead of per upload
+_PARSER_MODULES = [
+    "langchain_community.document_loaders.parsers.pdf",
+    "langchain_text_splitters",
+    "utils.legal_splitter",
+]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _import_parser_modules():
+    import importlib
+
+    for module in _PARSER_MODULES:
+        importlib.import_module(module)
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Long-lived pool of parse workers, started on first use.
+
+    Workers come from a forkserver (spawn where unavailable) rather than a
+    fork of the caller, which runs in a Streamlit or server thread next to
+    other threads. The forkserver preloads the parser modules, so a worker
+    starts with them already imported.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(_PARSER_MODULES)
+            else:
+                context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                        initializer=_import_parser_modules)
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died, so the next upload starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def split_pdfs(documents: List[Tuple[str, bytes]], chunk_size: int, chunk_overlap: int,
+               max_workers: int = 4) -> List[ParsedPdf]:
+    """
+    Parse and split several PDFs across processes (text extraction is CPU-bound).
+
+    Results come back in upload order. A file that fails to parse is
+    reported in its ParsedPdf instead of aborting the others. The worker
+    pool is kept between calls; max_workers only applies when it is created.
+    """
+    jobs = [(name, file_bytes, chunk_size, chunk_overlap) for name, file_bytes in documents]
+    if len(jobs) <= 1 or max_workers <= 1:
+        return [_collect(job[0], lambda job=job: _split_pdf_job(job)) for job in jobs]
+
+    pool = _get_pool(max_workers)
+    futures = [pool.submit(_split_pdf_job, job) for job in jobs]
+    results = [_collect(job[0], future.result) for job, future in zip(jobs, futures)]
+    if any(isinstance(future.exception(), BrokenProcessPool) for future in futures):
+        _discard_pool(pool)
+    return results
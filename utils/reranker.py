@@ -0,0 +1,64 @@
+import hashlib
+import threading
+from typing import List, Optional
+
+from cachetools import LRUCache
+
+
+def hash_text(text: str) -> str:
+    """Return the sha256 hex digest of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def document_id(doc) -> str:
+    """Stable identifier for a retrieved chunk (vector store id or content hash)."""
+    return getattr(doc, "id", None) or hash_text(doc.page_content)
+
+
+class CachedReranker:
+    """
+    Cross-encoder reranker that scores question/chunk pairs in batches.
+
+    Scores are cached per (question hash, chunk id), so repeated questions
+    only send the chunks that were not scored before to the model.
+    """
+
+    def __init__(self, model, batch_size: int = 32, cache_size: int = 4096):
+        self.model = model
+        self.batch_size = batch_size
+        self._cache = LRUCache(maxsize=cache_size)
+        self._lock = threading.Lock()
+
+    def score(self, question: str, documents: list) -> List[float]:
+        """Score every document against the question, reusing cached scores."""
+        question_hash = hash_text(question)
+        keys = [(question_hash, document_id(doc)) for doc in documents]
+
+        scores: List[Optional[float]] = []
+        missing = []
+        with self._lock:
+            for idx, key in enumerate(keys):
+                cached = self._cache.get(key)
+                scores.append(cached)
+                if cached is None:
+                    missing.append(idx)
+
+        if missing:
+            pairs = [[question, documents[idx].page_content] for idx in missing]
+            new_scores = self.model.predict(pairs, batch_size=self.batch_size)
+            with self._lock:
+                for idx, score in zip(missing, new_scores):
+                    scores[idx] = float(score)
+                    self._cache[keys[idx]] = float(score)
+
+        return scores
+
+    def rerank(self, question: str, documents: list, top_k: int,
+               threshold: float) -> list:
+        """Return the top_k documents scoring above threshold, best first."""
+        if not documents:
+            return []
+
+        scores = self.score(question, documents)
+        ranked = sorted(zip(documents, scores), key=lambda pair: pair[1], reverse=True)
+        return [doc for doc, score in ranked if score > threshold][:top_k]